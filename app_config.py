@@ -37,10 +37,53 @@ class AppConfig:
         "files": {
             "default_save_filename": "processed_code.txt",
             "recursive_search": True,
+            "tree_summary": False,  # Start bundles with a directory tree summary
+            "tree_summary_depth": 3,  # Directory levels shown in the tree summary
+            "indexed_bundle": False,  # Save full bundles with a footer index for random access
+            "io_scheduling": True,  # Read files in physical order, see io_scheduler
+            "io_window": 256,  # Files scheduled together
+            "io_extents": False,  # Order by physical extent (an extra ioctl per file) instead of inode
+            "read_timeout": 10.0,  # Seconds before a stalled read is abandoned, 0 disables
+            "total_read_timeout": 0,  # Seconds for all reads of a run, 0 for no limit
+            "prefetch": True,  # Format the selection in the background before processing
+            "block_cache_mb": 256,  # Formatted blocks kept for prefetching, on top of bundle_memory_mb
+            "picker_results": 50,  # Best matches listed by the file picker
+            # Processed bundles beyond this spill to a temporary file; the ceiling covers the
+            # bundle only, not the block cache nor clipboard copies (see clipboard.max_mb)
+            "bundle_memory_mb": 64,
+            "fanout_queue_chunks": 16,  # Chunks queued per output before processing waits
+            "compression_level": 6,
+            "compression_chunk_size": 1024 * 1024,  # Bytes per independently compressed chunk
+            "compression_workers": 0,  # 0 uses one thread per CPU
+        },
+        "clipboard": {
+            "chunk_kb": 1024,  # Appended to the clipboard per event loop turn, well within a frame
+            "max_mb": 64,  # Larger bundles are saved to a temporary file and its path is copied;
+                           # smaller ones are held whole by the clipboard, outside bundle_memory_mb
+        },
+        "async_api": {
+            "workers": 4,  # Threads walking, reading and formatting for all async callers
+            "chunk_kb": 64,  # Bundle text yielded per chunk by abundle
+        },
+        "batch": {
+            "workers": 0,  # Processes bundling repositories in parallel, 0 uses one per CPU
+            "block_cache_mb": 64,  # Formatted blocks kept per repository, saved for the next run
+        },
+        "daemon": {
+            "socket": "~/.code_processor/daemon.sock",  # Unix domain socket editors connect to
+            "workers": 4,  # Threads scanning and formatting for all clients
+            "block_cache_mb": 512,  # Formatted blocks kept in memory for all repositories
+        },
+        "recent": {
+            "max_projects": 8,  # Projects listed under Recent Projects
+            "preload": True,  # Load the saved scans of recent projects in the background at startup
+            "preload_projects": 3,  # Most recent projects whose scans are preloaded
+            "block_cache_mb": 64,  # Formatted blocks saved per project for warm processing
         },
         "paths": {
             "log_file": "code_processor.log",
             "config_file": "config.json",
+            "cache_dir": "~/.code_processor",
         }
     }
     
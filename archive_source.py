@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Archive source backend for the Code Processor application.
+
+Processes ``.zip`` and ``.tar`` (optionally gzip, bzip2 or xz compressed)
+source drops in place. Members are enumerated and decoded by streaming
+through ``zipfile``/``tarfile``, without extracting anything to disk.
+"""
+
+import io
+import os
+import tarfile
+import threading
+import zipfile
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from constants import ARCHIVE_EXTENSIONS, SUPPORTED_FILE_TYPES
+from logger import get_logger
+from file_utils import normalize_path, decode_with_fallback
+from error_handler import with_error_handling
+
+# Get module logger
+logger = get_logger(__name__)
+
+def is_archive(path: str) -> bool:
+    """
+    Check if a path is an archive that can be processed in place.
+
+    Args:
+        path: The path to check
+
+    Returns:
+        True if the path is a supported archive file, False otherwise
+    """
+    return path.lower().endswith(ARCHIVE_EXTENSIONS) and os.path.isfile(path)
+
+def _is_supported_member(name: str) -> bool:
+    """Check if an archive member name has a supported file type."""
+    _, ext = os.path.splitext(name.lower())
+    return ext in SUPPORTED_FILE_TYPES
+
+class ArchiveSource:
+    """
+    Files of a zip or tar archive, read without extraction.
+
+    ``list_files`` returns ``(file_path, rel_path)`` tuples sorted by
+    relative path, as ``process_directory`` does, and ``read_file``
+    follows the ``read_file_with_fallback`` contract, so both plug straight
+    into ``format_files_for_ai``.
+
+    Zip members are listed from the central directory and read with random
+    access. A compressed tar stream can only be read forwards, with no
+    index to seek to a member, so ``iter_files`` streams a tarball in
+    archive order: each member is decompressed when it is reached and read
+    back before the next one, and nothing is written anywhere. Listing a
+    tarball for reads in any order, as the GUI does after a scan, has to
+    decompress it once and keep its supported members; they are kept in
+    memory, never in a temporary file.
+
+    A listed name stored more than once keeps its last member, as
+    extracting the archive would; the earlier copies are left out with a
+    warning.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open an archive.
+
+        Args:
+            path: Path to the archive file
+        """
+        self.path = normalize_path(path)
+        self.is_zip = zipfile.is_zipfile(self.path)
+        if not self.is_zip and not tarfile.is_tarfile(self.path):
+            raise ValueError(f"Unsupported archive format: {self.path}")
+
+        self._zip: Optional[zipfile.ZipFile] = zipfile.ZipFile(self.path) if self.is_zip else None
+        # file_path -> zip member, or offset and length of a tar member in the spool
+        self._members: Dict[str, Union[zipfile.ZipInfo, Tuple[int, int]]] = {}
+        self._rel_paths: Dict[str, str] = {}  # file_path -> relative path
+        self._spool: Optional[io.BytesIO] = None
+        self._current: Optional[Tuple[str, bytes]] = None  # file_path and data of the streamed member
+        self._lock = threading.RLock()
+        logger.info(f"Opened archive source {self.path}")
+
+    def _file_path(self, name: str) -> Tuple[str, str]:
+        """Map a member name to (file_path, relative_path)."""
+        rel_path = os.path.normpath(name.lstrip("/"))
+        return os.path.join(self.path, rel_path), rel_path
+
+    def _add_member(self, name: str, member: Union[zipfile.ZipInfo, Tuple[int, int]]) -> None:
+        """Record a listed member, replacing an earlier one of the same path."""
+        file_path, rel_path = self._file_path(name)
+        if file_path in self._members:
+            logger.warning(f"Archive {self.path} stores {name} more than once, keeping the last")
+        self._members[file_path] = member
+        self._rel_paths[file_path] = rel_path
+
+    def _stream_tar(self) -> Iterator[Tuple[str, bytes]]:
+        """Yield the name and data of every supported member of the tarball, in archive order."""
+        with tarfile.open(self.path, "r|*") as stream:
+            member = stream.next()
+            while member is not None:
+                if member.isfile() and _is_supported_member(member.name):
+                    extracted = stream.extractfile(member)
+                    yield member.name, extracted.read() if extracted is not None else b""
+                # Streamed members are not needed once passed, don't keep them all
+                stream.members = []
+                member = stream.next()
+
+    @with_error_handling("archive_source", return_on_error=None)
+    def _next_streamed(self, members: Iterator[Tuple[str, bytes]]) -> Optional[Tuple[str, bytes]]:
+        """Get the next member of a streamed tarball, None past the last one or a damaged one."""
+        return next(members, None)
+
+    def _spool_tar(self) -> None:
+        """Copy the supported members of the tarball to the in-memory spool, in one pass."""
+        spool = io.BytesIO()
+        try:
+            for name, data in self._stream_tar():
+                self._add_member(name, (spool.tell(), len(data)))
+                spool.write(data)
+        except BaseException:
+            self._members.clear()
+            self._rel_paths.clear()
+            raise
+        self._spool = spool
+
+    def iter_files(self) -> Iterator[Tuple[str, str]]:
+        """
+        Yield the supported files of the archive as they are read.
+
+        A zip archive, or a tarball already listed, yields what list_files
+        lists. Otherwise the tarball is streamed in archive order, and
+        read_file returns each member until the next one is yielded, so a
+        bundle formats its first block before the rest is decompressed. A
+        name stored twice is yielded each time, with a warning, since a
+        stream cannot know that a later copy follows.
+
+        Yields:
+            Tuples (file_path, relative_path)
+        """
+        if self.is_zip or self._spool is not None:
+            yield from self.list_files()
+            return
+
+        members = self._stream_tar()
+        seen = set()
+        try:
+            while True:
+                entry = self._next_streamed(members)
+                if entry is None:
+                    return
+                name, data = entry
+                file_path, rel_path = self._file_path(name)
+                if file_path in seen:
+                    logger.warning(f"Archive {self.path} stores {name} more than once, bundling every copy")
+                seen.add(file_path)
+                with self._lock:
+                    self._current = (file_path, data)
+                yield file_path, rel_path
+        finally:
+            members.close()
+            with self._lock:
+                self._current = None
+
+    @with_error_handling("archive_source", return_on_error=[])
+    def list_files(self) -> List[Tuple[str, str]]:
+        """
+        List the supported files of the archive, sorted by relative path.
+
+        Returns:
+            list: List of tuples (file_path, relative_path)
+        """
+        with self._lock:
+            if self.is_zip:
+                self._members.clear()
+                self._rel_paths.clear()
+                for info in self._zip.infolist():
+                    if not info.is_dir() and _is_supported_member(info.filename):
+                        self._add_member(info.filename, info)
+            elif self._spool is None:
+                self._spool_tar()
+            files = sorted(self._rel_paths.items(), key=lambda x: x[1])
+
+        logger.info(f"Found {len(files)} supported files in {self.path}")
+        return files
+
+    def _read_spooled(self, offset: int, length: int) -> bytes:
+        """Read a tar member from the spool."""
+        with self._lock:
+            self._spool.seek(offset)
+            return self._spool.read(length)
+
+    def read_file(self, file_path: str) -> Tuple[str, Optional[str]]:
+        """
+        Read a listed file with encoding fallback.
+
+        Args:
+            file_path: A file path returned by list_files or iter_files
+
+        Returns:
+            A tuple of (file_content, error_message)
+        """
+        with self._lock:
+            current = self._current
+        if current is not None and current[0] == file_path:
+            return decode_with_fallback(current[1], file_path)
+
+        member = self._members.get(file_path)
+        if member is None:
+            error_msg = f"Error reading file {file_path}: not listed in {self.path}"
+            logger.error(error_msg)
+            return "", error_msg
+
+        try:
+            if self.is_zip:
+                with self._lock:
+                    data = self._zip.read(member)
+            else:
+                data = self._read_spooled(*member)
+        except Exception as e:
+            error_msg = f"Error reading file {file_path}: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            return "", error_msg
+        return decode_with_fallback(data, file_path)
+
+    def close(self) -> None:
+        """Close the archive."""
+        with self._lock:
+            if self._zip is not None:
+                self._zip.close()
+                self._zip = None
+            if self._spool is not None:
+                self._spool.close()
+                self._spool = None
+            self._current = None
+
+    def __enter__(self) -> "ArchiveSource":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+@with_error_handling("archive_source", return_on_error=None)
+def open_archive_source(path: str) -> ArchiveSource:
+    """
+    Open an archive as a file source.
+
+    Args:
+        path: Path to the archive file
+
+    Returns:
+        The archive source, or None if the archive could not be opened
+    """
+    return ArchiveSource(path)
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Asyncio API of the Code Processor application, for embedding in services.
+
+    async for file_path, rel_path in ascan(root):
+        ...
+    async for chunk in abundle(files):
+        await response.write(chunk.encode("utf-8"))
+
+Walking, reading and formatting block, so they run on a bounded thread
+pool a batch at a time and never on the event loop. The next batch is only
+produced when the consumer asks for it, so a slow consumer holds the work
+back instead of letting results pile up in memory. Cancelling the consuming
+task stops the work after the batch in flight. Many concurrent requests
+share the pool's threads and take turns batch by batch, which bounds the
+threads and memory they use and leaves the event loop free.
+
+Close early exits deterministically with ``contextlib.aclosing``.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from itertools import islice
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar, Union
+
+from logger import get_logger
+from app_config import AppConfig
+from error_handler import log_deferred_errors
+from block_cache import BlockCache
+from file_processor import FileReader, iter_directory_files, iter_formatted_blocks
+from file_utils import read_file_with_fallback
+from tree_summary import format_tree_summary
+from timed_reader import make_timed_reader
+
+# Get module logger
+logger = get_logger(__name__)
+
+# Entries produced per executor call while scanning
+SCAN_BATCH = 256
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Get the thread pool shared by the async API, created on first use.
+
+    Returns:
+        The pool, sized by the async_api.workers setting
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = AppConfig.get("async_api", "workers", 4)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="async_api")
+            logger.info(f"Started the async API pool with {workers} threads")
+        return _executor
+
+async def iterate_in_executor(iterator: Iterator[T], batch_size: int,
+                              executor: Optional[Executor] = None) -> AsyncIterator[T]:
+    """
+    Consume a blocking iterator from the event loop, a batch at a time.
+
+    Args:
+        iterator: The blocking iterator, such as a generator walking a tree
+        batch_size: Items taken per executor call
+        executor: The pool running the iterator (defaults to get_executor())
+
+    Yields:
+        The items of the iterator, in order
+    """
+    executor = executor or get_executor()
+    loop = asyncio.get_running_loop()
+    # A generator runs in one thread at a time; closing it waits for the batch in flight
+    lock = threading.Lock()
+
+    def next_batch() -> List[T]:
+        with lock:
+            try:
+                return list(islice(iterator, batch_size))
+            finally:
+                # Pool threads are shared by requests; errors handled here must not reach the next one
+                log_deferred_errors("Async API batch")
+
+    def close() -> None:
+        with lock:
+            close_iterator = getattr(iterator, "close", None)
+            if close_iterator is not None:
+                close_iterator()
+
+    try:
+        while True:
+            batch = await loop.run_in_executor(executor, next_batch)
+            if not batch:
+                return
+            for item in batch:
+                yield item
+    finally:
+        # Releases the open directory handles of an abandoned walk
+        try:
+            executor.submit(close)
+        except RuntimeError:
+            # The pool is shut down; the iterator is closed when collected
+            pass
+
+async def ascan(root: str, executor: Optional[Executor] = None) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Walk a directory for code files without blocking the event loop.
+
+    Files come out in relative path order while the walk goes on, as with
+    iter_directory_files.
+
+    Args:
+        root: The directory to walk
+        executor: The pool running the walk (defaults to get_executor())
+
+    Yields:
+        Tuples (file_path, relative_path)
+
+    Raises:
+        NotADirectoryError: If the root is not a directory
+    """
+    executor = executor or get_executor()
+    if not await asyncio.get_running_loop().run_in_executor(executor, os.path.isdir, root):
+        raise NotADirectoryError(f"Not a directory: {root}")
+    async for entry in iterate_in_executor(iter_directory_files(root), SCAN_BATCH, executor):
+        yield entry
+
+def _iter_chunks(blocks: Iterable[str], chunk_chars: int) -> Iterator[str]:
+    """Join blocks into chunks of at least chunk_chars characters, the last one excepted."""
+    parts: List[str] = []
+    chars = 0
+    for block in blocks:
+        parts.append(block)
+        chars += len(block)
+        if chars >= chunk_chars:
+            yield "".join(parts)
+            parts, chars = [], 0
+    if parts:
+        yield "".join(parts)
+
+async def abundle(files: Union[Iterable[Tuple[str, str]], AsyncIterable[Tuple[str, str]]],
+                  reader: FileReader = read_file_with_fallback,
+                  block_cache: Optional[BlockCache] = None,
+                  tree_summary: Optional[bool] = None,
+                  chunk_chars: Optional[int] = None,
+                  executor: Optional[Executor] = None) -> AsyncIterator[str]:
+    """
+    Format files for AI platforms without blocking the event loop.
+
+    The chunks join into the same bundle format_files_for_ai returns.
+
+    Args:
+        files: Tuples (file_path, relative_path), or an async iterable of
+            them such as ascan(); an async iterable is collected first,
+            since the formatting threads must not wait on the event loop
+        reader: Function reading a file path into (content, error)
+        block_cache: Optional cache of formatted blocks, shared by requests
+        tree_summary: Whether to start with a directory tree summary
+            (defaults to the files.tree_summary setting)
+        chunk_chars: Characters per chunk (defaults to the async_api.chunk_kb setting)
+        executor: The pool doing the reads (defaults to get_executor())
+
+    Yields:
+        str: Consecutive pieces of the bundle
+    """
+    if isinstance(files, AsyncIterable):
+        files = [entry async for entry in files]
+    if tree_summary is None:
+        tree_summary = AppConfig.get("files", "tree_summary", False)
+    if chunk_chars is None:
+        chunk_chars = AppConfig.get("async_api", "chunk_kb", 64) * 1024
+    executor = executor or get_executor()
+
+    if tree_summary:
+        if isinstance(files, Sequence):
+            if not files:
+                return
+            yield await asyncio.get_running_loop().run_in_executor(executor, format_tree_summary, files)
+        else:
+            logger.warning("Tree summary skipped, streamed files are not known in advance")
+    blocks = (block for _, block in iter_formatted_blocks(files, reader=make_timed_reader(reader),
+                                                           block_cache=block_cache))
+    async for chunk in iterate_in_executor(_iter_chunks(blocks, chunk_chars), 1, executor):
+        yield chunk
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batch bundling of many repositories for the Code Processor application.
+
+A manifest lists repository roots and the output path of each bundle.
+Every root is scanned and formatted in a process pool, one repository per
+task, so the total time scales with the number of cores instead of being
+bound to one interpreter. Workers start warm: a root keeps its last scan
+and formatted blocks in the cache (see recent_projects). On the next run
+they are revalidated by modification time, and only changed files are
+read again. The run ends with a summary of the timings and sizes per
+repository.
+
+The manifest is a JSON list of entries:
+
+    [
+        {"root": "repos/api", "output": "bundles/api.md.gz"},
+        {"root": "repos/web", "output": "bundles/web.md", "include": ["*.ts"], "exclude": ["dist/*"]}
+    ]
+
+Relative paths are relative to the manifest. Run it as:
+
+    python batch.py manifest.json [--jobs 8]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from logger import get_logger
+from app_config import AppConfig
+from error_handler import disable_dialogs, pop_deferred_errors
+from block_cache import BlockCache
+from file_processor import iter_formatted_blocks, process_directory
+from tree_summary import format_size, format_tree_summary
+from timed_reader import get_stamp_function, make_timed_reader
+from compression import atomic_output
+from recent_projects import load_blocks, load_scan, save_blocks, save_scan
+from cli import filter_files, iter_bundle_blocks, EXIT_OK, EXIT_ERROR
+
+# Get module logger
+logger = get_logger(__name__)
+
+class BatchEntry(NamedTuple):
+    """A repository of the manifest and where its bundle goes."""
+    root: str
+    output: str
+    include: Tuple[str, ...] = ()
+    exclude: Tuple[str, ...] = ()
+
+class BatchResult(NamedTuple):
+    """Outcome of bundling one repository."""
+    root: str
+    files: int  # Files bundled
+    size: int  # Bytes of the output file
+    scan_seconds: float
+    bundle_seconds: float
+    warm_scan: bool  # Whether the saved scan was reused
+    warm_blocks: int  # Saved blocks reused
+    error: Optional[str]
+
+def load_manifest(path: str) -> List[BatchEntry]:
+    """
+    Read a batch manifest.
+
+    Args:
+        path: The manifest file, see the module documentation
+
+    Returns:
+        list: The entries, in order
+
+    Raises:
+        OSError: If the manifest cannot be read
+        ValueError: If the manifest is not a list of entries with a root and an output
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    if not isinstance(data, list):
+        raise ValueError("the manifest must be a JSON list of entries")
+    base = os.path.dirname(os.path.abspath(path))
+    entries = []
+    for number, item in enumerate(data, 1):
+        if not isinstance(item, dict) or not item.get("root") or not item.get("output"):
+            raise ValueError(f"entry {number} needs a root and an output")
+        entries.append(BatchEntry(
+            os.path.join(base, os.path.expanduser(item["root"])),
+            os.path.join(base, os.path.expanduser(item["output"])),
+            tuple(item.get("include", ())),
+            tuple(item.get("exclude", ()))
+        ))
+    return entries
+
+def _init_worker(verbose: bool) -> None:
+    """Set up a pool process: errors are collected, not shown, and the log stays quiet unless asked."""
+    disable_dialogs()
+    logging.getLogger().setLevel(logging.INFO if verbose else logging.CRITICAL)
+
+def _write_blocks(output: str, blocks: Iterable[str]) -> Tuple[int, int]:
+    """
+    Write blocks to an output file, compressed by extension.
+
+    The file is only replaced once every block is written, so a failing
+    root leaves its previous bundle, or none, instead of a partial one.
+
+    Returns:
+        Tuple of the number of blocks written and the file size
+    """
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    count = 0
+    with atomic_output(output) as stream:
+        for block in blocks:
+            stream.write(block)
+            count += 1
+    return count, os.path.getsize(output)
+
+def bundle_repository(entry: BatchEntry, tree_summary: bool) -> BatchResult:
+    """
+    Scan and format one repository of the manifest; runs in a pool process.
+
+    Plain directories start from their saved scan and blocks when these
+    are still current, and save them back for the next run. Archives and
+    ``repo@rev`` roots are bundled as by the command line.
+
+    Args:
+        entry: The repository and its output
+        tree_summary: Whether to start the bundle with a directory tree summary
+
+    Returns:
+        BatchResult: Timings and sizes, or the error that stopped the repository
+    """
+    started = time.perf_counter()
+    scanned = started
+    warm_scan = False
+    warm_blocks = 0
+    try:
+        if os.path.isdir(entry.root):
+            scan = load_scan(entry.root)
+            warm_scan = scan is not None
+            table = scan[0] if scan is not None else process_directory(entry.root)
+            files = filter_files(table, entry.include, entry.exclude)
+            scanned = time.perf_counter()
+
+            block_cache = BlockCache(AppConfig.get("batch", "block_cache_mb", 64) * 1024 * 1024)
+            reader = make_timed_reader()
+            warm_blocks = load_blocks(entry.root, block_cache, get_stamp_function(reader))
+            header = [format_tree_summary(files)] if tree_summary and files else []
+            blocks = (block for _, block in iter_formatted_blocks(files, reader=reader, block_cache=block_cache))
+            written, size = _write_blocks(entry.output, chain(header, blocks))
+            bundled = written - len(header)
+
+            if not warm_scan and table:
+                save_scan(entry.root, table)
+            save_blocks(entry.root, block_cache, files)
+        else:
+            scanned = time.perf_counter()
+            written, size = _write_blocks(entry.output, iter_bundle_blocks(entry.root, entry.include,
+                                                                            entry.exclude, tree_summary))
+            # Archive and revision members are only known once read; the
+            # tree summary, when asked, is the first block and not a file
+            bundled = written - 1 if tree_summary and written else written
+        errors = pop_deferred_errors()
+        error = errors[0] if errors else None
+    except Exception as e:
+        logger.error(f"Bundling {entry.root} failed: {str(e)}", exc_info=True)
+        pop_deferred_errors()
+        bundled, size, error = 0, 0, str(e)
+    return BatchResult(entry.root, bundled, size, scanned - started, time.perf_counter() - scanned,
+                       warm_scan, warm_blocks, error)
+
+def get_worker_count(workers: Optional[int], entries: int) -> int:
+    """
+    Get the size of the process pool.
+
+    Args:
+        workers: Requested processes, None for the batch.workers setting
+            and 0 for one per CPU
+        entries: Repositories to bundle; no more processes are started
+
+    Returns:
+        int: The number of processes
+    """
+    if workers is None:
+        workers = AppConfig.get("batch", "workers", 0)
+    return min(workers or os.cpu_count() or 1, max(entries, 1))
+
+def run_batch(entries: Sequence[BatchEntry], workers: Optional[int] = None,
+              tree_summary: Optional[bool] = None, verbose: bool = False) -> List[BatchResult]:
+    """
+    Bundle every repository of a manifest in a process pool.
+
+    Args:
+        entries: The repositories and their outputs
+        workers: Processes in the pool (defaults to the batch.workers
+            setting; 0 uses one per CPU)
+        tree_summary: Whether to start bundles with a directory tree
+            summary (defaults to the files.tree_summary setting)
+        verbose: Whether the workers log progress to stderr
+
+    Returns:
+        list: The result of every repository, in manifest order
+    """
+    workers = get_worker_count(workers, len(entries))
+    if tree_summary is None:
+        tree_summary = AppConfig.get("files", "tree_summary", False)
+    logger.info(f"Bundling {len(entries)} repositories with {workers} workers")
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(verbose,)) as pool:
+        return list(pool.map(bundle_repository, entries, [tree_summary] * len(entries)))
+
+def format_summary(results: Sequence[BatchResult], elapsed: float, workers: int) -> str:
+    """
+    Format the summary of a batch run.
+
+    Args:
+        results: The results of the run
+        elapsed: Wall time of the run in seconds
+        workers: Processes in the pool
+
+    Returns:
+        str: A table of the repositories followed by the totals
+    """
+    width = max([len("Repository")] + [len(result.root) for result in results])
+    lines = [f"{'Repository':<{width}}  {'Files':>7}  {'Size':>9}  {'Scan':>7}  {'Bundle':>7}  Cache"]
+    for result in results:
+        if result.error:
+            cache = f"FAILED: {result.error}"
+        else:
+            cache = ("warm scan" if result.warm_scan else "cold scan") + f", {result.warm_blocks} blocks"
+        lines.append(f"{result.root:<{width}}  {result.files:>7}  {format_size(result.size):>9}  "
+                     f"{result.scan_seconds:>6.2f}s  {result.bundle_seconds:>6.2f}s  {cache}")
+    busy = sum(result.scan_seconds + result.bundle_seconds for result in results)
+    failed = sum(1 for result in results if result.error)
+    lines.append(
+        f"{len(results)} repositories, {failed} failed, {sum(result.files for result in results)} files, "
+        f"{format_size(sum(result.size for result in results))} in {elapsed:.1f}s "
+        f"with {workers} workers ({busy / elapsed if elapsed else 0:.1f}x parallel)"
+    )
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Bundle many repositories in parallel from a manifest.")
+    parser.add_argument("manifest", help="JSON list of {root, output, include, exclude} entries")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="worker processes (default: the batch.workers setting, 0 for one per CPU)")
+    parser.add_argument("--tree-summary", action=argparse.BooleanOptionalAction, default=None,
+                        help="start bundles with a directory tree summary (default: the files.tree_summary setting)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log progress to stderr")
+    args = parser.parse_args(argv)
+
+    disable_dialogs()
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.CRITICAL)
+    try:
+        entries = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        parser.error(f"invalid manifest {args.manifest}: {e}")
+
+    started = time.perf_counter()
+    results = run_batch(entries, args.jobs, args.tree_summary, args.verbose)
+    print(format_summary(results, time.perf_counter() - started, get_worker_count(args.jobs, len(entries))))
+    for result in results:
+        if result.error:
+            print(f"{parser.prog}: error: {result.root}: {result.error}", file=sys.stderr)
+    return EXIT_ERROR if any(result.error for result in results) else EXIT_OK
+
+if __name__ == "__main__":
+    sys.exit(main())
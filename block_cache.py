@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache of formatted file blocks for the Code Processor application.
+"""
+
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Iterable, NamedTuple, Optional, Tuple
+
+from logger import get_logger
+
+# Get module logger
+logger = get_logger(__name__)
+
+# File identity used to validate cached blocks: (mtime in ns, size)
+FileStamp = Tuple[int, int]
+
+def get_file_stamp(file_path: str) -> Optional[FileStamp]:
+    """
+    Get the modification stamp of a file on disk.
+
+    Args:
+        file_path: The path to the file
+
+    Returns:
+        The (mtime_ns, size) stamp, or None if the path is not a file on disk
+        (for example a git or archive source path)
+    """
+    try:
+        stat = os.stat(file_path)
+    except (OSError, ValueError):
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+class CachedBlock(NamedTuple):
+    """A formatted file block and where the file content sits inside it."""
+    rel_path: str
+    block: str
+    body_start: int
+    body_end: int
+    error: Optional[str]
+    stamp: Optional[FileStamp]
+
+    @property
+    def content(self) -> str:
+        """The file content, or an empty string if it could not be read."""
+        return "" if self.error else self.block[self.body_start:self.body_end]
+
+class BlockCache:
+    """
+    Thread-safe, size-bounded cache of formatted blocks keyed by file path.
+
+    Blocks of files on disk are only reused while the file keeps the stamp
+    it had when it was read. Blocks of other sources have no stamp and stay
+    valid until the cache is cleared, which happens when the source closes.
+    Least recently used blocks are evicted beyond ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """
+        Create an empty cache.
+
+        Args:
+            max_bytes: Approximate memory budget, in characters of cached blocks
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._blocks: "OrderedDict[str, CachedBlock]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def is_full(self) -> bool:
+        """Check if the cache reached its memory budget."""
+        return self.size >= self.max_bytes
+
+    def lookup(self, file_path: str, rel_path: str,
+               get_stamp: Callable[[str], Optional[FileStamp]] = get_file_stamp) -> Optional[CachedBlock]:
+        """
+        Get the cached block of a file if it is still valid.
+
+        Args:
+            file_path: The path of the file
+            rel_path: The relative path shown in the block header
+            get_stamp: Function stamping the file on disk, such as one
+                bounded by read deadlines (see timed_reader)
+
+        Returns:
+            The cached block, or None on a miss
+        """
+        with self._lock:
+            cached = self._blocks.get(file_path)
+        if cached is None or cached.rel_path != rel_path:
+            return None
+        if cached.stamp is not None and get_stamp(file_path) != cached.stamp:
+            return None
+        with self._lock:
+            if file_path in self._blocks:
+                self._blocks.move_to_end(file_path)
+        return cached
+
+    def store(self, file_path: str, cached: CachedBlock) -> None:
+        """
+        Cache the block of a file.
+
+        Args:
+            file_path: The path of the file
+            cached: The block to cache
+        """
+        with self._lock:
+            previous = self._blocks.pop(file_path, None)
+            if previous is not None:
+                self.size -= len(previous.block)
+            self._blocks[file_path] = cached
+            self.size += len(cached.block)
+            while self.size > self.max_bytes and len(self._blocks) > 1:
+                _, evicted = self._blocks.popitem(last=False)
+                self.size -= len(evicted.block)
+
+    def save(self, path: str, file_paths: Iterable[str], max_bytes: int) -> int:
+        """
+        Save the cached blocks of some files on disk, to warm a later session.
+
+        Only blocks of files on disk are saved, since only those can be
+        revalidated when they are loaded back.
+
+        Args:
+            path: The file to write; it is replaced atomically
+            file_paths: The files whose blocks are saved, most wanted first
+            max_bytes: Characters of blocks saved at most
+
+        Returns:
+            int: Number of blocks saved
+        """
+        entries = []
+        size = 0
+        with self._lock:
+            for file_path in file_paths:
+                cached = self._blocks.get(file_path)
+                if cached is None or cached.stamp is None or cached.error:
+                    continue
+                size += len(cached.block)
+                if size > max_bytes:
+                    break
+                entries.append([file_path, *cached])
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(zlib.compress(json.dumps(entries).encode("utf-8"), 1))
+        os.replace(temp_path, path)
+        logger.info(f"Saved {len(entries)} cached blocks to {path}")
+        return len(entries)
+
+    def load(self, path: str, get_stamp: Callable[[str], Optional[FileStamp]] = get_file_stamp) -> int:
+        """
+        Load blocks saved with save, keeping those whose file is unchanged.
+
+        Args:
+            path: The saved file
+            get_stamp: Function stamping the files on disk, see lookup
+
+        Returns:
+            int: Number of blocks loaded
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If the file is not a saved cache
+        """
+        with open(path, "rb") as file:
+            entries = json.loads(zlib.decompress(file.read()))
+        loaded = 0
+        for file_path, rel_path, block, body_start, body_end, error, stamp in entries:
+            # Revalidate by modification time and size, as lookup does
+            stamp = tuple(stamp)
+            if get_stamp(file_path) != stamp:
+                continue
+            self.store(file_path, CachedBlock(rel_path, block, body_start, body_end, error, stamp))
+            loaded += 1
+        logger.info(f"Loaded {loaded} of {len(entries)} saved blocks from {path}")
+        return loaded
+
+    def clear(self) -> None:
+        """Drop every cached block."""
+        with self._lock:
+            self._blocks.clear()
+            self.size = 0
+        logger.debug("Block cache cleared")
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Spill-to-disk bundle buffer for the Code Processor application.
+
+A processed bundle is kept as UTF-8 in a spooled temporary file: it stays
+in memory up to a configurable ceiling and moves to a temporary file on
+disk beyond it, so big repositories do not push the app into swap.
+Consumers stream it back in chunks instead of holding copies of the whole
+bundle as Python strings.
+"""
+
+import codecs
+import sys
+import tempfile
+import threading
+from typing import Callable, Iterator, List, NamedTuple, Optional, TextIO
+
+from app_config import AppConfig
+from logger import get_logger
+
+# Get module logger
+logger = get_logger(__name__)
+
+# Bytes decoded per chunk when streaming the bundle back
+READ_CHUNK_SIZE = 1024 * 1024
+
+def get_peak_rss() -> Optional[int]:
+    """
+    Get the peak resident set size of the process.
+
+    Returns:
+        The peak RSS in bytes, or None where it is not available
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, in kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+class BufferedFile(NamedTuple):
+    """Where the block of a file sits in the bundle, in bytes."""
+    rel_path: str
+    offset: int
+    length: int
+
+class BundleBuffer:
+    """
+    A bundle held in memory up to a ceiling and on disk beyond it.
+
+    Text is appended with ``write`` or, for file blocks, ``add_block``,
+    which also records the byte range of the block. Reading never moves the
+    append position, so a bundle can be streamed while it is still growing,
+    and from several threads at once (a save job and a clipboard copy).
+
+    The memory ceiling covers the bundle alone. The block cache and the
+    clipboard, which holds a whole copy of bundles up to clipboard.max_mb,
+    have their own budgets on top of it.
+    """
+
+    def __init__(self, max_memory: Optional[int] = None) -> None:
+        """
+        Create an empty buffer.
+
+        Args:
+            max_memory: Bytes kept in memory before spilling to a temporary file
+                (defaults to the files.bundle_memory_mb setting)
+        """
+        if max_memory is None:
+            max_memory = AppConfig.get("files", "bundle_memory_mb", 64) * 1024 * 1024
+        self.max_memory = max_memory
+        self.size = 0
+        self.files: List[BufferedFile] = []
+        self._file = tempfile.SpooledTemporaryFile(max_size=max_memory, mode="w+b",
+                                                   prefix="code_processor_")
+        # Every access seeks first, so seek and read or write go together
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Size of the bundle in bytes."""
+        return self.size
+
+    def __bool__(self) -> bool:
+        return self.size > 0
+
+    def __enter__(self) -> "BundleBuffer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def spilled(self) -> bool:
+        """Whether the bundle outgrew the memory ceiling and lives on disk."""
+        return bool(getattr(self._file, "_rolled", False))
+
+    def write(self, text: str) -> int:
+        """
+        Append text to the bundle.
+
+        Args:
+            text: The text to append
+
+        Returns:
+            int: Number of bytes written
+        """
+        data = text.encode("utf-8")
+        with self._lock:
+            was_spilled = self.spilled
+            self._file.seek(self.size)
+            self._file.write(data)
+            self.size += len(data)
+        if self.spilled and not was_spilled:
+            logger.info(f"Bundle exceeded {self.max_memory} bytes, spilled to a temporary file")
+        return len(data)
+
+    def add_block(self, rel_path: str, block: str) -> BufferedFile:
+        """
+        Append the formatted block of a file and record its position.
+
+        Args:
+            rel_path: The relative path of the file
+            block: The formatted block
+
+        Returns:
+            BufferedFile: The byte range of the block
+        """
+        offset = self.size
+        entry = BufferedFile(rel_path, offset, self.write(block))
+        self.files.append(entry)
+        return entry
+
+    def iter_bytes(self, start: int = 0, end: Optional[int] = None,
+                   chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Stream a byte range of the bundle.
+
+        Args:
+            start: First byte
+            end: End of the range (defaults to the end of the bundle)
+            chunk_size: Bytes per chunk
+
+        Yields:
+            bytes: Consecutive chunks of the range
+        """
+        position = start
+        end = self.size if end is None else min(end, self.size)
+        while position < end:
+            with self._lock:
+                self._file.seek(position)
+                chunk = self._file.read(min(chunk_size, end - position))
+            if not chunk:
+                return
+            position += len(chunk)
+            yield chunk
+
+    def iter_text(self, start: int = 0, end: Optional[int] = None,
+                  chunk_size: int = READ_CHUNK_SIZE) -> Iterator[str]:
+        """
+        Stream a byte range of the bundle as text.
+
+        Characters cut by a chunk boundary are decoded with the next chunk.
+
+        Args:
+            start: First byte, at a character boundary
+            end: End of the range (defaults to the end of the bundle)
+            chunk_size: Bytes per chunk
+
+        Yields:
+            str: Consecutive pieces of the text
+        """
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        for chunk in self.iter_bytes(start, end, chunk_size):
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    def read_text(self, start: int = 0, end: Optional[int] = None) -> str:
+        """
+        Read a byte range of the bundle as text, such as a preview.
+
+        Args:
+            start: First byte, at a character boundary
+            end: End of the range (defaults to the end of the bundle)
+
+        Returns:
+            str: The text of the range
+        """
+        return "".join(self.iter_text(start, end))
+
+    def getvalue(self) -> str:
+        """Get the whole bundle as one string, for consumers that need it."""
+        return self.read_text()
+
+    def write_to(self, stream: TextIO, progress: Optional[Callable[[int, int], None]] = None) -> None:
+        """
+        Stream the bundle to a text stream.
+
+        Args:
+            stream: The stream receiving the bundle, such as a file from open_output
+            progress: Optional callback called with (bytes written, total bytes) after every chunk
+        """
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        done = 0
+        for chunk in self.iter_bytes():
+            stream.write(decoder.decode(chunk))
+            done += len(chunk)
+            if progress is not None:
+                progress(done, self.size)
+        stream.write(decoder.decode(b"", final=True))
+
+    def log_memory(self) -> None:
+        """Log where the bundle lives and the peak RSS of the process."""
+        location = "a temporary file" if self.spilled else "memory"
+        peak = get_peak_rss()
+        peak_text = f", peak RSS {peak / (1024 * 1024):.1f} MB" if peak is not None else ""
+        logger.info(f"Bundle of {self.size} bytes and {len(self.files)} files held in {location}{peak_text}")
+
+    def close(self) -> None:
+        """Release the buffer and delete its temporary file."""
+        with self._lock:
+            self._file.close()
+            self.size = 0
+        self.files = []
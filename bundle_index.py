@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Seekable bundle format for the Code Processor application.
+
+An indexed bundle is a regular bundle, readable as text, followed by a
+footer index. The index is an HTML comment holding JSON with the byte
+offset, length, language and content hash of every file, and the last line
+of the bundle is a fixed-width comment with the byte offset of the index.
+Readers seek to the end, then to the index, then straight to any file.
+
+A bundle already built in a BundleBuffer is saved as it is, byte for byte,
+with the index built from the positions of its blocks; that way the saved
+file is the bundle that was copied, tree summary included.
+"""
+
+import hashlib
+import json
+import os
+from typing import BinaryIO, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from logger import get_logger
+from helpers import get_file_language
+from file_utils import read_file_with_fallback
+from file_processor import (
+    FileReader, choose_fence, format_file_header, format_file_body, format_file_footer,
+    iter_file_contents, split_file_block
+)
+from compression import atomic_path, get_compression
+from bundle_buffer import BundleBuffer
+
+# Get module logger
+logger = get_logger(__name__)
+
+INDEX_VERSION = 1
+INDEX_START = "<!-- code-processor-index\n"
+INDEX_END = "\n-->\n"
+TRAILER_FORMAT = "<!-- code-processor-index-offset: {offset:016d} -->\n"
+TRAILER_PREFIX = b"<!-- code-processor-index-offset: "
+TRAILER_SIZE = len(TRAILER_FORMAT.format(offset=0).encode("ascii"))
+
+class IndexedFile(NamedTuple):
+    """Index entry of one file in an indexed bundle."""
+    path: str
+    offset: int
+    length: int
+    language: str
+    sha1: Optional[str]
+    error: Optional[str]
+
+class IndexedBundleWriter:
+    """
+    Writes bundle blocks to a binary file and records where each file is.
+    """
+
+    def __init__(self, fileobj: BinaryIO) -> None:
+        """
+        Create a writer.
+
+        Args:
+            fileobj: The binary file receiving the bundle
+        """
+        self._file = fileobj
+        self.position = 0
+        self.entries: List[IndexedFile] = []
+
+    def _write(self, text: str) -> bytes:
+        """Write text and return its encoded bytes."""
+        data = text.encode("utf-8")
+        self._file.write(data)
+        self.position += len(data)
+        return data
+
+    def write(self, text: str) -> None:
+        """
+        Write text outside file blocks, such as a tree summary.
+
+        Args:
+            text: The text to write
+        """
+        self._write(text)
+
+    def _add_block(self, rel_path: str, header: str, body: str, footer: str,
+                   language: str, error: Optional[str]) -> IndexedFile:
+        """Write the parts of a file block and index its body."""
+        self._write(header)
+        offset = self.position
+        data = self._write(body)
+        self._write(footer)
+
+        entry = IndexedFile(
+            path=rel_path,
+            offset=offset,
+            length=len(data),
+            language=language,
+            sha1=None if error else hashlib.sha1(data).hexdigest(),
+            error=error
+        )
+        self.entries.append(entry)
+        return entry
+
+    def add_file(self, file_path: str, rel_path: str, content: str, error: Optional[str]) -> IndexedFile:
+        """
+        Write the block of a file and index it.
+
+        Args:
+            file_path: The path used to detect the file language
+            rel_path: The relative path shown in the block header
+            content: The file content
+            error: Read error message, if the file could not be read
+
+        Returns:
+            The index entry of the file
+        """
+        body = format_file_body(content, error)
+        fence = choose_fence(body)
+        return self._add_block(rel_path, format_file_header(file_path, rel_path, fence), body,
+                               format_file_footer(fence), get_file_language(file_path), error)
+
+    def add_block(self, rel_path: str, block: str) -> IndexedFile:
+        """
+        Write a block already formatted, as format_file_block makes them, and index it.
+
+        Args:
+            rel_path: The relative path of the file
+            block: The formatted block
+
+        Returns:
+            The index entry of the file
+
+        Raises:
+            ValueError: If the text is not a file block
+        """
+        header, body, error = split_file_block(block)
+        return self._add_block(rel_path, header, body, block[len(header) + len(body):],
+                               get_file_language(rel_path), error)
+
+    def finish(self) -> None:
+        """Write the footer index and trailer."""
+        index_offset = self.position
+        index = {
+            "version": INDEX_VERSION,
+            "files": [entry._asdict() for entry in self.entries],
+        }
+        self._write(INDEX_START + json.dumps(index, ensure_ascii=False) + INDEX_END)
+        self._write(TRAILER_FORMAT.format(offset=index_offset))
+        logger.info(f"Wrote bundle index with {len(self.entries)} files")
+
+def write_indexed_bundle(path: str, files: Iterable[Tuple[str, str]],
+                         reader: FileReader = read_file_with_fallback) -> int:
+    """
+    Write files as an indexed bundle.
+
+    Args:
+        path: The output path; it must not be compressed, so it stays seekable
+        files: Iterable of tuples (file_path, relative_path)
+        reader: Function reading a file path into (content, error)
+
+    Returns:
+        int: The number of files written
+    """
+    if get_compression(path):
+        raise ValueError(f"Indexed bundles cannot be compressed: {path}")
+
+    logger.info(f"Writing indexed bundle: {path}")
+    # A failed write leaves no partial bundle behind
+    with atomic_path(path) as temp_path, open(temp_path, "wb") as file:
+        writer = IndexedBundleWriter(file)
+        for entry in iter_file_contents(files, reader):
+            writer.add_file(*entry)
+        writer.finish()
+    return len(writer.entries)
+
+def write_indexed_buffer(path: str, buffer: BundleBuffer,
+                         progress: Optional[Callable[[int, int], None]] = None) -> int:
+    """
+    Save a bundle already built as an indexed bundle.
+
+    The bundle is copied as it is, text between blocks included, a block
+    at a time; no file is read again.
+
+    Args:
+        path: The output path; it must not be compressed, so it stays seekable
+        buffer: The built bundle, whose blocks were added with add_block
+        progress: Optional callback called with (bytes written, total bytes)
+
+    Returns:
+        int: The number of files written
+    """
+    if get_compression(path):
+        raise ValueError(f"Indexed bundles cannot be compressed: {path}")
+
+    logger.info(f"Saving indexed bundle: {path}")
+    total = buffer.size
+    with atomic_path(path) as temp_path, open(temp_path, "wb") as file:
+        writer = IndexedBundleWriter(file)
+        position = 0
+        for entry in list(buffer.files):
+            if entry.offset > position:
+                writer.write(buffer.read_text(position, entry.offset))
+            writer.add_block(entry.rel_path, buffer.read_text(entry.offset, entry.offset + entry.length))
+            position = entry.offset + entry.length
+            if progress is not None:
+                progress(position, total)
+        if total > position:
+            writer.write(buffer.read_text(position, total))
+        writer.finish()
+    return len(writer.entries)
+
+def has_bundle_index(path: str) -> bool:
+    """
+    Check if a saved bundle ends with a footer index.
+
+    Args:
+        path: The bundle path
+
+    Returns:
+        True if the bundle has an index, False otherwise
+    """
+    try:
+        with open(path, "rb") as file:
+            file.seek(0, os.SEEK_END)
+            if file.tell() < TRAILER_SIZE:
+                return False
+            file.seek(-TRAILER_SIZE, os.SEEK_END)
+            return file.read(TRAILER_SIZE).startswith(TRAILER_PREFIX)
+    except OSError:
+        return False
+
+class IndexedBundleReader:
+    """
+    Random access to the files of an indexed bundle.
+
+    Opening the bundle costs two seeks (trailer and index) and extracting a
+    file one more, whatever the size of the bundle.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open an indexed bundle and load its index.
+
+        Args:
+            path: The bundle path
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._entries = self._load_index()
+        except Exception:
+            self._file.close()
+            raise
+        self._by_path: Dict[str, IndexedFile] = {entry.path: entry for entry in self._entries}
+        logger.info(f"Opened indexed bundle {path} with {len(self._entries)} files")
+
+    def _load_index(self) -> List[IndexedFile]:
+        """Read the trailer, then the index it points to."""
+        self._file.seek(0, os.SEEK_END)
+        size = self._file.tell()
+        if size < TRAILER_SIZE:
+            raise ValueError(f"Not an indexed bundle: {self.path}")
+        self._file.seek(size - TRAILER_SIZE)
+        trailer = self._file.read(TRAILER_SIZE)
+        if not trailer.startswith(TRAILER_PREFIX):
+            raise ValueError(f"Not an indexed bundle: {self.path}")
+
+        index_offset = int(trailer[len(TRAILER_PREFIX):].split(b" ", 1)[0])
+        self._file.seek(index_offset)
+        index_text = self._file.read(size - TRAILER_SIZE - index_offset).decode("utf-8")
+        if not index_text.startswith(INDEX_START) or not index_text.endswith(INDEX_END):
+            raise ValueError(f"Corrupt bundle index: {self.path}")
+
+        index = json.loads(index_text[len(INDEX_START):-len(INDEX_END)])
+        if index.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported bundle index version {index.get('version')}: {self.path}")
+        return [IndexedFile(**entry) for entry in index["files"]]
+
+    def list_files(self) -> List[IndexedFile]:
+        """
+        List the files of the bundle, in bundle order.
+
+        Returns:
+            list: The index entries
+        """
+        return list(self._entries)
+
+    def get_entry(self, rel_path: str) -> IndexedFile:
+        """
+        Get the index entry of a file.
+
+        Args:
+            rel_path: The relative path of the file
+
+        Returns:
+            The index entry
+
+        Raises:
+            KeyError: If the file is not in the bundle
+        """
+        return self._by_path[rel_path]
+
+    def read_bytes(self, rel_path: str) -> bytes:
+        """
+        Extract the raw content of a file.
+
+        Args:
+            rel_path: The relative path of the file
+
+        Returns:
+            The UTF-8 encoded content
+        """
+        entry = self.get_entry(rel_path)
+        self._file.seek(entry.offset)
+        return self._file.read(entry.length)
+
+    def read_file(self, rel_path: str) -> str:
+        """
+        Extract the content of a file.
+
+        Args:
+            rel_path: The relative path of the file
+
+        Returns:
+            The file content (the error line for files that could not be read)
+        """
+        return self.read_bytes(rel_path).decode("utf-8")
+
+    def close(self) -> None:
+        """Close the bundle."""
+        self._file.close()
+
+    def __enter__(self) -> "IndexedBundleReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bundle manifests and delta bundles for the Code Processor application.
+
+Every produced bundle records a manifest with the hash of each file, and the
+file contents are kept in a small content-addressed store next to it. A
+delta bundle compares the current files against that manifest and emits only
+the added and removed file names plus unified diffs for modified files.
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import time
+import zlib
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from app_config import AppConfig
+from texts import TEXTS
+from logger import get_logger
+from file_utils import normalize_path, read_file_with_fallback
+from file_processor import (
+    FileReader, choose_fence, format_file_block, format_files_for_ai, iter_formatted_blocks, read_and_format_file
+)
+from error_handler import with_error_handling
+from block_cache import BlockCache
+from bundle_buffer import BundleBuffer
+from fanout import FanOutWriter
+from tree_summary import format_tree_summary
+
+# Get module logger
+logger = get_logger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+OBJECTS_DIRNAME = "objects"
+
+def get_bundle_cache_dir(directory: str) -> str:
+    """
+    Get the cache directory holding the manifest of a bundled directory.
+
+    Args:
+        directory: The bundled directory
+
+    Returns:
+        The cache directory path
+    """
+    cache_root = os.path.expanduser(AppConfig.get("paths", "cache_dir", "~/.code_processor"))
+    key = hashlib.sha1(os.path.abspath(normalize_path(directory)).encode("utf-8")).hexdigest()
+    return os.path.join(cache_root, "bundles", key)
+
+def hash_content(content: str) -> str:
+    """
+    Hash file content the way manifests record it.
+
+    Args:
+        content: The decoded file content
+
+    Returns:
+        The hex digest of the content
+    """
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+class BundleManifest:
+    """
+    Per-file content hashes of a bundle, with the contents stored for diffing.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        Create an empty manifest for a directory.
+
+        Args:
+            directory: The bundled directory
+        """
+        self.directory = normalize_path(directory)
+        self.cache_dir = get_bundle_cache_dir(directory)
+        self.objects_dir = os.path.join(self.cache_dir, OBJECTS_DIRNAME)
+        self.files: Dict[str, str] = {}
+        self.created: Optional[float] = None
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["BundleManifest"]:
+        """
+        Load the manifest of the last bundle produced for a directory.
+
+        Args:
+            directory: The bundled directory
+
+        Returns:
+            The manifest, or None if no bundle was recorded yet
+        """
+        manifest = cls(directory)
+        manifest_path = os.path.join(manifest.cache_dir, MANIFEST_FILENAME)
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable bundle manifest {manifest_path}: {str(e)}")
+            return None
+
+        manifest.files = dict(data.get("files", {}))
+        manifest.created = data.get("created")
+        logger.info(f"Loaded bundle manifest with {len(manifest.files)} files for {manifest.directory}")
+        return manifest
+
+    def _object_path(self, digest: str) -> str:
+        """Get the store path of a content hash."""
+        return os.path.join(self.objects_dir, digest)
+
+    def add(self, rel_path: str, content: str) -> str:
+        """
+        Record a file and store its content.
+
+        Args:
+            rel_path: The relative path of the file
+            content: The decoded file content
+
+        Returns:
+            The content hash
+        """
+        digest = hash_content(content)
+        self.files[rel_path] = digest
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            os.makedirs(self.objects_dir, exist_ok=True)
+            with open(object_path, "wb") as file:
+                file.write(zlib.compress(content.encode("utf-8")))
+        return digest
+
+    def get_content(self, rel_path: str) -> Optional[str]:
+        """
+        Get the stored content of a recorded file.
+
+        Args:
+            rel_path: The relative path of the file
+
+        Returns:
+            The content, or None if the file or its content is not stored
+        """
+        digest = self.files.get(rel_path)
+        if digest is None:
+            return None
+        try:
+            with open(self._object_path(digest), "rb") as file:
+                return zlib.decompress(file.read()).decode("utf-8")
+        except (OSError, zlib.error) as e:
+            logger.warning(f"Stored content of {rel_path} is unavailable: {str(e)}")
+            return None
+
+    def save(self) -> bool:
+        """
+        Save the manifest and drop stored contents it no longer references.
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        self.created = time.time()
+        manifest_path = os.path.join(self.cache_dir, MANIFEST_FILENAME)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = manifest_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump({
+                    "directory": self.directory,
+                    "created": self.created,
+                    "files": self.files,
+                }, file)
+            os.replace(tmp_path, manifest_path)
+
+            referenced = set(self.files.values())
+            if os.path.isdir(self.objects_dir):
+                for name in os.listdir(self.objects_dir):
+                    if name not in referenced:
+                        os.remove(self._object_path(name))
+        except OSError as e:
+            logger.warning(f"Could not save bundle manifest for {self.directory}: {str(e)}")
+            return False
+
+        logger.info(f"Saved bundle manifest with {len(self.files)} files for {self.directory}")
+        return True
+
+@with_error_handling("formatting_code", return_on_error="")
+def format_and_record_bundle(directory: str, files: Sequence[Tuple[str, str]],
+                             reader: FileReader = read_file_with_fallback,
+                             block_cache: Optional[BlockCache] = None) -> str:
+    """
+    Format files for AI platforms and record the bundle manifest.
+
+    Args:
+        directory: The directory the files were found in
+        files: List of tuples (file_path, relative_path)
+        reader: Function reading a file path into (content, error)
+        block_cache: Optional cache of formatted blocks
+
+    Returns:
+        str: Formatted content, as produced by format_files_for_ai
+    """
+    manifest = BundleManifest(directory)
+    formatted_content = format_files_for_ai(files, on_file_read=manifest.add, reader=reader,
+                                            block_cache=block_cache)
+    if formatted_content:
+        manifest.save()
+    return formatted_content
+
+@with_error_handling("formatting_code", return_on_error=0)
+def write_and_record_bundle(directory: str, files: Sequence[Tuple[str, str]],
+                            output: Union[BundleBuffer, FanOutWriter],
+                            reader: FileReader = read_file_with_fallback,
+                            block_cache: Optional[BlockCache] = None,
+                            progress: Optional[Callable[[int, int], None]] = None) -> int:
+    """
+    Format files for AI platforms into a bundle buffer and record the bundle manifest.
+
+    Unlike format_and_record_bundle, the bundle is never held as one string.
+
+    Args:
+        directory: The directory the files were found in
+        files: List of tuples (file_path, relative_path)
+        output: The buffer receiving the formatted blocks, or a fan-out writer
+            feeding several outputs
+        reader: Function reading a file path into (content, error)
+        block_cache: Optional cache of formatted blocks
+        progress: Optional callback called with (files written, characters
+            written) after every file
+
+    Returns:
+        int: Number of files written
+    """
+    logger.info(f"Formatting {len(files)} files for AI platform")
+    if AppConfig.get("files", "tree_summary", False):
+        output.write(format_tree_summary(files))
+    manifest = BundleManifest(directory)
+    count = 0
+    written = 0
+    for rel_path, block in iter_formatted_blocks(files, on_file_read=manifest.add, reader=reader,
+                                                 block_cache=block_cache):
+        output.add_block(rel_path, block)
+        count += 1
+        written += len(block)
+        if progress is not None:
+            progress(count, written)
+    if count:
+        manifest.save()
+    return count
+
+def _unified_diff(rel_path: str, old: Optional[str], new: str) -> str:
+    """Build a unified diff between two versions of a file."""
+    old_lines = old.splitlines(keepends=True) if old is not None else []
+    new_lines = new.splitlines(keepends=True)
+    diff = ""
+    for line in difflib.unified_diff(
+        old_lines, new_lines,
+        fromfile="/dev/null" if old is None else f"a/{rel_path}",
+        tofile=f"b/{rel_path}"
+    ):
+        diff += line if line.endswith("\n") else line + "\n\\ No newline at end of file\n"
+    return diff
+
+@with_error_handling("delta_bundle", return_on_error="")
+def format_changes_since_last_bundle(directory: str, files: Sequence[Tuple[str, str]],
+                                     reader: FileReader = read_file_with_fallback,
+                                     block_cache: Optional[BlockCache] = None,
+                                     progress: Optional[Callable[[int], None]] = None) -> str:
+    """
+    Format only the changes since the last bundle of a directory.
+
+    Added and removed files are listed by name, and modified and added files
+    are included as unified diffs. The new bundle is then recorded, so the
+    next delta is relative to this one. Without a previous manifest the full
+    bundle is produced instead.
+
+    Args:
+        directory: The directory the files were found in
+        files: List of tuples (file_path, relative_path)
+        reader: Function reading a file path into (content, error)
+        block_cache: Optional cache of formatted blocks, to reuse prefetched contents
+        progress: Optional callback called with the number of files compared so far
+
+    Returns:
+        str: Formatted changes
+    """
+    previous = BundleManifest.load(directory)
+    if previous is None:
+        logger.info("No previous bundle recorded, producing a full bundle")
+        return format_and_record_bundle(directory, files, reader, block_cache)
+
+    logger.info(f"Formatting changes since last bundle for {len(files)} files")
+    current = BundleManifest(directory)
+    added: List[str] = []
+    modified: List[str] = []
+    unavailable: Set[str] = set()
+    errors = ""
+    diff = ""
+    blocks = ""  # Whole files of modified files whose previous content is not stored
+
+    for index, (file_path, rel_path) in enumerate(files):
+        if progress is not None:
+            progress(index)
+        if block_cache is not None:
+            cached = read_and_format_file(file_path, rel_path, reader, block_cache)
+            content, error = cached.content, cached.error
+        else:
+            content, error = reader(file_path)
+            if error:
+                logger.error(f"Error reading file {rel_path}: {error}")
+        if error:
+            errors += TEXTS["file_error_read"].format(error=error) + "\n"
+            # Keep the previous version so the file is not reported as removed
+            if rel_path in previous.files:
+                current.files[rel_path] = previous.files[rel_path]
+            continue
+
+        digest = current.add(rel_path, content)
+        old_digest = previous.files.get(rel_path)
+        if old_digest == digest:
+            continue
+
+        if old_digest is None:
+            added.append(rel_path)
+            diff += _unified_diff(rel_path, None, content)
+        else:
+            modified.append(rel_path)
+            old_content = previous.get_content(rel_path)
+            if old_content is None:
+                # Not a new file, so it is not diffed against /dev/null; it is sent whole
+                unavailable.add(rel_path)
+                blocks += format_file_block(file_path, rel_path, content, None)
+            else:
+                diff += _unified_diff(rel_path, old_content, content)
+
+    removed = sorted(set(previous.files) - set(current.files))
+    current.save()
+
+    if not (added or removed or modified or errors):
+        logger.info("No changes since last bundle")
+        return TEXTS["delta_no_changes"] + "\n"
+
+    formatted_content = TEXTS["delta_header"].format(
+        added=len(added), removed=len(removed), modified=len(modified)
+    ) + "\n"
+    for rel_path in added:
+        formatted_content += TEXTS["delta_added"].format(path=rel_path) + "\n"
+    for rel_path in removed:
+        formatted_content += TEXTS["delta_removed"].format(path=rel_path) + "\n"
+    for rel_path in modified:
+        key = "delta_unavailable" if rel_path in unavailable else "delta_modified"
+        formatted_content += TEXTS[key].format(path=rel_path) + "\n"
+    formatted_content += errors
+    if diff:
+        # Context lines may hold fences of the files themselves
+        fence = choose_fence(diff)
+        formatted_content += f"\n{fence}diff\n" + diff + f"{fence}\n"
+    if blocks:
+        formatted_content += "\n" + blocks
+
+    logger.info(f"Changes since last bundle: {len(added)} added, {len(removed)} removed, {len(modified)} modified")
+    return formatted_content
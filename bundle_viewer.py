@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Virtualized bundle viewer for the Code Processor application.
+
+A bundle of hundreds of megabytes cannot go into a Tk text widget. The
+viewer indexes the byte offset of every line of the BundleBuffer, in memory
+or spilled to disk, in a background job, and the text widget only ever
+holds the lines that fit in the window, read from the buffer as it
+scrolls. Files are reached through the per-file offsets recorded by the
+buffer, and searches stream the buffer in a background job too.
+"""
+
+import re
+import tkinter as tk
+from array import array
+from bisect import bisect_right
+from typing import Any, Callable, List, Optional
+
+import customtkinter as ctk
+
+from constants import DEFAULT_FONT_SIZE, DEFAULT_PADDING
+from texts import TEXTS
+from logger import get_logger
+from bundle_buffer import BundleBuffer
+from jobs import JobEngine
+from tree_summary import format_size
+from ui_factory import create_button, create_label
+
+# Get module logger
+logger = get_logger(__name__)
+
+# Characters of a line shown; longer lines, such as minified code, are cut
+MAX_LINE_CHARS = 2000
+
+# Matches kept per search
+MAX_MATCHES = 10000
+
+# Milliseconds between refreshes while the index or a search is running
+REFRESH_INTERVAL_MS = 100
+
+# Milliseconds without typing before a search starts
+SEARCH_DELAY_MS = 250
+
+_NEWLINE = re.compile(b"\n")
+
+class LineIndex:
+    """
+    Byte offsets of the lines of a bundle.
+
+    It is built on a worker thread and can be read while it grows: the
+    lines indexed so far are usable before the whole bundle is scanned.
+    """
+
+    def __init__(self) -> None:
+        self.offsets = array("q", [0])
+        self.size = 0
+        self.complete = False
+
+    def build(self, buffer: BundleBuffer, progress: Optional[Callable[[int, int], None]] = None) -> None:
+        """
+        Index the lines of a bundle.
+
+        Args:
+            buffer: The bundle
+            progress: Optional callback called with (bytes indexed, total bytes)
+        """
+        base = 0
+        for chunk in buffer.iter_bytes():
+            self.offsets.extend(base + match.end() for match in _NEWLINE.finditer(chunk))
+            base += len(chunk)
+            self.size = base
+            if progress is not None:
+                progress(base, buffer.size)
+        self.complete = True
+        logger.info(f"Indexed {len(self)} lines of a {base} byte bundle")
+
+    def __len__(self) -> int:
+        # A final newline does not start another line
+        count = len(self.offsets)
+        return count - 1 if count > 1 and self.offsets[-1] == self.size else count
+
+    def line_of(self, offset: int) -> int:
+        """Get the line holding a byte offset."""
+        return max(bisect_right(self.offsets, offset) - 1, 0)
+
+    def span(self, first: int, last: int) -> tuple:
+        """Get the byte range of the lines from first up to, not including, last."""
+        start = self.offsets[first]
+        end = self.offsets[last] if last < len(self.offsets) else self.size
+        return start, end
+
+def search_bundle(buffer: BundleBuffer, query: str, on_match: Callable[[int], None],
+                  progress: Optional[Callable[[int, int], None]] = None,
+                  max_matches: int = MAX_MATCHES) -> int:
+    """
+    Find a text in a bundle, ignoring the case of ASCII letters.
+
+    Args:
+        buffer: The bundle
+        query: The text to find
+        on_match: Called with the byte offset of every match, in order
+        progress: Optional callback called with (bytes searched, total bytes)
+        max_matches: Matches after which the search stops
+
+    Returns:
+        int: Number of matches found
+    """
+    needle = query.lower().encode("utf-8")
+    if not needle:
+        return 0
+    count = 0
+    # Bytes of the previous chunk a match may start in
+    tail = b""
+    base = 0
+    for chunk in buffer.iter_bytes():
+        haystack = (tail + chunk).lower()
+        start = base - len(tail)
+        position = haystack.find(needle)
+        while position != -1:
+            on_match(start + position)
+            count += 1
+            if count >= max_matches:
+                return count
+            position = haystack.find(needle, position + 1)
+        base += len(chunk)
+        tail = chunk[-(len(needle) - 1):] if len(needle) > 1 else b""
+        if progress is not None:
+            progress(base, buffer.size)
+    return count
+
+class BundleViewer:
+    """
+    A window showing a bundle a screen of lines at a time.
+
+    The line index and searches run as "index" and "search" jobs of the
+    application's job engine, so they show in its status bar and can be
+    cancelled from it.
+    """
+
+    def __init__(self, parent: Any, buffer: BundleBuffer, jobs: JobEngine) -> None:
+        """
+        Open the viewer and start indexing the bundle.
+
+        Args:
+            parent: The parent window
+            buffer: The bundle to show; it must not change while the viewer is open
+            jobs: The job engine running the index and searches
+        """
+        self.buffer = buffer
+        self.jobs = jobs
+        self.index = LineIndex()
+        self.top = 0  # First line shown
+        self.query = ""
+        self.matches: List[int] = []  # Byte offsets, appended by the search job
+        self.current_match = -1
+        self._search_after: Optional[str] = None
+        self._refreshing = False
+        self.closed = False  # Set once the window is closed
+
+        self.window = ctk.CTkToplevel(parent)
+        self.window.title(TEXTS["viewer_title"].format(size=format_size(len(buffer))))
+        self.window.geometry("1000x700")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.window.grid_columnconfigure(1, weight=1)
+        self.window.grid_rowconfigure(1, weight=1)
+        self._create_search_bar()
+        self._create_file_list()
+        self._create_text_area()
+
+        self.jobs.submit("index", self._build_index, lambda _: self._render(), replace=True)
+        self._schedule_refresh()
+
+    def _create_search_bar(self) -> None:
+        bar = ctk.CTkFrame(self.window)
+        bar.grid(row=0, column=0, columnspan=2, padx=DEFAULT_PADDING, pady=DEFAULT_PADDING, sticky="ew")
+        self.search_entry = ctk.CTkEntry(bar, placeholder_text=TEXTS["viewer_search"], width=300)
+        self.search_entry.pack(side="left", padx=DEFAULT_PADDING)
+        self.search_entry.bind("<KeyRelease>", self._on_search_typed)
+        self.search_entry.bind("<Return>", lambda event: self.next_match(1))
+        self.search_entry.bind("<Shift-Return>", lambda event: self.next_match(-1))
+        create_button(bar, text="▲", command=lambda: self.next_match(-1), width=40).pack(side="left")
+        create_button(bar, text="▼", command=lambda: self.next_match(1), width=40).pack(side="left", padx=DEFAULT_PADDING)
+        self.match_label = create_label(bar, text="")
+        self.match_label.pack(side="left", padx=DEFAULT_PADDING)
+        self.position_label = create_label(bar, text="")
+        self.position_label.pack(side="right", padx=DEFAULT_PADDING)
+
+    def _create_file_list(self) -> None:
+        frame = ctk.CTkFrame(self.window)
+        frame.grid(row=1, column=0, padx=(DEFAULT_PADDING, 0), pady=(0, DEFAULT_PADDING), sticky="ns")
+        self.file_list = tk.Listbox(frame, width=40, activestyle="none", exportselection=False)
+        scrollbar = ctk.CTkScrollbar(frame, command=self.file_list.yview)
+        self.file_list.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        self.file_list.pack(side="left", fill="both", expand=True)
+        # One call for all the names; delta bundles record no files
+        self.file_list.insert("end", *[entry.rel_path for entry in self.buffer.files])
+        self.file_list.bind("<<ListboxSelect>>", self._on_file_selected)
+
+    def _create_text_area(self) -> None:
+        frame = ctk.CTkFrame(self.window)
+        frame.grid(row=1, column=1, padx=DEFAULT_PADDING, pady=(0, DEFAULT_PADDING), sticky="nsew")
+        self.font = ctk.CTkFont(family="Consolas", size=DEFAULT_FONT_SIZE)
+        self.text = create_button(frame, is_textbox=True, font_size=DEFAULT_FONT_SIZE,
+                                  activate_scrollbars=False)
+        self.scrollbar = ctk.CTkScrollbar(frame, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.text.pack(side="left", fill="both", expand=True)
+        self.text.tag_config("match", background="#b58900", foreground="#000000")
+        self.text.configure(state="disabled")
+        self.text.bind("<Configure>", lambda event: self._render())
+        for widget in (self.text, self.window):
+            widget.bind("<MouseWheel>", self._on_mouse_wheel)
+            widget.bind("<Button-4>", lambda event: self.scroll_lines(-3))
+            widget.bind("<Button-5>", lambda event: self.scroll_lines(3))
+        self.window.bind("<Prior>", lambda event: self.scroll_lines(-self._visible_rows()))
+        self.window.bind("<Next>", lambda event: self.scroll_lines(self._visible_rows()))
+        self.window.bind("<Control-Home>", lambda event: self.go_to_line(0))
+        self.window.bind("<Control-End>", lambda event: self.go_to_line(len(self.index)))
+
+    def _build_index(self, job: Any) -> None:
+        try:
+            self.index.build(self.buffer, lambda done, total: job.progress(0, None, done, total))
+        except ValueError:
+            # The buffer was closed under a cancelled job
+            job.check_cancelled()
+            raise
+
+    def _visible_rows(self) -> int:
+        return max(self.text.winfo_height() // max(self.font.metrics("linespace"), 1), 1)
+
+    def _render(self) -> None:
+        """Show the lines from the top line that fit in the window."""
+        if self.closed:
+            return
+        rows = self._visible_rows()
+        count = len(self.index)
+        self.top = max(min(self.top, count - rows), 0)
+        last = min(self.top + rows, count)
+        start, end = self.index.span(self.top, last)
+        # Bound the read by what can be shown, a line may be megabytes long
+        end = min(end, start + rows * MAX_LINE_CHARS * 4)
+        lines = self.buffer.read_text(start, end).split("\n")[:rows]
+
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("1.0", "\n".join(line[:MAX_LINE_CHARS] for line in lines))
+        if self.query:
+            self._highlight(self.query)
+        self.text.configure(state="disabled")
+
+        self.scrollbar.set(self.top / count if count else 0, last / count if count else 1)
+        total = str(count) if self.index.complete else f"{count}+"
+        self.position_label.configure(text=TEXTS["viewer_position"].format(line=self.top + 1, total=total))
+
+    def _highlight(self, query: str) -> None:
+        """Mark the matches of the query in the visible lines."""
+        position = "1.0"
+        while True:
+            position = self.text.search(query, position, stopindex="end", nocase=True)
+            if not position:
+                break
+            end = f"{position}+{len(query)}c"
+            self.text.tag_add("match", position, end)
+            position = end
+
+    def go_to_line(self, line: int) -> None:
+        """Show a line at the top of the window."""
+        self.top = max(line, 0)
+        self._render()
+
+    def scroll_lines(self, lines: int) -> None:
+        """Scroll by a number of lines, negative to scroll up."""
+        self.go_to_line(self.top + lines)
+
+    def _on_scrollbar(self, action: str, value: str, unit: Optional[str] = None) -> None:
+        if action == "moveto":
+            self.go_to_line(int(float(value) * len(self.index)))
+        elif action == "scroll":
+            step = self._visible_rows() if unit == "pages" else 1
+            self.scroll_lines(int(value) * step)
+
+    def _on_mouse_wheel(self, event: Any) -> None:
+        self.scroll_lines(-3 if event.delta > 0 else 3)
+
+    def _on_file_selected(self, event: Any) -> None:
+        selection = self.file_list.curselection()
+        if selection:
+            self.go_to_line(self.index.line_of(self.buffer.files[selection[0]].offset))
+
+    def _on_search_typed(self, event: Any) -> None:
+        if event.keysym in ("Return", "Shift_L", "Shift_R"):
+            return
+        # Search once typing pauses, each search replaces the previous one
+        if self._search_after is not None:
+            self.window.after_cancel(self._search_after)
+        self._search_after = self.window.after(SEARCH_DELAY_MS, self._start_search)
+
+    def _start_search(self) -> None:
+        self._search_after = None
+        query = self.search_entry.get()
+        if query == self.query:
+            return
+        self.query = query
+        self.matches = []
+        self.current_match = -1
+        self._render()
+        if not query:
+            self.jobs.cancel("search")
+            self.match_label.configure(text="")
+            return
+        matches = self.matches
+
+        def search(job: Any) -> int:
+            try:
+                return search_bundle(self.buffer, query, matches.append,
+                                     lambda done, total: job.progress(len(matches), None, done, total))
+            except ValueError:
+                job.check_cancelled()
+                raise
+
+        self.jobs.submit("search", search, lambda _: self._show_match_count(), replace=True)
+        self._schedule_refresh()
+
+    def _show_match_count(self) -> None:
+        if not self.query:
+            return
+        if not self.matches:
+            self.match_label.configure(text=TEXTS["viewer_no_matches"] if not self.jobs.is_running("search") else "")
+            return
+        self.match_label.configure(text=TEXTS["viewer_matches"].format(current=self.current_match + 1,
+                                                                       count=len(self.matches)))
+
+    def next_match(self, step: int) -> None:
+        """
+        Show the next or the previous match.
+
+        Args:
+            step: 1 for the next match, -1 for the previous one
+        """
+        if not self.matches:
+            return
+        self.current_match = (self.current_match + step) % len(self.matches)
+        # Keep a few lines of context above the match
+        self.go_to_line(self.index.line_of(self.matches[self.current_match]) - 3)
+        self._show_match_count()
+
+    def _schedule_refresh(self) -> None:
+        if not self._refreshing:
+            self._refreshing = True
+            self.window.after(REFRESH_INTERVAL_MS, self._refresh)
+
+    def _refresh(self) -> None:
+        """Show what the running index and search jobs found so far."""
+        self._refreshing = False
+        if self.closed:
+            return
+        if not self.index.complete:
+            self._render()
+        if self.matches and self.current_match < 0:
+            # Jump to the first match as soon as it is found
+            self.next_match(1)
+        self._show_match_count()
+        if self.jobs.is_running("index") or self.jobs.is_running("search"):
+            self._schedule_refresh()
+
+    def close(self) -> None:
+        """Stop the viewer's jobs and close its window."""
+        if self.closed:
+            return
+        self.closed = True
+        self.jobs.cancel("index")
+        self.jobs.cancel("search")
+        self.window.destroy()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Headless command line for the Code Processor application.
+
+Bundles directories, files, archives and git revisions (``repo@rev``)
+without a display, for CI and cron jobs. The bundle streams to stdout or
+to a file, compressed by its extension. Errors go to stderr and the exit
+code. Scanning and formatting are the GUI's own, so the output matches
+what the GUI copies, and tkinter is never imported.
+
+    python cli.py path/to/repo -i "*.py" -e "tests/*" -o bundle.md.gz
+    python main.py --headless path/to/repo > bundle.md
+"""
+
+import argparse
+import fnmatch
+import logging
+import os
+import sys
+from typing import Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from logger import get_logger
+from texts import TEXTS
+from app_config import AppConfig
+from error_handler import disable_dialogs, pop_deferred_errors
+from file_utils import read_file_with_fallback
+from file_processor import FileReader, iter_directory_files, iter_formatted_blocks, process_directory
+from file_table import select_files
+from tree_summary import format_tree_summary
+from timed_reader import make_timed_reader
+from compression import atomic_output
+from git_source import parse_git_spec, open_git_source
+from archive_source import is_archive, open_archive_source
+
+# Get module logger
+logger = get_logger(__name__)
+
+# Exit codes; argparse exits with 2 on usage errors
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_NO_FILES = 3
+EXIT_INTERRUPTED = 130
+
+def matches_patterns(rel_path: str, include: Sequence[str], exclude: Sequence[str]) -> bool:
+    """
+    Check a file against include and exclude glob patterns.
+
+    A pattern matches the relative path, with ``/`` separators, or the file
+    name alone, so ``*.py`` and ``src/*.py`` both work. ``*`` also matches
+    ``/``.
+
+    Args:
+        rel_path: The relative path of the file
+        include: Patterns of which one must match, if any are given
+        exclude: Patterns of which none may match
+
+    Returns:
+        bool: True if the file is bundled
+    """
+    path = rel_path.replace(os.sep, "/")
+    name = path.rsplit("/", 1)[-1]
+
+    def matches(patterns: Sequence[str]) -> bool:
+        return any(fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+    return (not include or matches(include)) and not matches(exclude)
+
+def filter_files(files: Iterable[Tuple[str, str]], include: Sequence[str],
+                 exclude: Sequence[str]) -> Iterable[Tuple[str, str]]:
+    """
+    Keep the files matching include and exclude patterns.
+
+    Args:
+        files: Tuples (file_path, relative_path), a sequence or a stream
+        include: Include patterns, see matches_patterns
+        exclude: Exclude patterns, see matches_patterns
+
+    Returns:
+        The matching files, a sequence for a sequence (see select_files)
+        and a stream otherwise
+    """
+    if not include and not exclude:
+        return files
+    if isinstance(files, Sequence):
+        return select_files(files, [i for i, (_, rel_path) in enumerate(files)
+                                    if matches_patterns(rel_path, include, exclude)])
+    return (entry for entry in files if matches_patterns(entry[1], include, exclude))
+
+def iter_bundle_blocks(path: str, include: Sequence[str], exclude: Sequence[str],
+                       tree_summary: bool) -> Iterator[str]:
+    """
+    Bundle one path, as the GUI does after dropping it.
+
+    Plain directories and archives without a tree summary are streamed:
+    blocks are formatted while the tree is still being walked or the
+    archive decompressed.
+
+    Args:
+        path: A directory, a file, an archive or a ``repo@rev`` specification
+        include: Include patterns, see matches_patterns
+        exclude: Exclude patterns, see matches_patterns
+        tree_summary: Whether to start with a directory tree summary
+
+    Yields:
+        str: The tree summary, if any, then the block of every file
+
+    Raises:
+        FileNotFoundError: If the path does not exist
+    """
+    source = None
+    reader: FileReader = read_file_with_fallback
+    git_spec = parse_git_spec(path)
+    try:
+        if git_spec or is_archive(path):
+            # Read the revision or the archive members without extracting them
+            source = open_git_source(*git_spec) if git_spec else open_archive_source(path)
+            if source is None:
+                return
+            reader = source.read_file
+            if tree_summary or git_spec:
+                files: Iterable[Tuple[str, str]] = source.list_files()
+            else:
+                # Tarball members are formatted as they are decompressed
+                files = source.iter_files()
+        elif os.path.isdir(path):
+            if tree_summary:
+                files = process_directory(path)
+            else:
+                files = iter_directory_files(path)
+        elif os.path.isfile(path):
+            files = [(path, os.path.basename(path))]
+        else:
+            raise FileNotFoundError(f"No such file or directory: {path}")
+
+        files = filter_files(files, include, exclude)
+        if tree_summary and files:
+            yield format_tree_summary(files)
+        for _, block in iter_formatted_blocks(files, reader=make_timed_reader(reader)):
+            yield block
+    finally:
+        if source is not None:
+            source.close()
+
+def write_bundle(paths: Sequence[str], output: TextIO, include: Sequence[str] = (),
+                 exclude: Sequence[str] = (), tree_summary: Optional[bool] = None) -> int:
+    """
+    Write the bundle of some paths, one after the other.
+
+    Args:
+        paths: Directories, files, archives or ``repo@rev`` specifications
+        output: The text stream receiving the bundle
+        include: Include patterns, see matches_patterns
+        exclude: Exclude patterns, see matches_patterns
+        tree_summary: Whether to start every path with a directory tree
+            summary (defaults to the files.tree_summary setting)
+
+    Returns:
+        int: Number of blocks written, tree summaries included
+    """
+    if tree_summary is None:
+        tree_summary = AppConfig.get("files", "tree_summary", False)
+    count = 0
+    for path in paths:
+        for block in iter_bundle_blocks(path, include, exclude, tree_summary):
+            output.write(block)
+            count += 1
+    output.flush()
+    return count
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Bundle code files for AI platforms, without a display.")
+    parser.add_argument("paths", nargs="+", help="directories, files, archives or repo@rev specifications")
+    parser.add_argument("-i", "--include", action="append", default=[], metavar="PATTERN",
+                        help="bundle only files matching a glob pattern (repeatable)")
+    parser.add_argument("-e", "--exclude", action="append", default=[], metavar="PATTERN",
+                        help="leave out files matching a glob pattern (repeatable)")
+    parser.add_argument("-o", "--output", metavar="FILE",
+                        help="write the bundle to a file, compressed if it ends in .gz, .xz or .zip "
+                             "(default: stdout)")
+    parser.add_argument("--tree-summary", action=argparse.BooleanOptionalAction, default=None,
+                        help="start with a directory tree summary (default: the files.tree_summary setting)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log progress to stderr")
+    args = parser.parse_args(argv)
+
+    # Errors are reported below instead of in dialogs, and the log stays quiet unless asked
+    disable_dialogs()
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.CRITICAL)
+
+    try:
+        if args.output:
+            # A failed run leaves the previous file, not a partial bundle
+            with atomic_output(args.output) as output:
+                count = write_bundle(args.paths, output, args.include, args.exclude, args.tree_summary)
+        else:
+            if hasattr(sys.stdout, "reconfigure"):
+                # Bundles are UTF-8 whatever the console encoding, as saved files are
+                sys.stdout.reconfigure(encoding="utf-8")
+            count = write_bundle(args.paths, sys.stdout, args.include, args.exclude, args.tree_summary)
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    except BrokenPipeError:
+        # The reader went away, as with "| head"; keep the interpreter from
+        # failing again when it flushes stdout at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return EXIT_ERROR
+    except Exception as e:
+        logger.debug("Headless run failed", exc_info=True)
+        print(f"{parser.prog}: error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    errors = pop_deferred_errors()
+    for error in errors:
+        print(f"{parser.prog}: error: {error}", file=sys.stderr)
+    if errors.dropped:
+        print(f"{parser.prog}: error: {TEXTS['error_more'].format(count=errors.dropped)}", file=sys.stderr)
+    if errors:
+        return EXIT_ERROR
+    if not count:
+        print(f"{parser.prog}: {TEXTS['cli_no_files']}", file=sys.stderr)
+        return EXIT_NO_FILES
+    return EXIT_OK
+
+if __name__ == "__main__":
+    sys.exit(main())
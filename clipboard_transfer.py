@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Background clipboard transfers for the Code Processor application.
+
+``pyperclip.copy`` pipes the whole bundle through ``xclip`` on X11 and blocks
+the window until it is done. Here the application window itself owns the
+clipboard: the bundle is appended to Tk's clipboard a chunk per event loop
+turn, so the window stays responsive and progress can be shown, and Tk
+answers paste requests itself. Bundles above a configurable size are saved
+to a temporary file instead, and its path and file URI go on the clipboard.
+
+Tk owns the clipboard only while the application runs; without a clipboard
+manager, the content is gone once it closes.
+"""
+
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Union
+
+from tkinter import messagebox
+from app_config import AppConfig
+from texts import TEXTS
+from logger import get_logger
+from error_handler import with_error_handling
+from bundle_buffer import BundleBuffer
+
+# Get module logger
+logger = get_logger(__name__)
+
+# Milliseconds between checks on a reference file being written
+POLL_INTERVAL_MS = 50
+
+# Called with (bytes copied, total bytes)
+ProgressCallback = Callable[[int, int], None]
+# Called when done with (success, path of the reference file or None)
+DoneCallback = Callable[[bool, Optional[str]], None]
+
+class ClipboardTransfer:
+    """
+    Copies bundles to the clipboard owned by a Tk window, without blocking it.
+
+    Only one transfer runs at a time; starting a new one cancels the
+    previous one. All clipboard calls happen on the Tk thread, from
+    ``after`` callbacks.
+    """
+
+    def __init__(self, root: Any, chunk_size: Optional[int] = None,
+                 max_bytes: Optional[int] = None) -> None:
+        """
+        Create a clipboard transfer for a window.
+
+        Args:
+            root: The Tk root window owning the clipboard
+            chunk_size: Bytes appended per event loop turn
+                (defaults to the clipboard.chunk_kb setting)
+            max_bytes: Size above which a file reference is copied instead
+                (defaults to the clipboard.max_mb setting)
+        """
+        self.root = root
+        self.chunk_size = chunk_size or AppConfig.get("clipboard", "chunk_kb", 1024) * 1024
+        self.max_bytes = max_bytes or AppConfig.get("clipboard", "max_mb", 64) * 1024 * 1024
+        # Odd while a transfer runs: bumped on start, finish and cancel
+        self._generation = 0
+        self._reference_path: Optional[str] = None
+        self._owned: Optional[BundleBuffer] = None  # Buffer made for copying a string, closed when done
+
+    def is_running(self) -> bool:
+        """Check if a transfer is in progress."""
+        return self._generation % 2 == 1
+
+    def cancel(self) -> None:
+        """Stop the running transfer; the clipboard keeps what was appended."""
+        if self.is_running():
+            self._generation += 1
+            self._release()
+            logger.info("Clipboard transfer cancelled")
+
+    def copy(self, content: Union[str, BundleBuffer], on_done: Optional[DoneCallback] = None,
+             on_progress: Optional[ProgressCallback] = None) -> None:
+        """
+        Start copying content to the clipboard.
+
+        Args:
+            content: The text or bundle buffer to copy; a buffer must not
+                change until the transfer is done
+            on_done: Called with (success, reference_path) when finished
+            on_progress: Called with (bytes copied, total bytes) after every chunk
+        """
+        self.cancel()
+        self._generation += 1
+        generation = self._generation
+        if isinstance(content, str):
+            content = self._owned = self._to_buffer(content)
+        total = len(content)
+
+        if total > self.max_bytes:
+            logger.info(f"Bundle of {total} bytes exceeds the clipboard limit, copying a file reference")
+            self._copy_reference(generation, content, on_done)
+            return
+
+        logger.info(f"Copying {total} bytes to the clipboard")
+        self.root.clipboard_clear()
+        chunks = content.iter_text(chunk_size=self.chunk_size)
+        self.root.after_idle(self._append_next, generation, chunks, 0, total, on_done, on_progress)
+
+    def _to_buffer(self, text: str) -> BundleBuffer:
+        buffer = BundleBuffer()
+        buffer.write(text)
+        return buffer
+
+    def _release(self) -> None:
+        """Close the buffer made for a string, and its temporary file if it spilled."""
+        if self._owned is not None:
+            self._owned.close()
+            self._owned = None
+
+    def _finish(self, generation: int, success: bool, reference_path: Optional[str],
+                on_done: Optional[DoneCallback]) -> None:
+        if generation != self._generation:
+            return
+        self._generation += 1
+        self._release()
+        if on_done is not None:
+            on_done(success, reference_path)
+
+    @with_error_handling("clipboard", return_on_error=False)
+    def _append_chunk(self, chunks: Iterator[str]) -> Optional[bool]:
+        """Append the next chunk; returns None when there is nothing left."""
+        text = next(chunks, None)
+        if text is None:
+            return None
+        self.root.clipboard_append(text)
+        return True
+
+    def _append_next(self, generation: int, chunks: Iterator[str], done: int, total: int,
+                     on_done: Optional[DoneCallback], on_progress: Optional[ProgressCallback]) -> None:
+        """Append one chunk, then yield to the event loop until the next one."""
+        if generation != self._generation:
+            return
+        appended = self._append_chunk(chunks)
+        if appended is None:
+            logger.info("Clipboard transfer finished")
+            self._finish(generation, True, None, on_done)
+            return
+        if not appended:
+            self._finish(generation, False, None, on_done)
+            return
+
+        done = min(done + self.chunk_size, total)
+        if on_progress is not None:
+            on_progress(done, total)
+        self.root.after(1, self._append_next, generation, chunks, done, total, on_done, on_progress)
+
+    def _copy_reference(self, generation: int, content: BundleBuffer,
+                        on_done: Optional[DoneCallback]) -> None:
+        """Save the bundle to a temporary file on a thread, then copy its path."""
+        fd, path = tempfile.mkstemp(prefix="code_processor_bundle_", suffix=".txt")
+        result: dict = {}
+
+        def write_file() -> None:
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8", newline="") as file:
+                    content.write_to(file)
+            except Exception as e:
+                result["error"] = e
+            result["done"] = True
+
+        threading.Thread(target=write_file, name="clipboard-file", daemon=True).start()
+        self.root.after(POLL_INTERVAL_MS, self._poll_reference, generation, path, result, on_done)
+
+    def _poll_reference(self, generation: int, path: str, result: dict,
+                        on_done: Optional[DoneCallback]) -> None:
+        if not result.get("done"):
+            self.root.after(POLL_INTERVAL_MS, self._poll_reference, generation, path, result, on_done)
+            return
+        if generation != self._generation or "error" in result:
+            # A cancelled transfer fails silently, its buffer may have been closed under it
+            if generation == self._generation:
+                error_msg = TEXTS["error_clipboard"].format(error=str(result["error"]))
+                logger.error(error_msg)
+                messagebox.showerror("Error", error_msg)
+            os.remove(path)
+            self._finish(generation, False, None, on_done)
+            return
+
+        # Only the latest reference file is kept
+        if self._reference_path and os.path.exists(self._reference_path):
+            os.remove(self._reference_path)
+        self._reference_path = path
+        success = self._set_reference(path)
+        self._finish(generation, bool(success), path if success else None, on_done)
+
+    @with_error_handling("clipboard", return_on_error=False)
+    def _set_reference(self, path: str) -> bool:
+        """Put a file path on the clipboard, as text and, where supported, as a file URI."""
+        self.root.clipboard_clear()
+        self.root.clipboard_append(path)
+        try:
+            # Lets file managers and upload fields paste the file itself (X11)
+            self.root.clipboard_append(Path(path).as_uri() + "\r\n", type="text/uri-list")
+        except Exception as e:
+            logger.debug(f"File URI clipboard target not supported: {str(e)}")
+        logger.info(f"Copied reference to clipboard bundle file: {path}")
+        return True
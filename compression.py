@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compressed bundle output for the Code Processor application.
+
+Gzip and xz output are compressed in parallel, pigz-style: the stream is
+split into chunks that are compressed independently on a thread pool (zlib
+and lzma release the GIL while compressing) and written in order. Every
+chunk is a complete gzip member or xz stream, and concatenations of those
+are valid ``.gz`` and ``.xz`` files that standard tools decompress as one.
+"""
+
+import gzip
+import io
+import lzma
+import os
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import BinaryIO, Callable, Deque, Iterator, Optional, TextIO
+
+from app_config import AppConfig
+from logger import get_logger
+
+# Get module logger
+logger = get_logger(__name__)
+
+# Output extensions and the file type label shown in save dialogs
+COMPRESSED_OUTPUT_TYPES = {
+    '.gz': "Gzip compressed",
+    '.xz': "XZ compressed",
+    '.zip': "Zip archive",
+}
+
+def get_compression(path: str) -> Optional[str]:
+    """
+    Get the compressed output type of a path from its extension.
+
+    Args:
+        path: The output path
+
+    Returns:
+        The compressed extension ('.gz', '.xz' or '.zip'), or None for plain text
+    """
+    _, ext = os.path.splitext(path.lower())
+    return ext if ext in COMPRESSED_OUTPUT_TYPES else None
+
+class ParallelCompressedWriter(io.BufferedIOBase):
+    """
+    Binary writer compressing independent chunks on a thread pool.
+
+    At most ``2 * workers`` chunks are in flight, so a fast producer is held
+    back instead of buffering the whole stream in memory.
+    """
+
+    def __init__(self, fileobj: BinaryIO, compress: Callable[[bytes], bytes],
+                 chunk_size: int, workers: int, close_fileobj: bool = True) -> None:
+        """
+        Create a parallel compressed writer.
+
+        Args:
+            fileobj: The binary file receiving the compressed stream
+            compress: Function compressing one chunk into a complete member
+            chunk_size: Size of the uncompressed chunks
+            workers: Number of compression threads
+            close_fileobj: Whether closing the writer closes fileobj
+        """
+        super().__init__()
+        self._fileobj = fileobj
+        self._compress = compress
+        self._chunk_size = max(chunk_size, 64 * 1024)
+        self._workers = max(workers, 1)
+        self._close_fileobj = close_fileobj
+        self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="compress")
+        self._pending: Deque[Future] = deque()
+        self._buffer = bytearray()
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        """
+        Queue data for compression.
+
+        Args:
+            data: The uncompressed bytes
+
+        Returns:
+            The number of bytes accepted
+        """
+        if self.closed:
+            raise ValueError("write to closed file")
+        self._buffer += data
+        self.bytes_in += len(data)
+        while len(self._buffer) >= self._chunk_size:
+            chunk = bytes(self._buffer[:self._chunk_size])
+            del self._buffer[:self._chunk_size]
+            self._submit(chunk)
+        return len(data)
+
+    def _submit(self, chunk: bytes) -> None:
+        """Compress a chunk in the pool, writing finished chunks in order."""
+        self._pending.append(self._executor.submit(self._compress, chunk))
+        while self._pending and (self._pending[0].done() or len(self._pending) >= 2 * self._workers):
+            self._write_compressed(self._pending.popleft().result())
+
+    def _write_compressed(self, compressed: bytes) -> None:
+        """Write one compressed chunk."""
+        self._fileobj.write(compressed)
+        self.bytes_out += len(compressed)
+
+    def flush(self) -> None:
+        # Chunks are only cut at chunk_size, flushing early would hurt the ratio
+        pass
+
+    def close(self) -> None:
+        """Compress the remaining data and close the writer."""
+        if self.closed:
+            return
+        try:
+            if self._buffer or not self.bytes_in:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self._write_compressed(self._pending.popleft().result())
+            self._fileobj.flush()
+            logger.info(f"Compressed {self.bytes_in} bytes into {self.bytes_out} bytes")
+        finally:
+            self._executor.shutdown(wait=True)
+            if self._close_fileobj:
+                self._fileobj.close()
+            super().close()
+
+def open_gzip_writer(fileobj: BinaryIO, level: Optional[int] = None,
+                     chunk_size: Optional[int] = None, workers: Optional[int] = None,
+                     close_fileobj: bool = True) -> ParallelCompressedWriter:
+    """
+    Create a writer producing a concatenated gzip stream in parallel.
+
+    Args:
+        fileobj: The binary file receiving the compressed stream
+        level: Compression level (defaults to the configured level)
+        chunk_size: Chunk size (defaults to the configured size)
+        workers: Number of threads (defaults to the configured count or CPU count)
+        close_fileobj: Whether closing the writer closes fileobj
+
+    Returns:
+        The binary writer
+    """
+    level = level if level is not None else AppConfig.get("files", "compression_level", 6)
+    return ParallelCompressedWriter(
+        fileobj,
+        lambda chunk: gzip.compress(chunk, compresslevel=level, mtime=0),
+        chunk_size or AppConfig.get("files", "compression_chunk_size", 1024 * 1024),
+        workers or AppConfig.get("files", "compression_workers", 0) or os.cpu_count() or 1,
+        close_fileobj
+    )
+
+def open_xz_writer(fileobj: BinaryIO, level: Optional[int] = None,
+                   chunk_size: Optional[int] = None, workers: Optional[int] = None,
+                   close_fileobj: bool = True) -> ParallelCompressedWriter:
+    """
+    Create a writer producing concatenated xz streams in parallel.
+
+    Args:
+        fileobj: The binary file receiving the compressed stream
+        level: Compression preset (defaults to the configured level)
+        chunk_size: Chunk size (defaults to four times the configured size,
+            since xz needs larger chunks for a good ratio)
+        workers: Number of threads (defaults to the configured count or CPU count)
+        close_fileobj: Whether closing the writer closes fileobj
+
+    Returns:
+        The binary writer
+    """
+    level = level if level is not None else AppConfig.get("files", "compression_level", 6)
+    return ParallelCompressedWriter(
+        fileobj,
+        lambda chunk: lzma.compress(chunk, preset=level),
+        chunk_size or 4 * AppConfig.get("files", "compression_chunk_size", 1024 * 1024),
+        workers or AppConfig.get("files", "compression_workers", 0) or os.cpu_count() or 1,
+        close_fileobj
+    )
+
+class _ZipMemberWriter(io.BufferedIOBase):
+    """Binary writer storing the stream as the single member of a zip file."""
+
+    def __init__(self, path: str, member_name: str) -> None:
+        super().__init__()
+        self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        self._member = self._zip.open(member_name, "w", force_zip64=True)
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        return self._member.write(data)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            self._member.close()
+            self._zip.close()
+        finally:
+            super().close()
+
+def open_output(path: str, encoding: str = "utf-8", write_path: Optional[str] = None) -> TextIO:
+    """
+    Open a bundle output file for writing text, compressed by extension.
+
+    ``.gz`` and ``.xz`` paths are compressed in parallel, ``.zip`` paths get
+    a single deflated member named after the file, and any other path is
+    written as plain text.
+
+    Args:
+        path: The output path, which decides the compression
+        encoding: The text encoding
+        write_path: The file actually written (defaults to path), such as
+            a temporary file renamed over path later, see atomic_output
+
+    Returns:
+        A text stream; closing it finishes the compressed file
+    """
+    if write_path is None:
+        write_path = path
+    compression = get_compression(path)
+    if compression is None:
+        return open(write_path, "w", encoding=encoding)
+
+    logger.info(f"Opening {compression} compressed output: {path}")
+    if compression == ".zip":
+        member_name = os.path.splitext(os.path.basename(path))[0] or "processed_code.txt"
+        if not os.path.splitext(member_name)[1]:
+            member_name += ".txt"
+        binary = _ZipMemberWriter(write_path, member_name)
+    elif compression == ".xz":
+        binary = open_xz_writer(open(write_path, "wb"))
+    else:
+        binary = open_gzip_writer(open(write_path, "wb"))
+    return io.TextIOWrapper(binary, encoding=encoding, write_through=True)
+
+@contextmanager
+def atomic_path(path: str) -> Iterator[str]:
+    """
+    Get a temporary path to write a file to, moved over path only on success.
+
+    The temporary file sits next to path and is renamed over it when the
+    with block ends normally. On an error or a cancellation it is removed
+    instead, so no truncated file is left at the chosen path and a
+    previous file there is kept.
+
+    Args:
+        path: The output path
+
+    Yields:
+        The temporary path to write
+    """
+    directory, name = os.path.split(path)
+    temp_path = os.path.join(directory, f".{name}.{os.getpid()}.{threading.get_ident()}.partial")
+    try:
+        yield temp_path
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        logger.info(f"Discarded the partial output for {path}")
+        raise
+
+@contextmanager
+def atomic_output(path: str, encoding: str = "utf-8") -> Iterator[TextIO]:
+    """
+    Open a bundle output file as open_output does, replacing it only on success.
+
+    See atomic_path.
+
+    Args:
+        path: The output path
+        encoding: The text encoding
+
+    Yields:
+        The text stream to write the bundle to
+    """
+    with atomic_path(path) as temp_path:
+        with open_output(path, encoding, temp_path) as stream:
+            yield stream
+
+def open_input(path: str, encoding: str = "utf-8") -> TextIO:
+    """
+    Open a saved bundle for reading text, decompressing by extension.
+
+    Args:
+        path: The bundle path
+        encoding: The text encoding
+
+    Returns:
+        A text stream reading the decompressed bundle
+    """
+    compression = get_compression(path)
+    if compression == ".gz":
+        return gzip.open(path, "rt", encoding=encoding)
+    if compression == ".xz":
+        return lzma.open(path, "rt", encoding=encoding)
+    if compression == ".zip":
+        archive = zipfile.ZipFile(path)
+        names = [info.filename for info in archive.infolist() if not info.is_dir()]
+        if len(names) != 1:
+            archive.close()
+            raise ValueError(f"Expected a single bundle in {path}, found {len(names)} members")
+        # The member stream keeps the archive file open until it is closed
+        return io.TextIOWrapper(archive.open(names[0]), encoding=encoding)
+    return open(path, "r", encoding=encoding)
@@ -30,6 +30,18 @@ SUPPORTED_FILE_TYPES = {
     '.jsp': 'JSP'
 }
 
+# Archive formats that can be processed in place, without extraction
+ARCHIVE_EXTENSIONS = (
+    '.zip',
+    '.tar',
+    '.tar.gz',
+    '.tgz',
+    '.tar.bz2',
+    '.tbz2',
+    '.tar.xz',
+    '.txz'
+)
+
 # AI Platform URLs and icons
 AI_PLATFORMS = {
     'Grok': ('https://x.ai/grok', '🤖'),
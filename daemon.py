@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local daemon with a JSON-RPC socket API for the Code Processor application.
+
+Editor integrations talk to one long-lived process over a Unix domain
+socket. That way they pay neither interpreter startup nor a cold scan on
+every call. The daemon keeps the scan of every repository it was asked
+about in memory, with a block cache shared by all of them. A repeated
+bundle of a known repository only checks the files' modification times
+and joins cached blocks.
+
+Requests and responses are JSON-RPC 2.0 objects, one per line. Methods:
+
+    scan        {"root", "refresh"?}                  -> {"root", "files", "size", "warm"}
+    select      {"root", "include"?, "exclude"?, "paths"?} -> {"files", "size"}
+    bundle      {"root", "tree_summary"?}             -> {"files", "chars", "seconds"}
+    stats       {}                                    -> {"projects", "cached_blocks", ...}
+    invalidate  {"root"?}                             -> {"dropped"}
+
+A bundle streams as "bundle.chunk" notifications carrying the request id
+and a piece of the text, before its response. Clients are served
+concurrently by asyncio; scanning and formatting run on a bounded thread
+pool through the async API (see async_api).
+
+    python daemon.py [--socket ~/.code_processor/daemon.sock]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from logger import get_logger
+from app_config import AppConfig
+from error_handler import disable_dialogs, pop_deferred_errors
+from block_cache import BlockCache
+from file_processor import process_directory
+from file_table import FileTable, select_files
+from tree_summary import iter_scanned_sizes
+from recent_projects import load_scan, save_scan
+from cli import filter_files
+from async_api import abundle
+
+# Get module logger
+logger = get_logger(__name__)
+
+# Characters of bundle text sent per chunk notification
+CHUNK_CHARS = 64 * 1024
+
+# Longest request line accepted, in bytes
+MAX_REQUEST_BYTES = 1024 * 1024
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+class RpcError(Exception):
+    """An error answered to the client as a JSON-RPC error object."""
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+
+class Project:
+    """A repository known to the daemon: its scan and current selection."""
+
+    def __init__(self, root: str, files: FileTable, dir_mtimes: Any) -> None:
+        self.root = root
+        self.files = files
+        self.dir_mtimes = dir_mtimes  # Directory times of the scan, to revalidate it
+        self.selection: Sequence[Tuple[str, str]] = files
+        self.select_params: Optional[Dict[str, Any]] = None  # Applied again after a rescan
+
+def _apply_selection(project: Project, params: Dict[str, Any]) -> None:
+    """Select the files of a project matching the patterns and paths of a select request."""
+    selection = filter_files(project.files, params.get("include") or [], params.get("exclude") or [])
+    paths = params.get("paths")
+    if paths is not None:
+        wanted = {path.replace("/", os.sep) for path in paths}
+        selection = select_files(selection, [i for i, (_, rel_path) in enumerate(selection)
+                                             if rel_path in wanted])
+    project.selection = selection
+    project.select_params = params
+
+def _selection_size(files: Sequence[Tuple[str, str]]) -> int:
+    """Total size of files as recorded by the scan."""
+    return sum(size for _, size in iter_scanned_sizes(files) if size > 0)
+
+class ProcessorDaemon:
+    """
+    Serves the JSON-RPC methods over a Unix domain socket.
+
+    Only the event loop touches the projects; the blocking scans, reads
+    and formatting run in the executor. Scans and bundles of a root take
+    turns on the root's lock, which outlives the projects a rescan
+    replaces.
+    """
+
+    def __init__(self, workers: Optional[int] = None, block_cache_mb: Optional[int] = None) -> None:
+        """
+        Create a daemon.
+
+        Args:
+            workers: Threads scanning and formatting (defaults to the daemon.workers setting)
+            block_cache_mb: Megabytes of formatted blocks kept for all
+                repositories (defaults to the daemon.block_cache_mb setting)
+        """
+        if workers is None:
+            workers = AppConfig.get("daemon", "workers", 4)
+        if block_cache_mb is None:
+            block_cache_mb = AppConfig.get("daemon", "block_cache_mb", 512)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="daemon")
+        self.block_cache = BlockCache(block_cache_mb * 1024 * 1024)
+        self.projects: Dict[str, Project] = {}
+        self.locks: Dict[str, asyncio.Lock] = {}  # One scan or bundle of a root at a time
+        self.started_at = time.time()
+        self.requests = 0
+        self.clients = 0
+        self.methods = {
+            "scan": self.scan,
+            "select": self.select,
+            "bundle": self.bundle,
+            "stats": self.stats,
+            "invalidate": self.invalidate,
+        }
+
+    async def _run(self, func: Any, *args: Any) -> Any:
+        """Run a blocking function in the executor and raise the errors it handled."""
+        def call() -> Any:
+            result = func(*args)
+            errors = pop_deferred_errors()
+            if errors:
+                raise RpcError(SERVER_ERROR, errors[0])
+            return result
+        return await asyncio.get_running_loop().run_in_executor(self.executor, call)
+
+    def _root(self, params: Dict[str, Any]) -> str:
+        root = params.get("root")
+        if not isinstance(root, str) or not root:
+            raise RpcError(INVALID_PARAMS, "root must be a directory path")
+        return os.path.abspath(os.path.expanduser(root))
+
+    async def _project(self, params: Dict[str, Any]) -> Project:
+        """Get the project of a request, scanning it if it is not known yet."""
+        root = self._root(params)
+        if root not in self.projects:
+            await self.scan({"root": root})
+        return self.projects[root]
+
+    def _load_files(self, root: str, refresh: bool) -> Tuple[FileTable, Any, bool]:
+        """Get the files of a root from its saved scan if current, else by walking it."""
+        if not os.path.isdir(root):
+            raise RpcError(INVALID_PARAMS, f"not a directory: {root}")
+        scan = None if refresh else load_scan(root)
+        if scan is not None:
+            return scan[0], scan[1], True
+        files = process_directory(root)
+        if not isinstance(files, FileTable):
+            return FileTable(root), None, False
+        # Kept for the GUI, batch runs and the next daemon
+        save_scan(root, files)
+        return files, files.walked_mtimes(), False
+
+    async def _current_project(self, root: str, refresh: bool) -> Tuple[Project, bool]:
+        """
+        Get the project of a root with a current scan, rescanning it if a directory changed.
+
+        Call it holding the lock of the root.
+
+        Returns:
+            Tuple of the project and whether its scan was reused
+        """
+        project = self.projects.get(root)
+        if project is not None and not refresh:
+            current = await self._run(project.files.directory_mtimes)
+            if current == project.dir_mtimes:
+                return project, True
+        files, dir_mtimes, warm = await self._run(self._load_files, root, refresh)
+        previous = project
+        project = Project(root, files, dir_mtimes)
+        if previous is not None and previous.select_params is not None:
+            _apply_selection(project, previous.select_params)
+        self.projects[root] = project
+        return project, warm
+
+    async def scan(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Scan a repository, or revalidate the scan in memory."""
+        root = self._root(params)
+        async with self.locks.setdefault(root, asyncio.Lock()):
+            project, warm = await self._current_project(root, bool(params.get("refresh", False)))
+        return {"root": root, "files": len(project.files), "size": project.files.total_size(), "warm": warm}
+
+    async def select(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Narrow the files bundled for a repository, by patterns or relative paths."""
+        project = await self._project(params)
+        _apply_selection(project, params)
+        return {"files": len(project.selection), "size": _selection_size(project.selection)}
+
+    async def bundle(self, params: Dict[str, Any], send_chunk: Any = None) -> Dict[str, Any]:
+        """Bundle the selection of a repository, streaming the text as chunks."""
+        root = self._root(params)
+        tree_summary = params.get("tree_summary")
+        if tree_summary is None:
+            tree_summary = AppConfig.get("files", "tree_summary", False)
+        started = time.perf_counter()
+        chars = 0
+        async with self.locks.setdefault(root, asyncio.Lock()):
+            # Files added or removed since the scan are bundled as they are now
+            project, _ = await self._current_project(root, False)
+            files = project.selection
+            chunks = abundle(files, block_cache=self.block_cache, tree_summary=tree_summary,
+                             chunk_chars=CHUNK_CHARS, executor=self.executor)
+            async with aclosing(chunks):
+                async for text in chunks:
+                    chars += len(text)
+                    # Waits for the client to read, so a slow client holds back the formatting
+                    await send_chunk(text)
+        return {"files": len(files), "chars": chars, "seconds": round(time.perf_counter() - started, 4)}
+
+    async def stats(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Report what the daemon holds in memory."""
+        return {
+            "projects": [{"root": project.root, "files": len(project.files), "selected": len(project.selection)}
+                         for project in self.projects.values()],
+            "cached_blocks": len(self.block_cache),
+            "cached_chars": self.block_cache.size,
+            "clients": self.clients,
+            "requests": self.requests,
+            "uptime": round(time.time() - self.started_at, 1),
+        }
+
+    async def invalidate(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Forget the scan of a repository, or of all of them and every cached block."""
+        if params.get("root"):
+            dropped = 1 if self.projects.pop(self._root(params), None) is not None else 0
+        else:
+            dropped = len(self.projects)
+            self.projects.clear()
+            self.block_cache.clear()
+        return {"dropped": dropped}
+
+    async def _handle_request(self, message: Any, writer: asyncio.StreamWriter) -> Optional[Dict[str, Any]]:
+        """Run one request; returns the response, or None for a notification."""
+        if not isinstance(message, dict) or message.get("jsonrpc") != "2.0" or "method" not in message:
+            return {"jsonrpc": "2.0", "id": None,
+                    "error": {"code": INVALID_REQUEST, "message": "not a JSON-RPC 2.0 request"}}
+        request_id = message.get("id")
+        method = self.methods.get(message["method"])
+        params = message.get("params") or {}
+        self.requests += 1
+        try:
+            if method is None:
+                raise RpcError(METHOD_NOT_FOUND, f"unknown method: {message['method']}")
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "params must be an object")
+            if method == self.bundle:
+                async def send_chunk(text: str) -> None:
+                    await self._send(writer, {"jsonrpc": "2.0", "method": "bundle.chunk",
+                                              "params": {"id": request_id, "data": text}})
+                result = await method(params, send_chunk)
+            else:
+                result = await method(params)
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except RpcError as e:
+            response = {"jsonrpc": "2.0", "id": request_id, "error": {"code": e.code, "message": str(e)}}
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            logger.error(f"Request {message.get('method')} failed: {str(e)}", exc_info=True)
+            response = {"jsonrpc": "2.0", "id": request_id, "error": {"code": SERVER_ERROR, "message": str(e)}}
+        return response if "id" in message else None
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, message: Dict[str, Any]) -> None:
+        writer.write(json.dumps(message).encode("utf-8") + b"\n")
+        await writer.drain()
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve the requests of one client, one after the other, until it disconnects."""
+        self.clients += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    await self._send(writer, {"jsonrpc": "2.0", "id": None,
+                                              "error": {"code": INVALID_REQUEST, "message": "request too long"}})
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    message = json.loads(line)
+                except ValueError as e:
+                    await self._send(writer, {"jsonrpc": "2.0", "id": None,
+                                              "error": {"code": PARSE_ERROR, "message": str(e)}})
+                    continue
+                response = await self._handle_request(message, writer)
+                if response is not None:
+                    await self._send(writer, response)
+        except ConnectionError:
+            logger.info("Client went away")
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    async def serve(self, socket_path: str) -> None:
+        """
+        Serve clients on a Unix domain socket until cancelled.
+
+        Args:
+            socket_path: The socket file; a stale one left by a dead daemon is replaced
+
+        Raises:
+            RuntimeError: If another daemon already serves the socket
+        """
+        if os.path.exists(socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(socket_path)
+            except OSError:
+                os.unlink(socket_path)
+            else:
+                raise RuntimeError(f"a daemon is already serving {socket_path}")
+            finally:
+                probe.close()
+        os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+        server = await asyncio.start_unix_server(self.handle_client, socket_path, limit=MAX_REQUEST_BYTES)
+        # Only the user running the daemon may talk to it
+        os.chmod(socket_path, 0o600)
+        logger.info(f"Daemon listening on {socket_path}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Serve scans and bundles to editors over a Unix domain socket.")
+    parser.add_argument("--socket", default=AppConfig.get("daemon", "socket", "~/.code_processor/daemon.sock"),
+                        help="socket path (default: the daemon.socket setting)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="threads scanning and formatting (default: the daemon.workers setting)")
+    args = parser.parse_args(argv)
+
+    if not hasattr(socket, "AF_UNIX"):
+        print(f"{parser.prog}: error: Unix domain sockets are not available on this platform", file=sys.stderr)
+        return 1
+    disable_dialogs()
+    daemon = ProcessorDaemon(args.workers)
+    try:
+        asyncio.run(daemon.serve(os.path.expanduser(args.socket)))
+    except KeyboardInterrupt:
+        logger.info("Daemon stopped")
+    except (RuntimeError, NotImplementedError) as e:
+        print(f"{parser.prog}: error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
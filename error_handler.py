@@ -5,13 +5,98 @@ Error handling utilities for the Code Processor application.
 """
 
 import functools
-from tkinter import messagebox
+import threading
+from typing import List
 from logger import get_logger
 from texts import TEXTS
 
 # Get module logger
 logger = get_logger(__name__)
 
+# Errors of worker threads, which must not open dialogs; see pop_deferred_errors
+_deferred = threading.local()
+
+# Errors kept per thread until they are collected; later ones are only counted
+MAX_DEFERRED_ERRORS = 20
+
+# Errors listed in one message, see format_errors
+MAX_SHOWN_ERRORS = 5
+
+# Whether errors may open dialogs at all, see disable_dialogs
+_dialogs_enabled = True
+
+def disable_dialogs() -> None:
+    """
+    Never open error dialogs, for headless use.
+    
+    Errors are then kept on every thread, the main one included, for the
+    caller to collect with pop_deferred_errors and report.
+    """
+    global _dialogs_enabled
+    _dialogs_enabled = False
+
+class DeferredErrors(list):
+    """The errors collected from a thread, with the number left out past MAX_DEFERRED_ERRORS."""
+
+    def __init__(self, errors: List[str] = (), dropped: int = 0) -> None:
+        super().__init__(errors)
+        self.dropped = dropped
+
+def pop_deferred_errors() -> DeferredErrors:
+    """
+    Collect the errors handled on the calling thread since the last call.
+    
+    Dialogs can only be opened from the Tk thread, so on other threads
+    with_error_handling keeps the error text here instead; the job engine
+    collects it when a job ends and shows it from the Tk thread. Headless
+    runs collect it on every thread, see disable_dialogs.
+    
+    Returns:
+        DeferredErrors: The formatted error texts, oldest first; errors past
+        the first MAX_DEFERRED_ERRORS are only counted, in its dropped attribute
+    """
+    errors = DeferredErrors(getattr(_deferred, "errors", []), getattr(_deferred, "dropped", 0))
+    _deferred.errors = []
+    _deferred.dropped = 0
+    return errors
+
+def log_deferred_errors(context: str) -> int:
+    """
+    Collect the errors of a thread whose work no one reports, and log them.
+    
+    Background threads outside the job engine, such as prefetching and the
+    async API pool, call it so that their errors neither pile up nor turn
+    up in the next work the thread runs.
+    
+    Args:
+        context: What the thread was doing, for the log
+    
+    Returns:
+        int: The number of errors collected
+    """
+    errors = pop_deferred_errors()
+    count = len(errors) + errors.dropped
+    if count:
+        logger.warning(f"{context} reported {count} errors, first: {errors[0]}")
+    return count
+
+def format_errors(errors: List[str]) -> str:
+    """
+    Format collected errors as one message, see pop_deferred_errors.
+    
+    Args:
+        errors: The error texts, oldest first, as pop_deferred_errors returns them
+    
+    Returns:
+        str: The first MAX_SHOWN_ERRORS errors, and how many more there were,
+        those left out of the collection included
+    """
+    message = "\n\n".join(errors[:MAX_SHOWN_ERRORS])
+    more = max(len(errors) - MAX_SHOWN_ERRORS, 0) + getattr(errors, "dropped", 0)
+    if more:
+        message += "\n\n" + TEXTS["error_more"].format(count=more)
+    return message
+
 def with_error_handling(operation_name, show_dialog=True, return_on_error=False):
     """
     Decorator for standardized error handling.
@@ -42,9 +127,18 @@ def with_error_handling(operation_name, show_dialog=True, return_on_error=False)
                 # Log the error
                 logger.error(formatted_error, exc_info=True)
                 
-                # Show error dialog if requested
+                # Show error dialog if requested, deferred on worker threads
                 if show_dialog:
-                    messagebox.showerror("Error", formatted_error)
+                    if _dialogs_enabled and threading.current_thread() is threading.main_thread():
+                        # Imported here so that headless use never loads tkinter
+                        from tkinter import messagebox
+                        messagebox.showerror("Error", formatted_error)
+                    else:
+                        errors = getattr(_deferred, "errors", [])
+                        if len(errors) < MAX_DEFERRED_ERRORS:
+                            _deferred.errors = errors + [formatted_error]
+                        else:
+                            _deferred.dropped = getattr(_deferred, "dropped", 0) + 1
                 
                 return return_on_error
         return wrapper
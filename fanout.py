@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fan-out bundle output for the Code Processor application.
+
+One pass over the selected files can feed several outputs at once: the
+clipboard buffer, a plain or compressed file, stdout or the preview. Every
+chunk is handed to each sink through its own bounded queue and written on
+the sink's own thread, so a slow sink (a compressed file, a pipe) holds the
+producer back instead of letting chunks pile up in memory.
+"""
+
+import queue
+import threading
+from typing import Any, List, Optional
+
+from app_config import AppConfig
+from logger import get_logger
+
+# Get module logger
+logger = get_logger(__name__)
+
+# Queue item closing a sink
+_CLOSE = object()
+
+class _SinkWorker:
+    """Writes queued chunks to one sink on a dedicated thread."""
+
+    def __init__(self, sink: Any, name: str, close_sink: bool, max_pending: int) -> None:
+        self.sink = sink
+        self.name = name
+        self.close_sink = close_sink
+        self.error: Optional[Exception] = None
+        self.queue: "queue.Queue[Any]" = queue.Queue(max_pending)
+        self.thread = threading.Thread(target=self._run, name=f"fanout-{name}", daemon=True)
+        self.thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is _CLOSE:
+                break
+            if self.error is not None:
+                # Keep draining so the producer never blocks on a failed sink
+                continue
+            try:
+                rel_path, text = item
+                if rel_path is not None and hasattr(self.sink, "add_block"):
+                    self.sink.add_block(rel_path, text)
+                else:
+                    self.sink.write(text)
+            except Exception as e:
+                logger.error(f"Bundle output {self.name} failed: {str(e)}", exc_info=True)
+                self.error = e
+
+        try:
+            if self.close_sink:
+                self.sink.close()
+            elif hasattr(self.sink, "flush"):
+                self.sink.flush()
+        except Exception as e:
+            logger.error(f"Closing bundle output {self.name} failed: {str(e)}", exc_info=True)
+            self.error = self.error or e
+
+class FanOutWriter:
+    """
+    Sends every chunk of a bundle to several sinks.
+
+    It has the ``write`` and ``add_block`` methods of a BundleBuffer, so it
+    can be passed as the output of write_and_record_bundle. Sinks need a
+    ``write(text)`` method; sinks that also have ``add_block`` (a
+    BundleBuffer) receive file blocks through it.
+    """
+
+    def __init__(self, max_pending: Optional[int] = None) -> None:
+        """
+        Create a writer without sinks.
+
+        Args:
+            max_pending: Chunks queued per sink before the producer waits
+                (defaults to the files.fanout_queue_chunks setting)
+        """
+        if max_pending is None:
+            max_pending = AppConfig.get("files", "fanout_queue_chunks", 16)
+        self.max_pending = max_pending
+        self._workers: List[_SinkWorker] = []
+        self._closed = False
+
+    def __enter__(self) -> "FanOutWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        # Do not hide the producer's exception behind a sink error
+        self.close(raise_errors=exc_type is None)
+
+    def add_sink(self, sink: Any, name: str, close: bool = False) -> None:
+        """
+        Add an output; add every sink before writing the first chunk.
+
+        Args:
+            sink: The output, with a write(text) method
+            name: Name of the output, for logs
+            close: Whether to close the sink when the writer closes; sinks
+                that are not closed are flushed
+        """
+        self._workers.append(_SinkWorker(sink, name, close, self.max_pending))
+
+    def _put(self, item: Any) -> None:
+        if self._closed:
+            raise ValueError("write to closed FanOutWriter")
+        for worker in self._workers:
+            worker.queue.put(item)
+
+    def write(self, text: str) -> int:
+        """
+        Send text to every sink.
+
+        Args:
+            text: The text
+
+        Returns:
+            int: Number of characters written
+        """
+        self._put((None, text))
+        return len(text)
+
+    def add_block(self, rel_path: str, block: str) -> None:
+        """
+        Send the formatted block of a file to every sink.
+
+        Args:
+            rel_path: The relative path of the file
+            block: The formatted block
+        """
+        self._put((rel_path, block))
+
+    def close(self, raise_errors: bool = True) -> None:
+        """
+        Wait for every sink to write its queued chunks, then close them.
+
+        Args:
+            raise_errors: Whether to raise the first error a sink met
+
+        Raises:
+            Exception: The first sink error, when raise_errors is set
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for worker in self._workers:
+            worker.queue.put(_CLOSE)
+        for worker in self._workers:
+            worker.thread.join()
+
+        errors = [worker.error for worker in self._workers if worker.error is not None]
+        logger.info(f"Bundle output finished on {len(self._workers)} outputs, {len(errors)} failed")
+        if errors and raise_errors:
+            raise errors[0]
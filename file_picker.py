@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fuzzy file picker for the Code Processor application.
+
+The scanned paths are indexed once per scan by their trigrams (every three
+consecutive characters of the lowercased path). A query only checks the
+paths on the posting list of its rarest trigram, and every path holding
+all its terms is scored by where they match. Misspelled queries still
+share most of their trigrams with the file name they meant; those are
+counted on a second index of the file names alone, whose posting lists are
+not inflated by directory names shared by many paths, and only up to a
+fixed budget. Queries shorter than a trigram match the start of file names
+instead. The FilePicker widget runs a search on every keystroke and lists
+the best matches for picking.
+
+A search runs on the Tk thread, so it scores at most MAX_SCORED paths.
+Broad queries, such as an extension or a common directory name, are
+matched in file names first, and are exact whenever those matches alone
+outscore any path holding a term only in its directories; otherwise the
+results are the best of the paths scored within the budget.
+"""
+
+import heapq
+import os
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import islice
+import tkinter as tk
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import customtkinter as ctk
+
+from constants import DEFAULT_PADDING
+from app_config import AppConfig
+from texts import TEXTS
+from logger import get_logger
+
+# Get module logger
+logger = get_logger(__name__)
+
+# File name posting entries counted per misspelled query; rarer trigrams
+# are counted first, commoner ones are left out once the budget is spent
+MAX_POSTINGS = 10000
+
+# Misspelled candidates scored per query, those sharing most trigrams first
+MAX_CANDIDATES = 1000
+
+# Paths scored per query, keeping a keystroke within a frame or two
+MAX_SCORED = 5000
+
+# Paths indexed between two progress reports
+PROGRESS_INTERVAL = 10000
+
+# Rows of the result list
+RESULT_ROWS = 10
+
+_EMPTY = array("i")
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class PathIndex:
+    """Trigram index of the relative paths of a scan."""
+
+    def __init__(self, files: Sequence[Tuple[str, str]],
+                 progress: Optional[Callable[[int, int], None]] = None) -> None:
+        """
+        Index scanned files.
+
+        Args:
+            files: Sequence of tuples (file_path, relative_path), as scanned
+            progress: Optional callback called with (paths indexed, total paths)
+                every PROGRESS_INTERVAL paths
+        """
+        self.paths: List[str] = []
+        self._name_starts = array("i")
+        grams: Dict[str, array] = {}
+        name_grams: Dict[str, array] = {}
+        for index, (_, rel_path) in enumerate(files):
+            path = rel_path.replace(os.sep, "/").lower()
+            name_start = path.rfind("/") + 1
+            self.paths.append(path)
+            self._name_starts.append(name_start)
+            for gram in _trigrams(path):
+                posting = grams.get(gram)
+                if posting is None:
+                    posting = grams[gram] = array("i")
+                posting.append(index)
+            for gram in _trigrams(path[name_start:]):
+                posting = name_grams.get(gram)
+                if posting is None:
+                    posting = name_grams[gram] = array("i")
+                posting.append(index)
+            if progress is not None and index % PROGRESS_INTERVAL == 0:
+                progress(index, len(files))
+        self._grams = grams
+        self._name_grams = name_grams
+        # File names sorted, for queries too short to have a trigram
+        self._names = sorted((path[start:], index) for index, (path, start)
+                             in enumerate(zip(self.paths, self._name_starts)))
+        logger.info(f"Indexed {len(self.paths)} paths with {len(grams)} trigrams")
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def _name_prefix_matches(self, terms: List[str]) -> List[int]:
+        """Get up to MAX_SCORED files whose name starts with the longest term, for queries without trigrams."""
+        term = max(terms, key=len)
+        start = bisect_left(self._names, (term,))
+        # Names starting with the term sort before those starting with its successor
+        end = bisect_left(self._names, (term[:-1] + chr(ord(term[-1]) + 1),), start)
+        return [index for _, index in self._names[start:min(end, start + MAX_SCORED)]]
+
+    def _best_matches(self, candidates: Iterable[int], terms: List[str],
+                      limit: int) -> Tuple[int, List[Tuple[float, int]]]:
+        """
+        Score every candidate holding all the terms, keeping the best.
+
+        The scoring of _score is inlined, since it runs on every match of
+        broad queries.
+
+        Returns:
+            Tuple of the number of matches and the best (score, index) pairs, best first
+        """
+        paths = self.paths
+        name_starts = self._name_starts
+        best: List[Tuple[float, int]] = []
+        count = 0
+        for index in candidates:
+            path = paths[index]
+            score = 60 - len(path) / 100
+            for term in terms:
+                position = path.rfind(term)
+                if position < 0:
+                    break
+                name_start = name_starts[index]
+                if position >= name_start:
+                    score += 100 if position > name_start else 150
+                else:
+                    score += 60
+            else:
+                count += 1
+                # Negated indices keep the earlier path first among equal scores
+                entry = (score, -index)
+                if len(best) < limit:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+        return count, [(score, -index) for score, index in sorted(best, reverse=True)]
+
+    def _broad_matches(self, rarest: array, grams: set, terms: List[str],
+                       limit: int) -> Tuple[int, List[Tuple[float, int]]]:
+        """
+        Score a query whose rarest trigram is on too many paths, within MAX_SCORED paths.
+
+        Paths holding a trigram in their file name are scored first, from
+        the file name index. A path missing that trigram in its name holds
+        a term only in its directories, and scores at most 60 for it and 150
+        for each other term, over the base of 60; when every file name match
+        was scored and the worst result kept beats that, nothing else can
+        enter the results. Otherwise the rest of the budget scores the
+        paths of the rarest posting list in order.
+
+        Returns:
+            Tuple of the number of matches found and the best (score, index) pairs, best first
+        """
+        names = min((self._name_grams.get(gram, _EMPTY) for gram in grams), key=len)
+        complete = len(names) <= MAX_SCORED
+        names = names[:MAX_SCORED]
+        count, best = self._best_matches(names, terms, limit)
+        if complete and len(best) == limit and best[-1][0] > 120 + 150 * (len(terms) - 1):
+            return count, best
+
+        scored = set(names)
+        others = islice((index for index in rarest if index not in scored), MAX_SCORED - len(names))
+        more, rest = self._best_matches(others, terms, limit)
+        return count + more, heapq.nlargest(limit, best + rest)
+
+    def _typo_matches(self, terms: List[str]) -> Dict[int, float]:
+        """Get the files whose name shares most trigrams of the query, with the share of trigrams found."""
+        grams = set()
+        for term in terms:
+            grams |= _trigrams(term)
+        postings = sorted((self._name_grams.get(gram, _EMPTY) for gram in grams), key=len)
+        # A swap of two letters costs up to four trigrams, allow half of them to be missing
+        misses = len(postings) // 2
+        used = []
+        total = 0
+        for posting in postings:
+            if not posting:
+                # Trigrams found nowhere are misses in every path
+                misses -= 1
+            elif total + len(posting) > MAX_POSTINGS:
+                # Commoner trigrams say little about a misspelling; paths are
+                # not required to hold them, as if they did
+                break
+            else:
+                used.append(posting)
+                total += len(posting)
+        if misses < 0 or not used:
+            return {}
+        counts = Counter()
+        for posting in used:
+            counts.update(posting)
+        needed = max(len(used) - misses, 1)
+        return {index: count / len(postings) for index, count in counts.items() if count >= needed}
+
+    def _score(self, index: int, terms: List[str], overlap: float = 1.0) -> float:
+        """Score a path; terms found in the file name count most, then shorter paths."""
+        path = self.paths[index]
+        name_start = self._name_starts[index]
+        score = 60 * overlap - len(path) / 100
+        for term in terms:
+            position = path.rfind(term)
+            if position >= name_start:
+                score += 100 if position > name_start else 150
+            elif position >= 0:
+                score += 60
+        return score
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[int]:
+        """
+        Find the paths best matching a query.
+
+        Paths holding every term come first; when there are fewer than
+        ``limit`` of them, paths sharing most of the query's trigrams, such
+        as misspellings, fill the rest.
+
+        Args:
+            query: Space separated terms
+            limit: Number of results (defaults to the files.picker_results setting)
+
+        Returns:
+            list: Indices of the matching files, best first
+        """
+        if limit is None:
+            limit = AppConfig.get("files", "picker_results", 50)
+        terms = query.lower().replace(os.sep, "/").split()
+        if not terms:
+            return []
+        grams = set()
+        for term in terms:
+            grams |= _trigrams(term)
+        if not grams:
+            _, best = self._best_matches(self._name_prefix_matches(terms), terms, limit)
+            return [index for _, index in best]
+
+        rarest = min((self._grams.get(gram, _EMPTY) for gram in grams), key=len)
+        if len(rarest) <= MAX_SCORED:
+            count, best = self._best_matches(rarest, terms, limit)
+        else:
+            count, best = self._broad_matches(rarest, grams, terms, limit)
+        # Misspellings are looked for only when the exact matches do not fill the results
+        if count < limit and max(len(term) for term in terms) > 3:
+            typos = self._typo_matches(terms)
+            exact = {index for _, index in best}
+            for index in heapq.nlargest(MAX_CANDIDATES, typos, key=typos.get):
+                if index not in exact:
+                    best.append((self._score(index, terms, typos[index]) - 100, index))
+            best = heapq.nlargest(limit, best)
+        return [index for _, index in best]
+
+class FilePicker:
+    """
+    A search box listing the best matching files as the user types.
+
+    Enter or a double click picks the highlighted file; the owner decides
+    what picking means through the on_pick callback.
+    """
+
+    def __init__(self, parent: Any, on_pick: Callable[[int], None],
+                 is_picked: Callable[[int], bool]) -> None:
+        """
+        Create the picker, without an index until a scan is indexed.
+
+        Args:
+            parent: The parent widget
+            on_pick: Called with the index of a picked file
+            is_picked: Tells if a file is in the selection, to mark it in the results
+        """
+        self.on_pick = on_pick
+        self.is_picked = is_picked
+        self.index: Optional[PathIndex] = None
+        self.files: Sequence[Tuple[str, str]] = []
+        self.results: List[int] = []
+
+        self.frame = ctk.CTkFrame(parent)
+        self.entry = ctk.CTkEntry(self.frame, placeholder_text=TEXTS["picker_placeholder"])
+        self.entry.pack(fill="x", padx=DEFAULT_PADDING, pady=DEFAULT_PADDING)
+        self.result_list = tk.Listbox(self.frame, height=RESULT_ROWS, activestyle="none", exportselection=False)
+        self.entry.bind("<KeyRelease>", self._on_key)
+        self.entry.bind("<Return>", lambda event: self._pick_selected())
+        self.entry.bind("<Down>", lambda event: self._move(1))
+        self.entry.bind("<Up>", lambda event: self._move(-1))
+        self.entry.bind("<Escape>", lambda event: self.clear())
+        self.result_list.bind("<Double-Button-1>", lambda event: self._pick_selected())
+        self.result_list.bind("<Return>", lambda event: self._pick_selected())
+
+    def pack(self, **kwargs: Any) -> None:
+        """Pack the picker's frame."""
+        self.frame.pack(**kwargs)
+
+    def set_index(self, index: Optional[PathIndex], files: Sequence[Tuple[str, str]]) -> None:
+        """
+        Search a new scan.
+
+        Args:
+            index: The index of the scanned paths, None while it is being built
+            files: The scanned files the index refers to
+        """
+        self.index = index
+        self.files = files
+        self._update_results()
+
+    def clear(self) -> None:
+        """Empty the search box and hide the results."""
+        self.entry.delete(0, "end")
+        self._update_results()
+
+    def _on_key(self, event: Any) -> None:
+        if event.keysym not in ("Return", "Up", "Down", "Escape"):
+            self._update_results()
+
+    def _update_results(self) -> None:
+        query = self.entry.get().strip()
+        self.results = self.index.search(query) if self.index is not None and query else []
+        self.result_list.delete(0, "end")
+        if not query:
+            self.result_list.pack_forget()
+            return
+        self.result_list.insert("end", *[self._result_text(index) for index in self.results])
+        if self.results:
+            self.result_list.selection_set(0)
+        self.result_list.pack(fill="x", padx=DEFAULT_PADDING, pady=(0, DEFAULT_PADDING))
+
+    def _result_text(self, index: int) -> str:
+        return f"{'✓' if self.is_picked(index) else ' '} {self.files[index][1]}"
+
+    def _move(self, step: int) -> str:
+        if self.results:
+            selection = self.result_list.curselection()
+            position = min(max((selection[0] if selection else -1) + step, 0), len(self.results) - 1)
+            self.result_list.selection_clear(0, "end")
+            self.result_list.selection_set(position)
+            self.result_list.see(position)
+        return "break"
+
+    def _pick_selected(self) -> str:
+        selection = self.result_list.curselection()
+        if self.results:
+            position = selection[0] if selection else 0
+            index = self.results[position]
+            self.on_pick(index)
+            # Mark it, and keep the list for the next pick
+            self.result_list.delete(position)
+            self.result_list.insert(position, self._result_text(index))
+            self.result_list.selection_set(position)
+        return "break"
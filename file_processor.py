@@ -4,8 +4,10 @@
 File processing functions for the Code Processor application.
 """
 
+import heapq
 import os
-from typing import List, Tuple, Optional
+import re
+from typing import Callable, Iterable, Iterator, List, Sequence, Sized, TextIO, Tuple, Optional
 from pathlib import Path
 from constants import SUPPORTED_FILE_TYPES
 from helpers import get_file_language
@@ -16,90 +18,422 @@ from file_utils import (
     list_files_in_directory, read_file_with_fallback
 )
 from error_handler import with_error_handling
+from block_cache import BlockCache, CachedBlock, FileStamp, get_file_stamp
+from io_scheduler import DEFAULT_WINDOW, iter_scheduled_contents
+from timed_reader import TimedReader, get_stamp_function
+from file_table import FileTable
+from tree_summary import format_tree_summary
+from app_config import AppConfig
 
 # Get module logger
 logger = get_logger(__name__)
 
+# Reads a file path into a tuple (file_content, error_message)
+FileReader = Callable[[str], Tuple[str, Optional[str]]]
+
+def walk_directory(directory: str,
+                   on_directory: Optional[Callable[[str, int], None]] = None
+                   ) -> Iterator[Tuple[str, str, os.DirEntry]]:
+    """
+    Walk a directory, yielding its code files in relative path order.
+    
+    Unlike a full walk followed by a sort, files come out as soon as no
+    smaller path can still appear. Directories waiting to be listed are kept
+    in a heap keyed by their relative path prefix ("src/"); every path below
+    a directory sorts after its prefix, so a file found earlier is safe to
+    emit once it is smaller than every pending prefix. The first blocks of a
+    huge tree can then be read and written while the walk goes on.
+    
+    Symbolic links to directories are not followed and unreadable
+    directories are skipped, as with os.walk.
+    
+    Args:
+        directory: The directory path to walk
+        on_directory: Optional callback called with the relative prefix and
+            the modification time in nanoseconds (-1 if unknown) of every
+            directory before it is listed, whether it holds code files or not
+        
+    Yields:
+        Tuples (file_path, relative_path, dir_entry), sorted by relative path
+    """
+    directory = normalize_path(directory)
+    # Entries are (key, is_directory, path, dir_entry); a key is a relative file
+    # path or a relative directory prefix ending with the separator
+    pending: List[Tuple[str, bool, str, Optional[os.DirEntry]]] = [("", True, directory, None)]
+    
+    while pending:
+        key, is_directory, path, dir_entry = heapq.heappop(pending)
+        if not is_directory:
+            yield path, key, dir_entry
+            continue
+        
+        if on_directory is not None:
+            try:
+                on_directory(key, os.stat(path).st_mtime_ns)
+            except OSError:
+                on_directory(key, -1)
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    rel_path = key + entry.name
+                    try:
+                        if entry.is_dir():
+                            if not entry.is_symlink():
+                                heapq.heappush(pending, (rel_path + os.sep, True, entry.path, entry))
+                            continue
+                    except OSError:
+                        continue
+                    _, ext = os.path.splitext(entry.name.lower())
+                    # Check if file type is supported
+                    if ext in SUPPORTED_FILE_TYPES:
+                        heapq.heappush(pending, (rel_path, False, entry.path, entry))
+        except OSError as e:
+            logger.warning(f"Skipping unreadable directory {path}: {str(e)}")
+
+def iter_directory_files(directory: str) -> Iterator[Tuple[str, str]]:
+    """
+    Walk a directory, yielding its code files in relative path order.
+    
+    See walk_directory, which also yields the directory entry of each file.
+    
+    Args:
+        directory: The directory path to walk
+        
+    Yields:
+        Tuples (file_path, relative_path), sorted by relative path
+    """
+    for file_path, rel_path, _ in walk_directory(directory):
+        yield file_path, rel_path
+
 @with_error_handling("processing_directory", return_on_error=[])
-def process_directory(directory: str) -> List[Tuple[str, str]]:
+def process_directory(directory: str,
+                      progress: Optional[Callable[[int], None]] = None) -> Sequence[Tuple[str, str]]:
     """
     Process a directory to find and list code files.
     
     Args:
         directory: The directory path to process
+        progress: Optional callback called with the number of files found so far
         
     Returns:
-        list: List of tuples (file_path, relative_path)
+        Sequence of tuples (file_path, relative_path), sorted by relative
+        path, held in a compact FileTable
     """
     logger.info(f"Processing directory: {directory}")
     
-    # Normalize directory path
-    directory = normalize_path(directory)
-    
-    # Walk through directory and find supported files
-    files = []
+    files: Sequence[Tuple[str, str]] = []
     try:
-        for root, _, filenames in os.walk(directory):
-            for filename in filenames:
-                file_path = os.path.join(root, filename)
-                _, ext = os.path.splitext(filename.lower())
-                
-                # Check if file type is supported
-                if ext in SUPPORTED_FILE_TYPES:
-                    # Use relative path from the selected directory
-                    rel_path = os.path.relpath(file_path, directory)
-                    files.append((file_path, rel_path))
-                    logger.debug(f"Added file: {rel_path}")
-        
-        # Sort files by relative path
-        files.sort(key=lambda x: x[1])
-        logger.info(f"Found {len(files)} supported files")
+        # The walk already yields files sorted by relative path
+        files = FileTable.from_directory(directory, progress)
+        logger.info(f"Found {len(files)} supported files in {files.directory_count()} directories")
     except Exception as e:
         logger.error(f"Error processing directory: {str(e)}", exc_info=True)
     
     return files
 
-@with_error_handling("formatting_code", return_on_error="")
-def format_files_for_ai(files: List[Tuple[str, str]]) -> str:
+DEFAULT_FENCE = "```"
+
+# Closes the code block of a file and separates it from the next one
+FILE_BLOCK_FOOTER = "\n" + DEFAULT_FENCE + "\n\n"
+
+# Backtick fences at the start of a content line, which would close the block early
+FENCE_LINE_PATTERN = re.compile(r"^ {0,3}(`{3,})", re.MULTILINE)
+
+def choose_fence(content: str) -> str:
     """
-    Format a list of files for AI platforms.
+    Pick a code fence that content lines cannot close.
     
     Args:
-        files: List of tuples (file_path, relative_path)
+        content: The file content
         
     Returns:
-        str: Formatted content with file paths, language info, and code
+        str: Three backticks, or one more backtick than the longest fence in the content
+    """
+    if DEFAULT_FENCE not in content:
+        return DEFAULT_FENCE
+    longest = max((len(match.group(1)) for match in FENCE_LINE_PATTERN.finditer(content)), default=0)
+    return "`" * max(len(DEFAULT_FENCE), longest + 1) if longest else DEFAULT_FENCE
+
+def format_file_footer(fence: str = DEFAULT_FENCE) -> str:
     """
-    if not files:
-        logger.warning("No files to format")
-        return ""
+    Format the end of a file block.
     
-    logger.info(f"Formatting {len(files)} files for AI platform")
+    Args:
+        fence: The code fence opened by the header
+        
+    Returns:
+        str: The closing fence and separator
+    """
+    return FILE_BLOCK_FOOTER if fence == DEFAULT_FENCE else "\n" + fence + "\n\n"
+
+def format_file_header(file_path: str, rel_path: str, fence: str = DEFAULT_FENCE) -> str:
+    """
+    Format the header of a file block, up to and including the opening fence.
     
-    formatted_content = ""
+    Args:
+        file_path: The path used to detect the file language
+        rel_path: The relative path shown in the block header
+        fence: The code fence, see choose_fence
+        
+    Returns:
+        str: The file path and language lines followed by the opening fence
+    """
+    # Get language for syntax highlighting
+    language = get_file_language(file_path)
     
-    for file_path, rel_path in files:
-        # Get language for syntax highlighting
-        language = get_file_language(file_path)
+    header = TEXTS["file_path"].format(path=rel_path) + "\n"
+    header += TEXTS["file_language"].format(language=language) + "\n"
+    header += fence + language.lower() + "\n"
+    return header
+
+def format_file_body(content: str, error: Optional[str]) -> str:
+    """
+    Format the body of a file block: the content, or the read error.
+    
+    Args:
+        content: The file content
+        error: Read error message, if the file could not be read
+        
+    Returns:
+        str: The text placed inside the code block
+    """
+    if error:
+        return TEXTS["file_error_read"].format(error=error) + "\n"
+    return content
+
+def split_file_block(block: str) -> Tuple[str, str, Optional[str]]:
+    """
+    Split a block made by format_file_block back into its parts.
+    
+    Args:
+        block: The formatted block
         
-        # Add file header
-        formatted_content += TEXTS["file_path"].format(path=rel_path) + "\n"
-        formatted_content += TEXTS["file_language"].format(language=language) + "\n"
-        formatted_content += "```" + language.lower() + "\n"
+    Returns:
+        Tuple of the header, the body and the read error reported by the
+        body (None if the file was read); the footer is the rest of the block
         
-        # Read and add file content
-        content, error = read_file_with_fallback(file_path)
+    Raises:
+        ValueError: If the text is not a file block
+    """
+    # The header is the path line, the language line and the opening fence
+    header_end = block.index("\n", block.index("\n", block.index("\n") + 1) + 1) + 1
+    header = block[:header_end]
+    fence_line = header[header.rindex("\n", 0, header_end - 1) + 1:]
+    fence = fence_line[:len(fence_line) - len(fence_line.lstrip("`"))]
+    footer = format_file_footer(fence)
+    if len(fence) < len(DEFAULT_FENCE) or not block.endswith(footer):
+        raise ValueError("not a file block")
+    body = block[header_end:len(block) - len(footer)]
+    
+    error = None
+    prefix, suffix = TEXTS["file_error_read"].split("{error}")
+    line = body[:-1]
+    if body.endswith("\n") and line.startswith(prefix) and line.endswith(suffix) and "\n" not in line:
+        error = line[len(prefix):len(line) - len(suffix)]
+    return header, body, error
+
+def format_file_block(file_path: str, rel_path: str, content: str, error: Optional[str]) -> str:
+    """
+    Format a single file as a bundle block.
+    
+    Args:
+        file_path: The path used to detect the file language
+        rel_path: The relative path shown in the block header
+        content: The file content
+        error: Read error message, if the file could not be read
+        
+    Returns:
+        str: The formatted block with file path, language info, and code
+    """
+    body = format_file_body(content, error)
+    fence = choose_fence(body)
+    return format_file_header(file_path, rel_path, fence) + body + format_file_footer(fence)
+
+def iter_file_contents(files: Iterable[Tuple[str, str]],
+                       reader: FileReader = read_file_with_fallback,
+                       scheduled: Optional[bool] = None
+                       ) -> Iterator[Tuple[str, str, str, Optional[str]]]:
+    """
+    Read files one by one.
+    
+    Files on disk are read in physical order a window at a time (see
+    io_scheduler) when scheduling is enabled, but always yielded in order.
+    Reads under a TimedReader are scheduled too: the scheduler opens every
+    file to locate it, so it does that within the reader's deadlines.
+    
+    Args:
+        files: Iterable of tuples (file_path, relative_path)
+        reader: Function reading a file path into (content, error)
+        scheduled: Whether to schedule reads (defaults to the files.io_scheduling setting)
+        
+    Yields:
+        Tuples (file_path, relative_path, content, error)
+    """
+    if scheduled is None:
+        scheduled = AppConfig.get("files", "io_scheduling", True)
+    disk_reader = reader.reader if isinstance(reader, TimedReader) else reader
+    if scheduled and disk_reader is read_file_with_fallback:
+        yield from iter_scheduled_contents(files, reader, AppConfig.get("files", "io_window", DEFAULT_WINDOW),
+                                           AppConfig.get("files", "io_extents", False))
+        return
+    
+    for file_path, rel_path in files:
+        content, error = reader(file_path)
         if error:
             logger.error(f"Error reading file {rel_path}: {error}")
-            formatted_content += TEXTS["file_error_read"].format(error=error) + "\n"
-        else:
-            formatted_content += content
-            logger.debug(f"Successfully read file: {rel_path}")
+        yield file_path, rel_path, content, error
+
+def _read_stamped(file_path: str, reader: FileReader) -> Tuple[Optional[FileStamp], str, Optional[str]]:
+    """Stamp a file, then read it; stamping first lets a change during the read invalidate the block."""
+    stamp = get_file_stamp(file_path)
+    content, error = reader(file_path)
+    return stamp, content, error
+
+def read_and_format_file(file_path: str, rel_path: str,
+                         reader: FileReader = read_file_with_fallback,
+                         block_cache: Optional[BlockCache] = None) -> CachedBlock:
+    """
+    Get the formatted block of a file, from the cache when it is still valid.
+    
+    Args:
+        file_path: The path of the file
+        rel_path: The relative path shown in the block header
+        reader: Function reading a file path into (content, error)
+        block_cache: Optional cache of formatted blocks
         
-        # Close code block and add separator
-        formatted_content += "\n```\n\n"
+    Returns:
+        The formatted block, with the position of the content inside it
+    """
+    if block_cache is not None:
+        cached = block_cache.lookup(file_path, rel_path, get_stamp_function(reader))
+        if cached is not None:
+            return cached
+    
+    cacheable = True
+    if isinstance(reader, TimedReader):
+        # The stat hangs on a stalled mount as the read does, so both go within the deadlines
+        try:
+            stamp, content, error = reader.call(lambda path: _read_stamped(path, reader.reader), file_path)
+        except Exception as e:
+            # Without a stamp the block would look valid forever; the next run reads the file again
+            stamp, content, cacheable = None, "", False
+            error = str(e) if isinstance(e, TimeoutError) else f"Error reading file {file_path}: {str(e)}"
+    else:
+        stamp, content, error = _read_stamped(file_path, reader)
+    if error:
+        logger.error(f"Error reading file {rel_path}: {error}")
     
-    return formatted_content
+    body = format_file_body(content, error)
+    fence = choose_fence(body)
+    header = format_file_header(file_path, rel_path, fence)
+    block = header + body + format_file_footer(fence)
+    cached = CachedBlock(rel_path, block, len(header), len(header) + len(body), error, stamp)
+    if block_cache is not None and cacheable:
+        block_cache.store(file_path, cached)
+    return cached
+
+def iter_formatted_blocks(files: Iterable[Tuple[str, str]],
+                          on_file_read: Optional[Callable[[str, str], None]] = None,
+                          reader: FileReader = read_file_with_fallback,
+                          block_cache: Optional[BlockCache] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Format files for AI platforms one block at a time.
+    
+    Blocks are produced as the files are consumed, so a streamed file list
+    (see iter_directory_files) is formatted while it is still being built.
+    
+    Args:
+        files: Iterable of tuples (file_path, relative_path)
+        on_file_read: Optional callback called with (relative_path, content)
+            for every file read successfully
+        reader: Function reading a file path into (content, error)
+        block_cache: Optional cache of formatted blocks
+        
+    Yields:
+        Tuples (relative_path, block) of each file, in order
+    """
+    if block_cache is not None:
+        for file_path, rel_path in files:
+            cached = read_and_format_file(file_path, rel_path, reader, block_cache)
+            if not cached.error and on_file_read is not None:
+                on_file_read(rel_path, cached.content)
+            yield rel_path, cached.block
+        return
+    
+    for file_path, rel_path, content, error in iter_file_contents(files, reader):
+        if not error and on_file_read is not None:
+            on_file_read(rel_path, content)
+        yield rel_path, format_file_block(file_path, rel_path, content, error)
+
+@with_error_handling("formatting_code", return_on_error="")
+def format_files_for_ai(files: Iterable[Tuple[str, str]],
+                        on_file_read: Optional[Callable[[str, str], None]] = None,
+                        reader: FileReader = read_file_with_fallback,
+                        block_cache: Optional[BlockCache] = None,
+                        tree_summary: Optional[bool] = None) -> str:
+    """
+    Format a list of files for AI platforms.
+    
+    Args:
+        files: List of tuples (file_path, relative_path), or any iterable
+            producing them, such as a streaming source
+        on_file_read: Optional callback called with (relative_path, content)
+            for every file read successfully
+        reader: Function reading a file path into (content, error),
+            for files that come from a source other than the filesystem
+        block_cache: Optional cache of formatted blocks, for example filled
+            ahead of time by the prefetcher; blocks read now are added to it
+        tree_summary: Whether to start with a directory tree summary of the
+            files (defaults to the files.tree_summary setting); needs a
+            sequence of files rather than a stream
+        
+    Returns:
+        str: Formatted content with file paths, language info, and code
+    """
+    if isinstance(files, Sized):
+        if not files:
+            logger.warning("No files to format")
+            return ""
+        logger.info(f"Formatting {len(files)} files for AI platform")
+    else:
+        logger.info("Formatting streamed files for AI platform")
+    
+    header = ""
+    if tree_summary is None:
+        tree_summary = AppConfig.get("files", "tree_summary", False)
+    if tree_summary:
+        if isinstance(files, Sequence):
+            header = format_tree_summary(files)
+        else:
+            logger.warning("Tree summary skipped, streamed files are not known in advance")
+    
+    return header + "".join(block for _, block in iter_formatted_blocks(files, on_file_read, reader, block_cache))
+
+def write_directory_bundle(directory: str, output: TextIO,
+                           reader: FileReader = read_file_with_fallback) -> int:
+    """
+    Walk a directory and write its bundle, pipelining every stage.
+    
+    The walk, the reads and the output overlap: the first block is written
+    as soon as the first file in sorted order is known, instead of after
+    the whole tree has been listed.
+    
+    Args:
+        directory: The directory to bundle
+        output: The text stream receiving the bundle, such as sys.stdout
+        reader: Function reading a file path into (content, error)
+        
+    Returns:
+        int: Number of files written
+    """
+    logger.info(f"Streaming bundle of directory: {directory}")
+    count = 0
+    for _, block in iter_formatted_blocks(iter_directory_files(directory), reader=reader):
+        output.write(block)
+        count += 1
+    output.flush()
+    logger.info(f"Streamed {count} files")
+    return count
 
 @with_error_handling("parsing_dropped_files", return_on_error=[])
 def parse_dropped_files(drop_data: str) -> List[str]:
@@ -132,3 +466,9 @@ def parse_dropped_files(drop_data: str) -> List[str]:
     logger.info(f"Parsed {len(paths)} paths from drop data")
     
     return paths
+
+if __name__ == "__main__":
+    # The command line lives in cli; this entry point is kept for old scripts
+    import sys
+    from cli import main
+    sys.exit(main())
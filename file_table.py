@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compact file table for the Code Processor application.
+
+A list of ``(file_path, rel_path)`` tuples repeats the root directory and
+every parent directory in each entry, at roughly 200 bytes per file. The
+file table stores each directory once in a prefix trie, the file names in
+one packed UTF-8 buffer, and per-file attributes in typed array columns,
+and builds the tuples only when they are asked for.
+"""
+
+import json
+import os
+import zlib
+from array import array
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+from logger import get_logger
+from helpers import get_file_language
+from file_utils import normalize_path
+
+# Get module logger
+logger = get_logger(__name__)
+
+# Files walked between two progress reports
+PROGRESS_INTERVAL = 1000
+
+# Version of the saved table format, see FileTable.save
+SAVE_FORMAT_VERSION = 3
+
+# Bits of the flags column
+FLAG_SYMLINK = 0x1  # The file is a symbolic link
+FLAG_STAT_FAILED = 0x2  # Size and mtime could not be read
+
+class FileTable(Sequence[Tuple[str, str]]):
+    """
+    Sorted code files of a directory, as a sequence of (file_path, rel_path).
+
+    Besides the sequence API, ``size``, ``mtime_ns``, ``language`` and
+    ``flags`` give the attributes of the file at an index, read from the
+    array columns without building the tuple.
+    """
+
+    def __init__(self, root: str) -> None:
+        """
+        Create an empty table.
+
+        Args:
+            root: The directory the relative paths start from
+        """
+        self.root = root
+        # Directory trie: parent id and interned name of each directory, 0 is the root
+        self._dir_parents = array("l", [-1])
+        self._dir_names: List[str] = [""]
+        self._dir_ids: Dict[Tuple[int, str], int] = {}
+        # Relative prefix of each directory ("src/app/"), built once per directory
+        self._dir_prefixes: List[str] = [""]
+        # File columns
+        self._file_dirs = array("l")
+        self._names = bytearray()
+        self._name_ends = array("Q")
+        self._sizes = array("q")
+        self._mtimes = array("q")
+        self._languages = array("H")
+        self._flags = array("B")
+        # Language names, indexed by the language column
+        self.languages: List[str] = []
+        self._language_ids: Dict[str, int] = {}
+        self._last_dir: Tuple[str, int] = ("", 0)
+        # Every directory the walk listed, with or without code files, as a
+        # second trie (parent index and name, parents first) with its time
+        # then; empty for a table built by append
+        self._walked_parents = array("l")
+        self._walked_names: List[str] = []
+        self._walked_mtimes = array("q")
+
+    def _get_dir_id(self, rel_dir: str) -> int:
+        """Get the trie node of a relative directory, adding it if needed."""
+        if rel_dir == self._last_dir[0]:
+            return self._last_dir[1]
+        dir_id = 0
+        for name in rel_dir.split(os.sep) if rel_dir else ():
+            child = self._dir_ids.get((dir_id, name))
+            if child is None:
+                child = len(self._dir_names)
+                self._dir_ids[(dir_id, name)] = child
+                self._dir_parents.append(dir_id)
+                self._dir_names.append(name)
+                self._dir_prefixes.append(self._dir_prefixes[dir_id] + name + os.sep)
+            dir_id = child
+        self._last_dir = (rel_dir, dir_id)
+        return dir_id
+
+    def _get_language_id(self, filename: str) -> int:
+        """Get the language column value of a file, adding the language if needed."""
+        _, ext = os.path.splitext(filename.lower())
+        language_id = self._language_ids.get(ext)
+        if language_id is None:
+            language = get_file_language(filename)
+            if language not in self.languages:
+                self.languages.append(language)
+            language_id = self.languages.index(language)
+            self._language_ids[ext] = language_id
+        return language_id
+
+    def append(self, rel_path: str, size: int = -1, mtime_ns: int = 0, flags: int = 0) -> None:
+        """
+        Add a file; files are expected in relative path order.
+
+        Args:
+            rel_path: The path of the file relative to the root
+            size: The size of the file in bytes, -1 if unknown
+            mtime_ns: The modification time of the file in nanoseconds
+            flags: FLAG_* bits of the file
+        """
+        rel_dir, name = os.path.split(rel_path)
+        self._file_dirs.append(self._get_dir_id(rel_dir))
+        self._names += name.encode("utf-8", "surrogateescape")
+        self._name_ends.append(len(self._names))
+        self._sizes.append(size)
+        self._mtimes.append(mtime_ns)
+        self._languages.append(self._get_language_id(name))
+        self._flags.append(flags)
+
+    @classmethod
+    def from_directory(cls, directory: str,
+                       progress: Optional[Callable[[int], None]] = None) -> "FileTable":
+        """
+        Walk a directory into a file table.
+
+        Args:
+            directory: The directory path to walk
+            progress: Optional callback called with the number of files found
+                so far, every PROGRESS_INTERVAL files
+
+        Returns:
+            FileTable: The code files of the directory, sorted by relative path
+        """
+        # Imported here, file_processor builds its directory listings with this module
+        from file_processor import walk_directory
+        
+        table = cls(normalize_path(directory))
+        # Walked directory of each prefix, only while walking; a directory is
+        # listed after its parent, so the parent is always known
+        walked_ids: Dict[str, int] = {}
+
+        def on_directory(prefix: str, mtime_ns: int) -> None:
+            parent_prefix, _, name = prefix.rstrip(os.sep).rpartition(os.sep)
+            parent = walked_ids.get(parent_prefix + os.sep if parent_prefix else "", -1) if prefix else -1
+            walked_ids[prefix] = len(table._walked_names)
+            table._walked_parents.append(parent)
+            table._walked_names.append(name)
+            table._walked_mtimes.append(mtime_ns)
+
+        for _, rel_path, entry in walk_directory(directory, on_directory):
+            flags = FLAG_SYMLINK if entry.is_symlink() else 0
+            try:
+                stat = entry.stat()
+                table.append(rel_path, stat.st_size, stat.st_mtime_ns, flags)
+            except OSError:
+                table.append(rel_path, flags=flags | FLAG_STAT_FAILED)
+            if progress is not None and len(table) % PROGRESS_INTERVAL == 0:
+                progress(len(table))
+        return table
+
+    def __len__(self) -> int:
+        return len(self._file_dirs)
+
+    def rel_path(self, index: int) -> str:
+        """Get the relative path of the file at an index."""
+        start = self._name_ends[index - 1] if index else 0
+        name = self._names[start:self._name_ends[index]].decode("utf-8", "surrogateescape")
+        return self._dir_prefixes[self._file_dirs[index]] + name
+
+    @overload
+    def __getitem__(self, index: int) -> Tuple[str, str]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Tuple[str, str]]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Tuple[str, str], List[Tuple[str, str]]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("file table index out of range")
+        rel_path = self.rel_path(index)
+        return os.path.join(self.root, rel_path), rel_path
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        for index in range(len(self)):
+            rel_path = self.rel_path(index)
+            yield os.path.join(self.root, rel_path), rel_path
+
+    def size(self, index: int) -> int:
+        """Get the size in bytes of the file at an index, -1 if unknown."""
+        return self._sizes[index]
+
+    def mtime_ns(self, index: int) -> int:
+        """Get the modification time in nanoseconds of the file at an index."""
+        return self._mtimes[index]
+
+    def language(self, index: int) -> str:
+        """Get the language name of the file at an index."""
+        return self.languages[self._languages[index]]
+
+    def flags(self, index: int) -> int:
+        """Get the FLAG_* bits of the file at an index."""
+        return self._flags[index]
+
+    def total_size(self) -> int:
+        """Get the total size in bytes of the files with a known size."""
+        return sum(size for size in self._sizes if size > 0)
+
+    def directory_count(self) -> int:
+        """Get the number of directories holding the files, the root included."""
+        return len(self._dir_names)
+
+    def _columns(self) -> List[Tuple[str, array]]:
+        """Get the array columns of the table, in the order they are saved."""
+        return [("dir_parents", self._dir_parents), ("file_dirs", self._file_dirs),
+                ("name_ends", self._name_ends), ("sizes", self._sizes), ("mtimes", self._mtimes),
+                ("languages", self._languages), ("flags", self._flags)]
+
+    def _revalidated_dirs(self) -> List[str]:
+        """Get the prefixes of the directories whose times revalidate the table, built on demand."""
+        if not self._walked_names:
+            return self._dir_prefixes
+        prefixes: List[str] = []
+        for parent, name in zip(self._walked_parents, self._walked_names):
+            prefixes.append(prefixes[parent] + name + os.sep if parent >= 0 else "")
+        return prefixes
+
+    def directory_mtimes(self, stat: Callable[[str], os.stat_result] = os.stat) -> array:
+        """
+        Get the modification time of each directory the table was walked
+        from, -1 where it cannot be read.
+
+        Adding, removing or renaming a file changes the time of its
+        directory. Every directory the walk listed counts, not only those
+        holding code files, so a code file added to any of them shows up.
+
+        Args:
+            stat: Function statting a directory, such as one bounded by read
+                deadlines (see timed_reader.get_stat_function)
+        """
+        mtimes = array("q")
+        for prefix in self._revalidated_dirs():
+            try:
+                mtimes.append(stat(os.path.join(self.root, prefix)).st_mtime_ns)
+            except OSError:
+                mtimes.append(-1)
+        return mtimes
+
+    def walked_mtimes(self) -> array:
+        """
+        Get the directory times seen when the table was walked or saved.
+
+        Taken before each directory was listed, so they revalidate the table
+        even if a directory changed while it was being walked. A table built
+        by append has none; the times now are returned instead.
+        """
+        return self._walked_mtimes if self._walked_names else self.directory_mtimes()
+
+    def save(self, path: str, dir_mtimes: Optional[array] = None) -> None:
+        """
+        Save the table to a file, compressed, with the directory times to revalidate it.
+
+        Args:
+            path: The file to write; it is replaced atomically
+            dir_mtimes: The directory times to record (defaults to the
+                times seen by the walk, see walked_mtimes)
+        """
+        if dir_mtimes is None:
+            dir_mtimes = self.walked_mtimes()
+        columns = self._columns() + [("walked_parents", self._walked_parents), ("dir_mtimes", dir_mtimes)]
+        header = {
+            "version": SAVE_FORMAT_VERSION,
+            "root": self.root,
+            "dir_names": self._dir_names,
+            "languages": self.languages,
+            "language_ids": self._language_ids,
+            "walked_names": self._walked_names,
+            "names": len(self._names),
+            "columns": [[name, column.typecode, len(column)] for name, column in columns],
+        }
+        data = bytearray(json.dumps(header).encode("utf-8") + b"\n")
+        data += self._names
+        for _, column in columns:
+            data += column.tobytes()
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(zlib.compress(bytes(data), 1))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple["FileTable", array]:
+        """
+        Load a table saved with save.
+
+        Args:
+            path: The saved file
+
+        Returns:
+            Tuple of the table and the directory times recorded with it
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If the file is not a saved table of this version
+        """
+        with open(path, "rb") as file:
+            data = zlib.decompress(file.read())
+        header_end = data.index(b"\n")
+        header = json.loads(data[:header_end])
+        if header.get("version") != SAVE_FORMAT_VERSION:
+            raise ValueError(f"unsupported file table version {header.get('version')}")
+
+        table = cls(header["root"])
+        position = header_end + 1
+        table._names = bytearray(data[position:position + header["names"]])
+        position += header["names"]
+        columns = {}
+        for name, typecode, length in header["columns"]:
+            column = array(typecode)
+            size = length * column.itemsize
+            column.frombytes(data[position:position + size])
+            columns[name] = column
+            position += size
+        (table._dir_parents, table._file_dirs, table._name_ends, table._sizes, table._mtimes,
+         table._languages, table._flags) = (columns[name] for name, _ in table._columns())
+
+        table._dir_names = header["dir_names"]
+        table.languages = header["languages"]
+        table._language_ids = header["language_ids"]
+        table._walked_parents = columns["walked_parents"]
+        table._walked_names = header["walked_names"]
+        table._walked_mtimes = columns["dir_mtimes"]
+        # Parents come before their children, so prefixes build in one pass
+        for dir_id in range(1, len(table._dir_names)):
+            parent = table._dir_parents[dir_id]
+            name = table._dir_names[dir_id]
+            table._dir_ids[(parent, name)] = dir_id
+            table._dir_prefixes.append(table._dir_prefixes[parent] + name + os.sep)
+        return table, columns["dir_mtimes"]
+
+    def memory_usage(self) -> int:
+        """Estimate the memory used by the table, in bytes."""
+        columns = (self._dir_parents, self._file_dirs, self._name_ends, self._sizes,
+                   self._mtimes, self._languages, self._flags)
+        usage = sum(column.buffer_info()[1] * column.itemsize for column in columns)
+        usage += len(self._names)
+        usage += sum(len(name) + len(prefix) + 100 for name, prefix in zip(self._dir_names, self._dir_prefixes))
+        usage += self._walked_parents.buffer_info()[1] * self._walked_parents.itemsize
+        usage += self._walked_mtimes.buffer_info()[1] * self._walked_mtimes.itemsize
+        usage += sum(len(name) + 50 for name in self._walked_names)
+        return usage
+
+class FileSelection(Sequence[Tuple[str, str]]):
+    """
+    Some of the files of a file table, as a sequence of (file_path, rel_path).
+
+    It holds the table and the indices of the chosen files, so narrowing a
+    big scan costs a few bytes per file instead of a tuple each, and the
+    attribute columns stay available for the tree summary.
+    """
+
+    def __init__(self, table: FileTable, indices: Sequence[int]) -> None:
+        """
+        Create a selection.
+
+        Args:
+            table: The scanned files
+            indices: Indices of the chosen files in the table, in table order
+        """
+        self.table = table
+        self.root = table.root
+        self.indices = array("l", indices)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def rel_path(self, index: int) -> str:
+        """Get the relative path of the file at an index."""
+        return self.table.rel_path(self.indices[index])
+
+    @overload
+    def __getitem__(self, index: int) -> Tuple[str, str]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Tuple[str, str]]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Tuple[str, str], List[Tuple[str, str]]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.table[self.indices[index]]
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        for index in self.indices:
+            yield self.table[index]
+
+    def size(self, index: int) -> int:
+        """Get the size in bytes of the file at an index, -1 if unknown."""
+        return self.table.size(self.indices[index])
+
+    def mtime_ns(self, index: int) -> int:
+        """Get the modification time in nanoseconds of the file at an index."""
+        return self.table.mtime_ns(self.indices[index])
+
+    def language(self, index: int) -> str:
+        """Get the language name of the file at an index."""
+        return self.table.language(self.indices[index])
+
+    def flags(self, index: int) -> int:
+        """Get the FLAG_* bits of the file at an index."""
+        return self.table.flags(self.indices[index])
+
+def select_files(files: Sequence[Tuple[str, str]], indices: Sequence[int]) -> Sequence[Tuple[str, str]]:
+    """
+    Narrow scanned files to some of them.
+
+    Args:
+        files: The scanned files, a FileTable or a list of tuples
+        indices: Indices of the chosen files, in order
+
+    Returns:
+        A FileSelection over a file table, or a list of the chosen tuples
+    """
+    if isinstance(files, FileTable):
+        return FileSelection(files, indices)
+    if isinstance(files, FileSelection):
+        return FileSelection(files.table, [files.indices[index] for index in indices])
+    return [files[index] for index in indices]
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lazy file tree for the Code Processor application.
+
+Big selections are shown as a tree instead of one text line per file. The
+FileTree model is built once per scan, off the Tk thread: it keeps the
+directories of the selection with the file count, bytes and tokens of
+everything below each of them, and an include flag per file. The
+FileTreeView widget only inserts the children of the directories that are
+expanded, a page of files at a time, so opening a tree of 100k files costs
+as much as showing its first level.
+"""
+
+import os
+from array import array
+from tkinter import ttk
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import customtkinter as ctk
+
+from constants import DEFAULT_FONT_SIZE
+from texts import TEXTS
+from logger import get_logger
+from helpers import get_file_language
+from file_table import select_files
+from tree_summary import estimate_tokens, format_size, iter_scanned_sizes
+
+# Get module logger
+logger = get_logger(__name__)
+
+# Files inserted at a time when a directory is expanded
+CHILD_PAGE = 500
+
+# Include states of a directory
+INCLUDED = "included"
+EXCLUDED = "excluded"
+PARTIAL = "partial"
+
+# Checkbox glyphs of the include column
+CHECKBOXES = {INCLUDED: "☑", EXCLUDED: "☐", PARTIAL: "◩"}
+
+class FileTree:
+    """
+    Directories, aggregates and include flags of a set of scanned files.
+
+    Directory 0 is the root. Files are referred to by their index in the
+    scanned sequence, which they keep, so the selection is handed to the
+    formatting code in scan order.
+    """
+
+    def __init__(self, files: Sequence[Tuple[str, str]]) -> None:
+        """
+        Build the tree of scanned files.
+
+        Args:
+            files: Sequence of tuples (file_path, relative_path), as scanned
+        """
+        self.files = files
+        self._parents = array("l", [-1])
+        self._names: List[str] = [""]
+        self._child_dirs: List[Dict[str, int]] = [{}]
+        self._dir_files: List[array] = [array("l")]
+        self._file_dirs = array("l")
+        self._file_names: List[str] = []
+        self._sizes = array("q")
+        self._included = bytearray()
+        # Totals of everything below each directory
+        self._total_files = array("l", [0])
+        self._total_bytes = array("q", [0])
+        self.sizes_known = True
+
+        last_dir: Tuple[str, int] = ("", 0)
+        for index, (rel_path, size) in enumerate(iter_scanned_sizes(files)):
+            rel_dir, _, name = rel_path.replace(os.sep, "/").rpartition("/")
+            if rel_dir != last_dir[0]:
+                last_dir = (rel_dir, self._get_dir_id(rel_dir))
+            dir_id = last_dir[1]
+            self._dir_files[dir_id].append(index)
+            self._file_dirs.append(dir_id)
+            self._file_names.append(name)
+            self._sizes.append(max(size, 0))
+            self._included.append(1)
+            self._total_files[dir_id] += 1
+            self._total_bytes[dir_id] += max(size, 0)
+            if size < 0:
+                self.sizes_known = False
+
+        # Children are created after their parents, so one backward pass adds up the totals
+        for dir_id in range(len(self._names) - 1, 0, -1):
+            parent = self._parents[dir_id]
+            self._total_files[parent] += self._total_files[dir_id]
+            self._total_bytes[parent] += self._total_bytes[dir_id]
+        # Everything starts included
+        self._selected_files = array("l", self._total_files)
+        self._selected_bytes = array("q", self._total_bytes)
+        logger.info(f"Built file tree of {len(self._file_dirs)} files in {len(self._names)} directories")
+
+    def _get_dir_id(self, rel_dir: str) -> int:
+        """Get the node of a relative directory, adding it and its parents if needed."""
+        dir_id = 0
+        for name in rel_dir.split("/") if rel_dir else ():
+            child = self._child_dirs[dir_id].get(name)
+            if child is None:
+                child = len(self._names)
+                self._child_dirs[dir_id][name] = child
+                self._parents.append(dir_id)
+                self._names.append(name)
+                self._child_dirs.append({})
+                self._dir_files.append(array("l"))
+                self._total_files.append(0)
+                self._total_bytes.append(0)
+            dir_id = child
+        return dir_id
+
+    def __len__(self) -> int:
+        return len(self._file_dirs)
+
+    def dir_name(self, dir_id: int) -> str:
+        """Get the name of a directory."""
+        return self._names[dir_id]
+
+    def dir_parent(self, dir_id: int) -> int:
+        """Get the parent of a directory, -1 for the root."""
+        return self._parents[dir_id]
+
+    def child_dirs(self, dir_id: int) -> List[int]:
+        """Get the subdirectories of a directory, sorted by name."""
+        return [child for _, child in sorted(self._child_dirs[dir_id].items())]
+
+    def dir_files(self, dir_id: int) -> Sequence[int]:
+        """Get the indices of the files directly in a directory, in scan order."""
+        return self._dir_files[dir_id]
+
+    def dir_totals(self, dir_id: int) -> Tuple[int, int]:
+        """Get the number of files and bytes below a directory."""
+        return self._total_files[dir_id], self._total_bytes[dir_id]
+
+    def dir_state(self, dir_id: int) -> str:
+        """Get whether the files below a directory are INCLUDED, EXCLUDED or PARTIAL."""
+        selected = self._selected_files[dir_id]
+        if selected == self._total_files[dir_id]:
+            return INCLUDED
+        return EXCLUDED if selected == 0 else PARTIAL
+
+    def file_name(self, index: int) -> str:
+        """Get the name of a file."""
+        return self._file_names[index]
+
+    def file_dir(self, index: int) -> int:
+        """Get the directory of a file."""
+        return self._file_dirs[index]
+
+    def file_size(self, index: int) -> int:
+        """Get the size of a file in bytes, 0 if unknown."""
+        return self._sizes[index]
+
+    def is_included(self, index: int) -> bool:
+        """Check if a file is included in the selection."""
+        return bool(self._included[index])
+
+    def _add_to_ancestors(self, dir_id: int, files: int, size: int) -> None:
+        while dir_id >= 0:
+            self._selected_files[dir_id] += files
+            self._selected_bytes[dir_id] += size
+            dir_id = self._parents[dir_id]
+
+    def set_file_included(self, index: int, included: bool) -> None:
+        """
+        Include or exclude a file.
+
+        Args:
+            index: The index of the file
+            included: Whether the file is included
+        """
+        if bool(self._included[index]) == included:
+            return
+        self._included[index] = int(included)
+        sign = 1 if included else -1
+        self._add_to_ancestors(self._file_dirs[index], sign, sign * self._sizes[index])
+
+    def _set_subtree(self, dir_id: int, included: bool) -> Tuple[int, int]:
+        """Set the files below a directory, returning the change of its selected totals."""
+        value = int(included)
+        sign = 1 if included else -1
+        files = 0
+        size = 0
+        for index in self._dir_files[dir_id]:
+            if self._included[index] != value:
+                self._included[index] = value
+                files += sign
+                size += sign * self._sizes[index]
+        for child in self._child_dirs[dir_id].values():
+            child_files, child_size = self._set_subtree(child, included)
+            files += child_files
+            size += child_size
+        self._selected_files[dir_id] += files
+        self._selected_bytes[dir_id] += size
+        return files, size
+
+    def set_dir_included(self, dir_id: int, included: bool) -> None:
+        """
+        Include or exclude every file below a directory.
+
+        Args:
+            dir_id: The directory
+            included: Whether the files are included
+        """
+        files, size = self._set_subtree(dir_id, included)
+        self._add_to_ancestors(self._parents[dir_id], files, size)
+
+    def selected_totals(self) -> Tuple[int, int]:
+        """Get the number of files and bytes included in the selection."""
+        return self._selected_files[0], self._selected_bytes[0]
+
+    def selected_files(self) -> Sequence[Tuple[str, str]]:
+        """
+        Get the files included in the selection.
+
+        Returns:
+            The scanned files themselves when all are included, otherwise
+            the included ones in scan order
+        """
+        if self._selected_files[0] == len(self):
+            return self.files
+        return select_files(self.files, [index for index, included in enumerate(self._included) if included])
+
+class FileTreeView:
+    """
+    A ttk.Treeview showing a FileTree, populated as directories are expanded.
+
+    Clicking the include column toggles a file or a whole directory.
+    """
+
+    def __init__(self, parent: Any, on_change: Optional[Callable[[], None]] = None) -> None:
+        """
+        Create an empty tree view.
+
+        Args:
+            parent: The parent widget
+            on_change: Called after the user includes or excludes files
+        """
+        self.model: Optional[FileTree] = None
+        self.on_change = on_change
+        # Files of each expanded directory inserted so far
+        self._loaded: Dict[int, int] = {}
+
+        self.frame = ctk.CTkFrame(parent)
+        self.style = ttk.Style(self.frame)
+        self.tree = ttk.Treeview(self.frame, columns=("include", "files", "size", "tokens"),
+                                 selectmode="browse", style="FileTree.Treeview")
+        self.tree.heading("#0", text=TEXTS["tree_column_name"], anchor="w")
+        self.tree.heading("include", text=TEXTS["tree_column_include"])
+        self.tree.heading("files", text=TEXTS["tree_column_files"])
+        self.tree.heading("size", text=TEXTS["tree_column_size"])
+        self.tree.heading("tokens", text=TEXTS["tree_column_tokens"])
+        self.tree.column("#0", width=320, stretch=True)
+        self.tree.column("include", width=60, anchor="center", stretch=False)
+        for column in ("files", "size", "tokens"):
+            self.tree.column(column, width=90, anchor="e", stretch=False)
+
+        scrollbar = ctk.CTkScrollbar(self.frame, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.tree.bind("<<TreeviewOpen>>", self._on_open)
+        self.tree.bind("<Button-1>", self._on_click)
+        self.tree.bind("<space>", self._on_space)
+        self.apply_theme()
+
+    def pack(self, **kwargs: Any) -> None:
+        """Pack the view's frame."""
+        self.frame.pack(**kwargs)
+
+    def apply_theme(self) -> None:
+        """Match the tree colors to the current appearance mode."""
+        dark = ctk.get_appearance_mode() == "Dark"
+        background, foreground, selected = ("#2b2b2b", "#dce4ee", "#1f538d") if dark else ("#ffffff", "#1a1a1a", "#3a7ebf")
+        self.style.configure("FileTree.Treeview", background=background, fieldbackground=background,
+                             foreground=foreground, rowheight=DEFAULT_FONT_SIZE * 2 + 4)
+        self.style.map("FileTree.Treeview", background=[("selected", selected)])
+
+    def set_tree(self, model: Optional[FileTree], root_name: str = ".") -> None:
+        """
+        Show a new file tree, with only its first level inserted.
+
+        Args:
+            model: The tree to show, None to clear the view
+            root_name: The label of the root directory
+        """
+        self.tree.delete(*self.tree.get_children())
+        self._loaded = {}
+        self.model = model
+        if model is None:
+            return
+        self.tree.insert("", "end", iid="d0", text=root_name, open=True, values=self._dir_values(0))
+        self._load_children(0)
+
+    def refresh(self) -> None:
+        """Show include flags changed in the model by someone else than the view."""
+        if self.model is not None:
+            self._refresh_subtree("d0")
+
+    def reveal(self, index: int) -> None:
+        """
+        Expand the directories of a file and scroll to it.
+
+        Args:
+            index: The index of the file
+        """
+        if self.model is None:
+            return
+        ancestors = []
+        dir_id = self.model.file_dir(index)
+        while dir_id >= 0:
+            ancestors.append(dir_id)
+            dir_id = self.model.dir_parent(dir_id)
+        for dir_id in reversed(ancestors):
+            if dir_id not in self._loaded:
+                self._load_children(dir_id)
+            self.tree.item(f"d{dir_id}", open=True)
+        # Files are inserted a page at a time
+        item = f"f{index}"
+        while not self.tree.exists(item):
+            self._load_files(ancestors[0])
+        self.tree.see(item)
+        self.tree.selection_set(item)
+
+    def _dir_values(self, dir_id: int) -> Tuple[str, ...]:
+        files, size = self.model.dir_totals(dir_id)
+        return (CHECKBOXES[self.model.dir_state(dir_id)], str(files), *self._size_values(size))
+
+    def _file_values(self, index: int) -> Tuple[str, ...]:
+        state = INCLUDED if self.model.is_included(index) else EXCLUDED
+        return (CHECKBOXES[state], "", *self._size_values(self.model.file_size(index)))
+
+    def _size_values(self, size: int) -> Tuple[str, str]:
+        if not self.model.sizes_known:
+            return "", ""
+        return format_size(size), f"~{estimate_tokens(size)}"
+
+    def _load_children(self, dir_id: int) -> None:
+        """Insert the subdirectories and the first page of files of a directory."""
+        item = f"d{dir_id}"
+        # Drop the placeholder that made the directory expandable
+        self.tree.delete(*self.tree.get_children(item))
+        for child in self.model.child_dirs(dir_id):
+            child_item = self.tree.insert(item, "end", iid=f"d{child}", text=self.model.dir_name(child),
+                                          values=self._dir_values(child))
+            self.tree.insert(child_item, "end", iid=f"p{child}", text="")
+        self._loaded[dir_id] = 0
+        self._load_files(dir_id)
+
+    def _load_files(self, dir_id: int) -> None:
+        """Insert the next page of files of an expanded directory."""
+        item = f"d{dir_id}"
+        more_item = f"m{dir_id}"
+        if self.tree.exists(more_item):
+            self.tree.delete(more_item)
+        files = self.model.dir_files(dir_id)
+        start = self._loaded[dir_id]
+        end = min(start + CHILD_PAGE, len(files))
+        for index in files[start:end]:
+            name = self.model.file_name(index)
+            self.tree.insert(item, "end", iid=f"f{index}", text=f"{name} ({get_file_language(name)})",
+                             values=self._file_values(index))
+        self._loaded[dir_id] = end
+        if end < len(files):
+            self.tree.insert(item, "end", iid=more_item,
+                             text=TEXTS["tree_more_files"].format(count=len(files) - end))
+
+    def _on_open(self, event: Any) -> None:
+        item = self.tree.focus()
+        if item.startswith("d") and int(item[1:]) not in self._loaded:
+            self._load_children(int(item[1:]))
+
+    def _on_click(self, event: Any) -> Optional[str]:
+        item = self.tree.identify_row(event.y)
+        if not item or self.model is None:
+            return None
+        if item.startswith("m"):
+            self._load_files(int(item[1:]))
+            return "break"
+        if self.tree.identify_column(event.x) == "#1":
+            self._toggle(item)
+            return "break"
+        return None
+
+    def _on_space(self, event: Any) -> str:
+        item = self.tree.focus()
+        if item and self.model is not None and item[0] in "df":
+            self._toggle(item)
+        return "break"
+
+    def _toggle(self, item: str) -> None:
+        """Include or exclude the file or directory of an item and refresh what changed."""
+        number = int(item[1:])
+        if item.startswith("d"):
+            self.model.set_dir_included(number, self.model.dir_state(number) != INCLUDED)
+            self._refresh_subtree(item)
+            dir_id = self.model.dir_parent(number)
+        elif item.startswith("f"):
+            self.model.set_file_included(number, not self.model.is_included(number))
+            self.tree.item(item, values=self._file_values(number))
+            dir_id = self.model.file_dir(number)
+        else:
+            return
+        # Only the ancestors' checkboxes change outside the subtree
+        while dir_id >= 0:
+            self.tree.item(f"d{dir_id}", values=self._dir_values(dir_id))
+            dir_id = self.model.dir_parent(dir_id)
+        if self.on_change is not None:
+            self.on_change()
+
+    def _refresh_subtree(self, item: str) -> None:
+        """Refresh the inserted items below an item; items not inserted yet read the model later."""
+        stack = [item]
+        while stack:
+            current = stack.pop()
+            if current.startswith("d"):
+                self.tree.item(current, values=self._dir_values(int(current[1:])))
+                stack.extend(self.tree.get_children(current))
+            elif current.startswith("f"):
+                self.tree.item(current, values=self._file_values(int(current[1:])))
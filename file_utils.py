@@ -93,6 +93,8 @@ def list_files_in_directory(directory: str, recursive: bool = True) -> List[str]
     logger.info(f"Found {len(files)} supported files")
     return files
 
+FALLBACK_ENCODINGS = ['utf-8', 'latin-1', 'cp1252']
+
 def read_file_with_fallback(file_path: str) -> Tuple[str, Optional[str]]:
     """
     Read a file with encoding fallback.
@@ -103,9 +105,7 @@ def read_file_with_fallback(file_path: str) -> Tuple[str, Optional[str]]:
     Returns:
         A tuple of (file_content, error_message)
     """
-    encodings = ['utf-8', 'latin-1', 'cp1252']
-    
-    for encoding in encodings:
+    for encoding in FALLBACK_ENCODINGS:
         try:
             with open(file_path, 'r', encoding=encoding) as file:
                 content = file.read()
@@ -120,3 +120,28 @@ def read_file_with_fallback(file_path: str) -> Tuple[str, Optional[str]]:
     error_msg = f"Could not decode file {file_path} with any of the attempted encodings"
     logger.error(error_msg)
     return "", error_msg
+
+def decode_with_fallback(data: bytes, file_path: str) -> Tuple[str, Optional[str]]:
+    """
+    Decode raw file bytes the same way read_file_with_fallback reads files.
+    
+    Universal newlines are translated like text-mode reads do, so content
+    from other sources bundles identically to content read from disk.
+    
+    Args:
+        data: The raw file bytes
+        file_path: The path of the file, for error messages
+        
+    Returns:
+        A tuple of (file_content, error_message)
+    """
+    for encoding in FALLBACK_ENCODINGS:
+        try:
+            content = data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+        return content.replace("\r\n", "\n").replace("\r", "\n"), None
+    
+    error_msg = f"Could not decode file {file_path} with any of the attempted encodings"
+    logger.error(error_msg)
+    return "", error_msg
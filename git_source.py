@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Git source backend for the Code Processor application.
+
+Bundles a branch, tag or commit (``repo@rev``) straight from the git object
+database, without touching the working tree. Files are listed once with
+``git ls-tree -r`` and blob contents are streamed through a single
+long-lived ``git cat-file --batch`` process.
+"""
+
+import os
+import subprocess
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from constants import SUPPORTED_FILE_TYPES
+from logger import get_logger
+from file_utils import normalize_path, decode_with_fallback
+from error_handler import with_error_handling
+
+# Get module logger
+logger = get_logger(__name__)
+
+GIT_SPEC_SEPARATOR = "@"
+
+def parse_git_spec(path: str) -> Optional[Tuple[str, str]]:
+    """
+    Parse a ``repo@rev`` specification.
+
+    Paths that exist on disk are never treated as git specifications, so
+    directories with an ``@`` in their name keep working.
+
+    Args:
+        path: The path or ``repo@rev`` specification
+
+    Returns:
+        A tuple (repo, rev), or None if the path is not a git specification
+    """
+    if GIT_SPEC_SEPARATOR not in path or os.path.exists(path):
+        return None
+
+    repo, rev = path.rsplit(GIT_SPEC_SEPARATOR, 1)
+    if not repo or not os.path.isdir(repo):
+        return None
+    return normalize_path(repo), rev or "HEAD"
+
+class GitSource:
+    """
+    Files of one git revision, read from the object database.
+
+    ``list_files`` returns ``(file_path, rel_path)`` tuples like
+    ``process_directory`` does, and ``read_file`` follows the
+    ``read_file_with_fallback`` contract, so both plug straight into
+    ``format_files_for_ai``.
+    """
+
+    def __init__(self, repo: str, rev: str = "HEAD") -> None:
+        """
+        Resolve a revision of a repository.
+
+        Args:
+            repo: Path to the repository (working tree or bare)
+            rev: Branch, tag, commit or any other git revision
+        """
+        self.repo = normalize_path(repo)
+        self.rev = rev
+        self.commit = self._git("rev-parse", "--verify", f"{rev}^{{commit}}").decode("ascii").strip()
+        self._blobs: Dict[str, str] = {}
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        logger.info(f"Opened git source {self.repo}@{rev} ({self.commit})")
+
+    def _git(self, *args: str) -> bytes:
+        """Run a git command in the repository and return its output."""
+        result = subprocess.run(
+            ["git", "-C", self.repo] + list(args),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.decode("utf-8", "replace").strip())
+        return result.stdout
+
+    @with_error_handling("git_source", return_on_error=[])
+    def list_files(self) -> List[Tuple[str, str]]:
+        """
+        List the supported files of the revision.
+
+        Returns:
+            list: List of tuples (file_path, relative_path), sorted by relative path
+        """
+        files = []
+        output = self._git("ls-tree", "-r", "-z", "--full-tree", self.commit)
+        for record in output.split(b"\0"):
+            if not record:
+                continue
+            meta, _, path = record.partition(b"\t")
+            mode, obj_type, sha = meta.split(b" ")
+            # Skip submodules and symlinks, which have no file content to bundle
+            if obj_type != b"blob" or mode == b"120000":
+                continue
+
+            rel_path = os.path.normpath(path.decode("utf-8", "surrogateescape"))
+            _, ext = os.path.splitext(rel_path.lower())
+            if ext in SUPPORTED_FILE_TYPES:
+                file_path = f"{self.repo}{GIT_SPEC_SEPARATOR}{self.rev}:{rel_path}"
+                self._blobs[file_path] = sha.decode("ascii")
+                files.append((file_path, rel_path))
+
+        files.sort(key=lambda x: x[1])
+        logger.info(f"Found {len(files)} supported files in {self.repo}@{self.rev}")
+        return files
+
+    def _start_batch(self) -> subprocess.Popen:
+        """Start the long-lived ``git cat-file --batch`` process."""
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                ["git", "-C", self.repo, "cat-file", "--batch"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+        return self._process
+
+    def read_blob(self, sha: str) -> bytes:
+        """
+        Read a blob through the batch process.
+
+        Args:
+            sha: The blob object id
+
+        Returns:
+            The raw blob content
+        """
+        with self._lock:
+            process = self._start_batch()
+            process.stdin.write(sha.encode("ascii") + b"\n")
+            process.stdin.flush()
+            header = process.stdout.readline()
+            if not header:
+                raise RuntimeError("git cat-file exited unexpectedly")
+            fields = header.split()
+            if len(fields) != 3:
+                raise RuntimeError(f"git cat-file: {header.decode('utf-8', 'replace').strip()}")
+            size = int(fields[2])
+            data = process.stdout.read(size)
+            # Each object is followed by a newline
+            process.stdout.read(1)
+        return data
+
+    def read_file(self, file_path: str) -> Tuple[str, Optional[str]]:
+        """
+        Read a listed file with encoding fallback.
+
+        Args:
+            file_path: A file path returned by list_files
+
+        Returns:
+            A tuple of (file_content, error_message)
+        """
+        sha = self._blobs.get(file_path)
+        if sha is None:
+            error_msg = f"Error reading file {file_path}: not listed in {self.repo}@{self.rev}"
+            logger.error(error_msg)
+            return "", error_msg
+
+        try:
+            data = self.read_blob(sha)
+        except Exception as e:
+            error_msg = f"Error reading file {file_path}: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            return "", error_msg
+        return decode_with_fallback(data, file_path)
+
+    def close(self) -> None:
+        """Stop the batch process."""
+        with self._lock:
+            if self._process is not None:
+                if self._process.poll() is None:
+                    self._process.stdin.close()
+                    self._process.wait()
+                self._process.stdout.close()
+                self._process = None
+
+    def __enter__(self) -> "GitSource":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+@with_error_handling("git_source", return_on_error=None)
+def open_git_source(repo: str, rev: str = "HEAD") -> GitSource:
+    """
+    Open a git revision as a file source.
+
+    Args:
+        repo: Path to the repository
+        rev: The revision to bundle
+
+    Returns:
+        The git source, or None if the revision could not be resolved
+    """
+    return GitSource(repo, rev)
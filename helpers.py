@@ -2,18 +2,21 @@
 # -*- coding: utf-8 -*-
 """
 Helper functions for the Code Processor application.
+
+The browser, clipboard and dialog modules are imported by the helpers
+using them, so that scanning and formatting, which only need
+get_file_language, load without any GUI module.
 """
 
 import os
-from typing import Optional, Union
-import webbrowser
-import pyperclip
-from tkinter import messagebox, filedialog
-import customtkinter as ctk
-from constants import SUPPORTED_FILE_TYPES
+from typing import Callable, List, Optional, Union
+from constants import ARCHIVE_EXTENSIONS, SUPPORTED_FILE_TYPES
 from texts import TEXTS
 from logger import get_logger
 from error_handler import with_error_handling
+from compression import COMPRESSED_OUTPUT_TYPES, atomic_output
+from bundle_buffer import BundleBuffer
+from fanout import FanOutWriter
 
 # Get module logger
 logger = get_logger(__name__)
@@ -30,46 +33,144 @@ def open_url(url: str, platform_name: Optional[str] = None) -> bool:
     Returns:
         bool: True if successful, False otherwise
     """
+    import webbrowser
     logger.info(f"Opening URL: {url}")
     webbrowser.open(url)
     return True
 
 @with_error_handling("clipboard", return_on_error=False)
-def copy_to_clipboard(text: str) -> bool:
+def copy_to_clipboard(text: Union[str, BundleBuffer]) -> bool:
     """
     Copy text to the clipboard.
     
+    A bundle buffer is read whole into one string, outside its memory
+    ceiling; the GUI copies bundles with clipboard_transfer instead.
+    
     Args:
-        text: The text to copy
+        text: The text to copy, or a bundle buffer
     
     Returns:
         bool: True if successful, False otherwise
     """
+    import pyperclip
     logger.info("Copying content to clipboard")
+    if isinstance(text, BundleBuffer):
+        # The clipboard takes one string, materialized only for the copy
+        text = text.getvalue()
     pyperclip.copy(text)
     return True
 
-@with_error_handling("save_file", return_on_error=False)
-def save_to_file(content: str, default_filename: str = "processed_code.txt") -> bool:
+def ask_save_path(default_filename: str, allow_compressed: bool = True) -> str:
     """
-    Save content to a text file.
+    Open a save dialog for a bundle.
     
     Args:
-        content: The content to save
         default_filename: Default filename to suggest
+        allow_compressed: Whether to offer the compressed output types
     
     Returns:
-        bool: True if successful, False otherwise
+        str: The chosen path, or an empty string if canceled
     """
-    file_path = filedialog.asksaveasfilename(
+    from tkinter import filedialog
+    filetypes = [("Text files", "*.txt")]
+    if allow_compressed:
+        filetypes += [(label, f"*{ext}") for ext, label in COMPRESSED_OUTPUT_TYPES.items()]
+    return filedialog.asksaveasfilename(
         defaultextension=".txt",
-        filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
+        filetypes=filetypes + [("All files", "*.*")],
         initialfile=default_filename
     )
+
+@with_error_handling("save_file", return_on_error=False)
+def save_to_file(content: Union[str, BundleBuffer], default_filename: str = "processed_code.txt",
+                 file_path: Optional[str] = None,
+                 progress: Optional[Callable[[int, int], None]] = None) -> bool:
+    """
+    Save content to a text file, compressed if a .gz, .xz or .zip name is chosen.
+    
+    Args:
+        content: The content to save; a bundle buffer is streamed to the file
+        default_filename: Default filename to suggest
+        file_path: The path to save to, to skip the dialog (for example when
+            the dialog was shown before starting a background job)
+        progress: Optional callback called with (bytes written, total bytes)
+    
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    if file_path is None:
+        file_path = ask_save_path(default_filename)
     if file_path:
         logger.info(f"Saving content to file: {file_path}")
-        with open(file_path, "w", encoding="utf-8") as file:
-            file.write(content)
+        # .gz, .xz and .zip paths are compressed while writing; a failed or
+        # cancelled save leaves no partial file behind
+        with atomic_output(file_path) as file:
+            if isinstance(content, BundleBuffer):
+                content.write_to(file, progress)
+            else:
+                file.write(content)
+        return True
+    logger.info("File save cancelled by user")
+    return False
+
+@with_error_handling("save_file", return_on_error=False)
+def save_while_processing(write_bundle: Callable[[FanOutWriter], int], buffer: BundleBuffer,
+                          default_filename: str = "processed_code.txt",
+                          file_path: Optional[str] = None) -> bool:
+    """
+    Produce a bundle into a buffer and a file in a single pass.
+    
+    Args:
+        write_bundle: Function writing the bundle to the output it is given,
+            returning the number of files written; 0 means it failed
+        buffer: The buffer also receiving the bundle, for the clipboard
+        default_filename: Default filename to suggest
+        file_path: The path to save to, to skip the dialog
+    
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    if file_path is None:
+        file_path = ask_save_path(default_filename)
+    if file_path:
+        logger.info(f"Processing and saving to file: {file_path}")
+        # .gz, .xz and .zip paths are compressed while writing; a failed or
+        # cancelled save leaves no partial file behind
+        with atomic_output(file_path) as file, FanOutWriter() as output:
+            output.add_sink(buffer, "buffer")
+            output.add_sink(file, file_path)
+            if not write_bundle(output):
+                # The bundle failed and reported why, as with_error_handling
+                # does; raising discards the partial file
+                raise RuntimeError(TEXTS["error_bundle_incomplete"])
+        return True
+    logger.info("File save cancelled by user")
+    return False
+
+@with_error_handling("save_file", return_on_error=False)
+def save_indexed_bundle(buffer: BundleBuffer, default_filename: str = "processed_code.txt",
+                        file_path: Optional[str] = None,
+                        progress: Optional[Callable[[int, int], None]] = None) -> bool:
+    """
+    Save a processed bundle as a seekable bundle ending with a footer index.
+    
+    Args:
+        buffer: The processed bundle, saved as it is with the index appended
+        default_filename: Default filename to suggest
+        file_path: The path to save to, to skip the dialog
+        progress: Optional callback called with (bytes written, total bytes)
+    
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    # Imported here, bundle_index builds on this module
+    from bundle_index import write_indexed_buffer
+    
+    if file_path is None:
+        file_path = ask_save_path(default_filename, allow_compressed=False)
+    if file_path:
+        logger.info(f"Saving indexed bundle to file: {file_path}")
+        write_indexed_buffer(file_path, buffer, progress)
         return True
     logger.info("File save cancelled by user")
     return False
@@ -96,6 +197,7 @@ def change_appearance_mode(new_mode: str) -> None:
     Args:
         new_mode: The new appearance mode ("Light", "Dark", or "System")
     """
+    import customtkinter as ctk
     logger.info(f"Changing appearance mode to: {new_mode}")
     ctk.set_appearance_mode(new_mode)
 
@@ -106,9 +208,46 @@ def select_directory() -> Optional[str]:
     Returns:
         str: Selected directory path or None if canceled
     """
+    from tkinter import filedialog
     directory = filedialog.askdirectory(title="Select Directory")
     if directory:
         logger.info(f"Selected directory: {directory}")
     else:
         logger.info("Directory selection cancelled by user")
     return directory
+
+def ask_git_revision() -> Optional[str]:
+    """
+    Open a dialog asking for a git revision.
+    
+    Returns:
+        str: The entered branch, tag or commit, or None if canceled
+    """
+    import customtkinter as ctk
+    dialog = ctk.CTkInputDialog(text=TEXTS["prompt_git_revision"], title=TEXTS["button_git_revision"])
+    revision = dialog.get_input()
+    if revision:
+        revision = revision.strip()
+        logger.info(f"Selected git revision: {revision}")
+    else:
+        logger.info("Git revision selection cancelled by user")
+    return revision or None
+
+def select_archive() -> Optional[str]:
+    """
+    Open an archive selection dialog.
+    
+    Returns:
+        str: Selected archive path or None if canceled
+    """
+    from tkinter import filedialog
+    patterns = " ".join(f"*{ext}" for ext in ARCHIVE_EXTENSIONS)
+    archive = filedialog.askopenfilename(
+        title="Select Archive",
+        filetypes=[("Archives", patterns), ("All files", "*.*")]
+    )
+    if archive:
+        logger.info(f"Selected archive: {archive}")
+    else:
+        logger.info("Archive selection cancelled by user")
+    return archive or None
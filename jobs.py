@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Background job engine for the Code Processor application.
+
+Long actions (scanning, processing, saving) run as jobs on worker threads.
+A job reports progress by updating its state; a ``root.after`` pump on the
+Tk thread reads the latest state of every running job a few times per
+frame, computes rates and ETAs, and runs the completion callbacks, so
+widgets are only ever touched from the Tk thread. Cancellation is
+cooperative: the job's next progress report raises JobCancelled.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from logger import get_logger
+from error_handler import format_errors, pop_deferred_errors
+
+# Get module logger
+logger = get_logger(__name__)
+
+# Milliseconds between two runs of the pump, about one frame
+PUMP_INTERVAL_MS = 16
+
+# Job states reported in events
+STARTED = "started"
+PROGRESS = "progress"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+def format_duration(seconds: float) -> str:
+    """
+    Format a duration for display, such as an ETA.
+
+    Args:
+        seconds: The duration in seconds
+
+    Returns:
+        str: The duration as m:ss, or h:mm:ss from an hour on
+    """
+    minutes, seconds = divmod(int(seconds + 0.5), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+class JobCancelled(BaseException):
+    """
+    Raised inside a job once it is cancelled.
+
+    Like asyncio.CancelledError, it is a BaseException, so the broad
+    ``except Exception`` handlers of the processing code let it through.
+    """
+
+class JobEvent(NamedTuple):
+    """State of a job, as delivered to the UI."""
+    kind: str
+    state: str
+    done: int
+    total: Optional[int]
+    bytes_done: int
+    total_bytes: Optional[int]
+    rate: Optional[float]  # Bytes per second, if bytes are reported
+    item_rate: Optional[float]  # Items per second
+    eta: Optional[float]  # Seconds left, if the total is known
+    message: Optional[str]
+
+class Job:
+    """A unit of background work, and the handle the work reports through."""
+
+    def __init__(self, kind: str, func: Callable[["Job"], Any],
+                 on_success: Optional[Callable[[Any], None]] = None,
+                 on_failure: Optional[Callable[[str], None]] = None) -> None:
+        self.kind = kind
+        self.func = func
+        self.on_success = on_success
+        self.on_failure = on_failure
+        self.started_at = 0.0
+        # (done, total, bytes_done, total_bytes, message), replaced as a whole
+        self._progress = (0, None, 0, None, None)
+        self._reported: Optional[tuple] = None
+        self._cancel = threading.Event()
+        self._outcome: Optional[tuple] = None
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the job was asked to stop."""
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        """Ask the job to stop at its next progress report."""
+        self._cancel.set()
+
+    def check_cancelled(self) -> None:
+        """
+        Stop the job here if it was cancelled.
+
+        Raises:
+            JobCancelled: If the job was cancelled
+        """
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def progress(self, done: int, total: Optional[int] = None, bytes_done: int = 0,
+                 total_bytes: Optional[int] = None, message: Optional[str] = None) -> None:
+        """
+        Report progress; called from the job's thread, as often as convenient.
+
+        Args:
+            done: Items done, such as files
+            total: Total items, if known
+            bytes_done: Bytes done
+            total_bytes: Total bytes, if known
+            message: Optional text describing the current step
+
+        Raises:
+            JobCancelled: If the job was cancelled
+        """
+        self._progress = (done, total, bytes_done, total_bytes, message)
+        self.check_cancelled()
+
+    def _run(self) -> None:
+        """Run the job function on the worker thread and record its outcome."""
+        try:
+            result = self.func(self)
+            # Errors handled by with_error_handling on this thread, see error_handler
+            errors = pop_deferred_errors()
+            self._outcome = (FAILED, format_errors(errors)) if errors else (DONE, result)
+        except JobCancelled:
+            pop_deferred_errors()
+            self._outcome = (CANCELLED, None)
+        except Exception as e:
+            logger.error(f"Job {self.kind} failed: {str(e)}", exc_info=True)
+            self._outcome = (FAILED, str(e))
+
+    def _event(self, state: str) -> JobEvent:
+        """Build the event of the current state, with rate and ETA."""
+        done, total, bytes_done, total_bytes, message = self._progress
+        elapsed = time.perf_counter() - self.started_at
+        rate = bytes_done / elapsed if elapsed > 0 and bytes_done else None
+        item_rate = done / elapsed if elapsed > 0 and done else None
+        eta = None
+        if total_bytes is not None and rate:
+            eta = max(total_bytes - bytes_done, 0) / rate
+        elif total is not None and item_rate:
+            eta = max(total - done, 0) / item_rate
+        return JobEvent(self.kind, state, done, total, bytes_done, total_bytes, rate, item_rate, eta, message)
+
+class JobEngine:
+    """
+    Runs jobs on worker threads and delivers their events on the Tk thread.
+
+    Only one job of each kind runs at a time. Submitting a job of a kind
+    that is running either replaces it (the running job is cancelled and
+    the new one starts once it has stopped) or is refused.
+    """
+
+    def __init__(self, root: Any, on_event: Optional[Callable[[JobEvent], None]] = None) -> None:
+        """
+        Create a job engine.
+
+        Args:
+            root: The Tk root window whose event loop runs the pump
+            on_event: Called on the Tk thread with every job event, for
+                example to update a status bar
+        """
+        self.root = root
+        self.on_event = on_event
+        self._running: Dict[str, Job] = {}
+        self._pending: Dict[str, Job] = {}
+        self._pumping = False
+
+    def is_running(self, kind: Optional[str] = None) -> bool:
+        """Check if a job of a kind, or any job, is running."""
+        return kind in self._running if kind is not None else bool(self._running)
+
+    def submit(self, kind: str, func: Callable[[Job], Any],
+               on_success: Optional[Callable[[Any], None]] = None,
+               on_failure: Optional[Callable[[str], None]] = None,
+               replace: bool = False) -> Optional[Job]:
+        """
+        Run a function as a background job.
+
+        Args:
+            kind: Kind of the job; one job of each kind runs at a time
+            func: Function run on a worker thread with the Job as argument;
+                it must not touch widgets
+            on_success: Called on the Tk thread with the function's result
+            on_failure: Called on the Tk thread with the error text; by
+                default the error is shown in a dialog
+            replace: Whether to cancel a running job of the same kind
+                instead of refusing the new one
+
+        Returns:
+            The job, or None if a job of the same kind is running and replace is False
+        """
+        job = Job(kind, func, on_success, on_failure)
+        if kind in self._running:
+            if not replace:
+                logger.info(f"Job {kind} already running, request ignored")
+                return None
+            self._running[kind].cancel()
+            # Latest request wins, it starts once the running job has stopped
+            self._pending[kind] = job
+            return job
+        self._start(job)
+        return job
+
+    def cancel(self, kind: Optional[str] = None) -> None:
+        """
+        Cancel the jobs of a kind, or every job.
+
+        Args:
+            kind: The kind of jobs to cancel, None for all
+        """
+        for job_kind in list(self._running):
+            if kind is None or job_kind == kind:
+                self._running[job_kind].cancel()
+                self._pending.pop(job_kind, None)
+
+    def _start(self, job: Job) -> None:
+        logger.info(f"Starting job {job.kind}")
+        job.started_at = time.perf_counter()
+        job.thread = threading.Thread(target=job._run, name=f"job-{job.kind}", daemon=True)
+        self._running[job.kind] = job
+        job.thread.start()
+        self._emit(job._event(STARTED))
+        if not self._pumping:
+            self._pumping = True
+            self.root.after(PUMP_INTERVAL_MS, self._pump)
+
+    def _emit(self, event: JobEvent) -> None:
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def _pump(self) -> None:
+        """Deliver progress and completions; runs on the Tk thread."""
+        for job in list(self._running.values()):
+            if job._outcome is None:
+                if job._progress != job._reported:
+                    job._reported = job._progress
+                    self._emit(job._event(PROGRESS))
+                continue
+
+            del self._running[job.kind]
+            state, value = job._outcome
+            logger.info(f"Job {job.kind} {state}")
+            self._emit(job._event(state))
+            if state == DONE and job.on_success is not None:
+                job.on_success(value)
+            elif state == FAILED:
+                if job.on_failure is not None:
+                    job.on_failure(value)
+                else:
+                    from tkinter import messagebox
+                    messagebox.showerror("Error", value)
+
+            pending = self._pending.pop(job.kind, None)
+            if pending is not None:
+                self._start(pending)
+
+        if self._running:
+            self.root.after(PUMP_INTERVAL_MS, self._pump)
+        else:
+            self._pumping = False
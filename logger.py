@@ -18,7 +18,8 @@ def setup_logger():
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         handlers=[
-            logging.FileHandler("code_processor.log"),
+            # The log file is only opened once something is logged
+            logging.FileHandler("code_processor.log", delay=True),
             logging.StreamHandler()
         ]
     )
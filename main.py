@@ -6,9 +6,18 @@ A utility for processing code files to be shared with AI platforms.
 """
 
 import os
+import sys
+import time
+
+# "main.py --headless" runs the command line, see cli; it is dispatched
+# before the GUI imports so that tkinter is never loaded
+if __name__ == "__main__" and "--headless" in sys.argv[1:]:
+    from cli import main as headless_main
+    sys.exit(headless_main([arg for arg in sys.argv[1:] if arg != "--headless"]))
+
 import tkinter as tk
 from tkinter import filedialog, messagebox
-from typing import Any, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple, Union
 import customtkinter as ctk
 from tkinterdnd2 import DND_FILES, TkinterDnD
 
@@ -24,21 +33,51 @@ from constants import (
     DEFAULT_FONT_SIZE, DEFAULT_BUTTON_HEIGHT, AI_PLATFORMS
 )
 from helpers import (
-    open_url, copy_to_clipboard, save_to_file, 
-    get_file_language, change_appearance_mode, select_directory
+    open_url, save_to_file, ask_save_path,
+    change_appearance_mode, select_directory,
+    ask_git_revision, select_archive, save_indexed_bundle, save_while_processing
 )
 from file_processor import (
     process_directory,
     format_files_for_ai,
     parse_dropped_files
 )
+from bundle_manifest import write_and_record_bundle, format_changes_since_last_bundle
+from bundle_buffer import BundleBuffer
+from file_utils import read_file_with_fallback
+from block_cache import BlockCache
+from file_table import FileTable
+from recent_projects import (
+    WarmProject, load_recent_projects, add_recent_project, save_scan, save_blocks, preload_project
+)
+from timed_reader import get_stamp_function, get_stat_function, make_timed_reader
+from file_tree import FileTree
+from file_picker import PathIndex
+from jobs import JobEngine, JobEvent, PROGRESS, DONE, FAILED, CANCELLED, format_duration
+from tree_summary import estimate_tokens, format_size
 from ui_components import (
-    create_right_sidebar, create_appearance_mode_section, 
-    create_drop_zone, create_action_buttons, create_preview_section,
-    setup_drag_drop, update_button_colors
+    create_right_sidebar, create_appearance_mode_section, create_recent_projects_section,
+    create_drop_zone, create_action_buttons, create_preview_section, create_file_picker,
+    create_status_bar, setup_drag_drop, update_button_colors
 )
 from ui_factory import create_label, create_frame, create_button
 from texts import TEXTS
+from app_config import AppConfig
+
+# Modules only needed once the user acts are imported on first use, after the first paint
+if TYPE_CHECKING:
+    from prefetch import Prefetcher
+    from clipboard_transfer import ClipboardTransfer
+    from bundle_viewer import BundleViewer
+
+# Jobs that read or replace the selection and the bundle; the viewer's own jobs do not count
+BUNDLE_JOBS = ("scan", "process", "changes", "save")
+
+# Jobs still writing the bundle, which the viewer must not index before it is final
+BUILD_JOBS = ("process", "changes")
+
+# Milliseconds after startup before recent projects are preloaded, so the first paint comes first
+PRELOAD_DELAY_MS = 200
 
 # Set appearance mode and default color theme
 ctk.set_appearance_mode("Dark")
@@ -71,13 +110,36 @@ class CodeProcessorApp:
         self._configure_grid()
         
         # Variables
-        self.files: List[Tuple[str, str]] = []
-        self.processed_content: str = ""
+        self.directory: Optional[str] = None
+        self.files: Sequence[Tuple[str, str]] = []  # A FileTable for directories
+        self.file_tree: Optional[FileTree] = None  # Include flags of self.files, see _selected_files
+        self.path_index: Optional[PathIndex] = None  # Trigram index of self.files, for the file picker
+        self.reader = read_file_with_fallback  # Reads files of the current selection
+        self.source: Optional[Any] = None  # Open git or archive source, if any
+        self.processed_content = BundleBuffer()  # Spills to disk beyond files.bundle_memory_mb
+        self.processed_files: Optional[Sequence[Tuple[str, str]]] = None  # Files of the last full bundle
         self.buttons: List[ctk.CTkButton] = []  # Keep track of buttons for theme updates
         
+        # Blocks formatted ahead of time, see _start_prefetch
+        self.block_cache = BlockCache(AppConfig.get("files", "block_cache_mb", 256) * 1024 * 1024)
+        self._prefetcher: Optional["Prefetcher"] = None  # See the prefetcher property
+        # Copies bundles to the clipboard owned by the window, see _copy_processed_content
+        self._clipboard: Optional["ClipboardTransfer"] = None
+        # Runs scanning, processing and saving off the Tk thread, see _on_job_event
+        self.jobs = JobEngine(self.root, self._on_job_event)
+        self._clipboard_started = 0.0
+        self.viewer: Optional["BundleViewer"] = None  # Open bundle viewer, see show_bundle_viewer
+        self.recent_projects: List[str] = load_recent_projects()  # Most recent first
+        self.warm_projects: Dict[str, WarmProject] = {}  # Scans loaded back at startup, see _start_preload
+        
         # Create UI components
         self._create_right_sidebar()
         self._create_main_frame()
+        self._create_status_bar()
+        
+        # Load the recent projects once the window is painted
+        if AppConfig.get("recent", "preload", True):
+            self.root.after(PRELOAD_DELAY_MS, self._start_preload)
         logger.info("CodeProcessorApp initialization complete")
     
     def _setup_window_icon(self) -> None:
@@ -96,6 +158,7 @@ class CodeProcessorApp:
         self.root.grid_columnconfigure(0, weight=1)  # Main content area
         self.root.grid_columnconfigure(1, weight=0)  # Right sidebar
         self.root.grid_rowconfigure(0, weight=1)
+        self.root.grid_rowconfigure(1, weight=0)  # Status bar
     
     def _create_right_sidebar(self) -> None:
         """Create the right sidebar with AI platform buttons."""
@@ -107,6 +170,9 @@ class CodeProcessorApp:
         
         # Create appearance mode section
         self._create_appearance_mode_section(len(AI_PLATFORMS)+3)
+        
+        # Create recent projects section
+        self._create_recent_projects_section(len(AI_PLATFORMS)+5)
     
     def _create_appearance_mode_section(self, start_row: int) -> None:
         """
@@ -125,6 +191,84 @@ class CodeProcessorApp:
         # Add to buttons list for theme updates
         self.buttons.append(self.appearance_option_menu)
     
+    def _create_recent_projects_section(self, start_row: int) -> None:
+        """
+        Create the recent projects section in the right sidebar.
+        
+        Args:
+            start_row: The row to start placing the recent projects controls
+        """
+        self.recent_label, self.recent_option_menu = create_recent_projects_section(
+            self.right_sidebar,
+            start_row,
+            self.open_recent_project
+        )
+        self.buttons.append(self.recent_option_menu)
+        self._update_recent_projects_menu()
+    
+    def _update_recent_projects_menu(self) -> None:
+        """List the recent projects by name, with the full path where names repeat."""
+        names = [os.path.basename(os.path.normpath(project)) or project for project in self.recent_projects]
+        self.recent_labels = {}
+        for name, project in zip(names, self.recent_projects):
+            self.recent_labels[name if names.count(name) == 1 else project] = project
+        self.recent_option_menu.configure(values=list(self.recent_labels))
+        self.recent_option_menu.set(next(iter(self.recent_labels), ""))
+    
+    def open_recent_project(self, label: str) -> None:
+        """
+        Open a project chosen in the recent projects menu.
+        
+        Args:
+            label: The menu label of the project
+        """
+        project = self.recent_labels.get(label)
+        if project:
+            self.process_directory(project)
+    
+    def _start_preload(self) -> None:
+        """Load the saved scans of the recent projects, and the blocks of the last one, in the background."""
+        projects = self.recent_projects[:AppConfig.get("recent", "preload_projects", 3)]
+        if not projects:
+            return
+        
+        def preload(job: Any) -> Dict[str, WarmProject]:
+            warm = {}
+            reader = make_timed_reader()
+            get_stamp, stat = get_stamp_function(reader), get_stat_function(reader)
+            for i, project in enumerate(projects):
+                job.progress(i, len(projects))
+                # Processing the last project is the likeliest, only its blocks are loaded
+                loaded = preload_project(project, self.block_cache if i == 0 else None,
+                                         job.check_cancelled, get_stamp, stat)
+                if loaded is not None:
+                    warm[project] = loaded
+            return warm
+        
+        def on_preloaded(warm: Dict[str, WarmProject]) -> None:
+            self.warm_projects = warm
+        
+        self.jobs.submit("preload", preload, on_preloaded)
+    
+    def _start_persist(self, bundled: Optional[Sequence[Tuple[str, str]]] = None) -> None:
+        """
+        Save the scan of the current directory for the next session.
+        
+        Args:
+            bundled: Files of a bundle just built, whose blocks are saved too
+        """
+        if self.source is not None or not isinstance(self.files, FileTable):
+            return
+        directory, files = self.directory, self.files
+        
+        def persist(job: Any) -> None:
+            save_scan(directory, files)
+            if bundled:
+                save_blocks(directory, self.block_cache, bundled)
+        
+        # Only the latest state is worth saving, a pending job is replaced
+        self.jobs.submit("persist", persist, replace=True)
+    
     def _create_main_frame(self) -> None:
         """Create the main content frame with file drop zone and preview area."""
         # Create main frame
@@ -168,7 +312,9 @@ class CodeProcessorApp:
         self.buttons_frame, action_buttons = create_action_buttons(
             self.drop_zone_frame, 
             process_callback=self.process_files,
-            save_callback=self.save_as_txt
+            save_callback=self.save_as_txt,
+            changes_callback=self.process_changes,
+            process_save_callback=self.process_and_save
         )
         # Add the buttons to our tracked buttons list for theme updates
         self.buttons.extend(action_buttons)
@@ -214,12 +360,165 @@ class CodeProcessorApp:
             command=self.show_help,
             font_size=DEFAULT_FONT_SIZE
         )
-        self.help_button.pack(side="left")
+        self.help_button.pack(side="left", padx=(0, DEFAULT_PADDING))
         self.buttons.append(self.help_button)  # Track for theme updates
         
-        # Create preview text area using the ui_components module
-        self.preview_text = create_preview_section(self.preview_frame)
-        self.preview_text.pack(fill="both", expand=True, padx=DEFAULT_PADDING, pady=(0, DEFAULT_PADDING))
+        # Create Git Revision button
+        self.git_revision_button = create_button(
+            self.buttons_frame,
+            text=TEXTS["button_git_revision"],
+            command=self.select_git_revision,
+            font_size=DEFAULT_FONT_SIZE
+        )
+        self.git_revision_button.pack(side="left", padx=(0, DEFAULT_PADDING))
+        self.buttons.append(self.git_revision_button)  # Track for theme updates
+        
+        # Create Archive button
+        self.archive_button = create_button(
+            self.buttons_frame,
+            text=TEXTS["button_archive"],
+            command=self.select_archive,
+            font_size=DEFAULT_FONT_SIZE
+        )
+        self.archive_button.pack(side="left", padx=(0, DEFAULT_PADDING))
+        self.buttons.append(self.archive_button)  # Track for theme updates
+        
+        # Create View Bundle button
+        self.view_bundle_button = create_button(
+            self.buttons_frame,
+            text=TEXTS["button_view_bundle"],
+            command=self.show_bundle_viewer,
+            font_size=DEFAULT_FONT_SIZE
+        )
+        self.view_bundle_button.pack(side="left")
+        self.buttons.append(self.view_bundle_button)  # Track for theme updates
+        
+        # Create the file picker using the ui_components module
+        self.file_picker = create_file_picker(self.preview_frame, self._pick_file, self._is_picked)
+        self.file_picker.pack(fill="x", padx=DEFAULT_PADDING, pady=(0, DEFAULT_PADDING))
+        
+        # Create the lazy file tree using the ui_components module
+        self.file_tree_view = create_preview_section(self.preview_frame, self._update_selection_label)
+        self.file_tree_view.pack(fill="both", expand=True, padx=DEFAULT_PADDING, pady=(0, DEFAULT_PADDING))
+    
+    def _create_status_bar(self) -> None:
+        """Create the status bar showing the progress of background jobs."""
+        (self.status_frame, self.status_label,
+         self.status_progress, self.cancel_button) = create_status_bar(self.root, self.cancel_jobs)
+        self.status_frame.grid(row=1, column=0, columnspan=2, padx=DEFAULT_PADDING,
+                               pady=(0, DEFAULT_PADDING), sticky="ew")
+        self.buttons.append(self.cancel_button)  # Track for theme updates
+    
+    def _on_job_event(self, event: JobEvent) -> None:
+        """
+        Show the state of a background job in the status bar.
+        
+        Args:
+            event: The job event, delivered on the Tk thread
+        """
+        job_name = TEXTS.get(f"job_{event.kind}", event.kind)
+        if event.state in (DONE, FAILED, CANCELLED):
+            self.status_label.configure(text=TEXTS[f"status_{event.state}"].format(job=job_name))
+            self.status_progress.stop()
+            self.status_progress.configure(mode="determinate")
+            self.status_progress.set(1 if event.state == DONE else 0)
+            busy = self.jobs.is_running() or (self._clipboard is not None and self._clipboard.is_running())
+            self.cancel_button.configure(state="normal" if busy else "disabled")
+            if event.kind in ("process", "changes") and event.state != DONE:
+                # Never leave half a bundle around to be saved
+                self._reset_processed_content()
+                self.processed_files = None
+            return
+        
+        if event.total is None and event.total_bytes is not None:
+            parts = [TEXTS["status_bytes"].format(job=job_name, done=format_size(event.bytes_done),
+                                                  total=format_size(event.total_bytes))]
+            fraction: Optional[float] = event.bytes_done / event.total_bytes if event.total_bytes else 1
+        elif event.total is not None:
+            parts = [TEXTS["status_files_total"].format(job=job_name, done=event.done, total=event.total)]
+            fraction = event.done / event.total if event.total else 1
+        else:
+            parts = [TEXTS["status_files"].format(job=job_name, done=event.done)]
+            fraction = None
+        if event.rate:
+            parts.append(TEXTS["status_rate"].format(rate=format_size(event.rate)))
+        if event.eta is not None:
+            parts.append(TEXTS["status_eta"].format(eta=format_duration(event.eta)))
+        self.status_label.configure(text=" - ".join(parts))
+        
+        if fraction is None:
+            # Unknown total, keep the bar moving
+            if self.status_progress.cget("mode") != "indeterminate":
+                self.status_progress.configure(mode="indeterminate")
+                self.status_progress.start()
+        else:
+            if self.status_progress.cget("mode") != "determinate":
+                self.status_progress.stop()
+                self.status_progress.configure(mode="determinate")
+            self.status_progress.set(fraction)
+        self.cancel_button.configure(state="normal")
+    
+    def cancel_jobs(self) -> None:
+        """Cancel the running background jobs and clipboard copy."""
+        logger.info("Cancelling background jobs")
+        self.jobs.cancel()
+        if self._clipboard is not None and self._clipboard.is_running():
+            self._clipboard.cancel()
+            self._on_job_event(self._clipboard_event(CANCELLED))
+    
+    def _clipboard_event(self, state: str, done: int = 0, total: Optional[int] = None) -> JobEvent:
+        """
+        Build a status event for the clipboard copy, which runs on the Tk thread rather than as a job.
+        
+        Args:
+            state: The job state
+            done: Bytes copied
+            total: Total bytes
+        
+        Returns:
+            JobEvent: The event, with rate and ETA
+        """
+        elapsed = time.perf_counter() - self._clipboard_started
+        rate = done / elapsed if elapsed > 0 and done else None
+        eta = max(total - done, 0) / rate if rate and total is not None else None
+        return JobEvent("clipboard", state, 0, None, done, total, rate, None, eta, None)
+    
+    @property
+    def prefetcher(self) -> "Prefetcher":
+        """The prefetcher of the selection, created on first use."""
+        if self._prefetcher is None:
+            from prefetch import Prefetcher
+            self._prefetcher = Prefetcher(self.block_cache)
+        return self._prefetcher
+    
+    def _cancel_prefetch(self) -> None:
+        """Stop the running prefetch, without creating the prefetcher if none ran yet."""
+        if self._prefetcher is not None:
+            self._prefetcher.cancel()
+    
+    @property
+    def clipboard(self) -> "ClipboardTransfer":
+        """The clipboard transfer of the window, created on first use."""
+        if self._clipboard is None:
+            from clipboard_transfer import ClipboardTransfer
+            self._clipboard = ClipboardTransfer(self.root)
+        return self._clipboard
+    
+    def _refuse_if_busy(self, kinds: Sequence[str] = BUNDLE_JOBS) -> bool:
+        """
+        Check if a job is running, telling the user so.
+        
+        Args:
+            kinds: The kinds of jobs the action must wait for
+        
+        Returns:
+            bool: True if the action must not start
+        """
+        if any(self.jobs.is_running(kind) for kind in kinds):
+            logger.info("Action refused, a background job is running")
+            messagebox.showinfo("Info", TEXTS["info_job_running"])
+            return True
+        return False
     
     def change_appearance_mode_event(self, new_appearance_mode: str) -> None:
         """
@@ -252,6 +551,7 @@ class CodeProcessorApp:
         
         # Update button colors
         update_button_colors(self.buttons, fg_color, hover_color)
+        self.file_tree_view.apply_theme()
     
     def setup_drag_drop(self, widget: Any) -> None:
         """
@@ -292,51 +592,326 @@ class CodeProcessorApp:
         if directory:
             self.process_directory(directory)
     
+    def select_git_revision(self) -> None:
+        """Select a repository and a revision to bundle straight from git objects."""
+        logger.info("Selecting git revision")
+        directory = select_directory()
+        if not directory:
+            return
+        revision = ask_git_revision()
+        if revision:
+            from git_source import GIT_SPEC_SEPARATOR
+            self.process_directory(f"{directory}{GIT_SPEC_SEPARATOR}{revision}")
+    
+    def select_archive(self) -> None:
+        """Select a zip or tar archive to process in place."""
+        logger.info("Selecting archive")
+        archive = select_archive()
+        if archive:
+            self.process_directory(archive)
+    
+    def _close_source(self) -> None:
+        """Close the source of the previous selection, if any."""
+        self._cancel_prefetch()
+        if self.source is not None:
+            self.source.close()
+            self.source = None
+            # Blocks of non-filesystem sources cannot be revalidated
+            self.block_cache.clear()
+        self.reader = read_file_with_fallback
+    
     def process_directory(self, directory: str) -> None:
         """
         Process a directory to find and list code files.
         
         Args:
-            directory: The directory path to process
+            directory: The directory path to process, an archive, or a
+                ``repo@rev`` specification
         """
         logger.info(f"Processing directory: {directory}")
-        # Process directory using the file_processor module
-        self.files = process_directory(directory)
+        # A new selection replaces a scan in progress, but waits for bundles being built
+        if any(self.jobs.is_running(kind) for kind in BUNDLE_JOBS if kind != "scan"):
+            self._refuse_if_busy()
+            return
+        self._cancel_prefetch()
+        
+        # A preloaded scan is revalidated by the scan job, off the Tk thread
+        warm = self.warm_projects.pop(directory, None)
+        
+        def scan(job: Any) -> Tuple[Any, Sequence[Tuple[str, str]], FileTree]:
+            if warm is not None:
+                # A stat missing the read deadlines fails revalidation, and the directory is walked again
+                stat = get_stat_function(make_timed_reader())
+                if warm.files.directory_mtimes(stat) == warm.dir_mtimes:
+                    logger.info(f"Opening preloaded scan of {directory}")
+                    return None, warm.files, warm.tree
+                logger.info(f"Preloaded scan of {directory} is out of date, scanning again")
+                job.check_cancelled()
+            
+            from git_source import parse_git_spec, open_git_source
+            from archive_source import is_archive, open_archive_source
+            source = None
+            git_spec = parse_git_spec(directory)
+            try:
+                if git_spec:
+                    # Read the revision straight from git objects
+                    source = open_git_source(*git_spec)
+                elif is_archive(directory):
+                    # Read the archive members without extracting them
+                    source = open_archive_source(directory)
+                
+                if source:
+                    files = source.list_files()
+                    job.check_cancelled()
+                elif git_spec or is_archive(directory):
+                    files = []
+                else:
+                    # Process directory using the file_processor module
+                    files = process_directory(directory, job.progress)
+                job.check_cancelled()
+                # Directories and totals of the tree view, built off the Tk thread
+                tree = FileTree(files)
+            except BaseException:
+                if source is not None:
+                    source.close()
+                raise
+            return source, files, tree
+        
+        def on_scanned(result: Tuple[Any, Sequence[Tuple[str, str]], FileTree]) -> None:
+            self._show_scan(directory, result)
+            # A preloaded scan still current is already saved
+            if warm is None or result[1] is not warm.files:
+                self._start_persist()
+        
+        self.jobs.submit("scan", scan, on_scanned, replace=True)
+    
+    def _show_scan(self, directory: str, result: Tuple[Any, Sequence[Tuple[str, str]], FileTree]) -> None:
+        """
+        Make a scanned directory the current selection.
+        
+        Args:
+            directory: The directory, archive or git specification scanned
+            result: The open source, if any, the files and their tree
+        """
+        self._close_source()
+        self.directory = directory
+        self.source, self.files, self.file_tree = result
+        if self.source:
+            self.reader = self.source.read_file
         
         # Update UI after processing
         self._update_ui_after_directory_processing()
+        self._start_path_index()
+        
+        self.recent_projects = add_recent_project(directory)
+        self._update_recent_projects_menu()
+    
+    def _start_path_index(self) -> None:
+        """Index the scanned paths for the file picker in the background."""
+        self.path_index = None
+        self.file_picker.set_index(None, self.files)
+        files = self.files
+        
+        def on_indexed(index: PathIndex) -> None:
+            # A newer scan may have finished meanwhile
+            if self.files is files:
+                self.path_index = index
+                self.file_picker.set_index(index, files)
+        
+        self.jobs.submit("paths", lambda job: PathIndex(files, job.progress), on_indexed, replace=True)
+    
+    def _pick_file(self, index: int) -> None:
+        """
+        Add a file chosen in the file picker to the selection.
+        
+        Picking out of the whole scan narrows the selection to the picked
+        files; picking into a custom selection adds to it.
+        
+        Args:
+            index: The index of the file in self.files
+        """
+        if self.file_tree is None:
+            return
+        if self.file_tree.selected_totals()[0] == len(self.file_tree):
+            self.file_tree.set_dir_included(0, False)
+        self.file_tree.set_file_included(index, True)
+        logger.info(f"Picked {self.files[index][1]}")
+        self.file_tree_view.refresh()
+        self.file_tree_view.reveal(index)
+        self._update_selection_label()
+    
+    def _is_picked(self, index: int) -> bool:
+        """Check if a file was picked into a narrowed selection."""
+        if self.file_tree is None or self.file_tree.selected_totals()[0] == len(self.file_tree):
+            return False
+        return self.file_tree.is_included(index)
     
     def _update_ui_after_directory_processing(self) -> None:
         """Update UI elements after directory processing."""
         logger.debug("Updating UI after directory processing")
-        # Enable text widget for editing
-        self.preview_text.configure(state="normal")
-        self.preview_text.delete("1.0", "end")
-        
-        # Add files to preview
-        for _, rel_path in self.files:
-            language = get_file_language(rel_path)
-            self.preview_text.insert("end", f"{rel_path} ({language})\n")
-        
-        # Make read-only again
-        self.preview_text.configure(state="disabled")
+        # Only the first level is inserted, directories load as they are expanded
+        root_name = os.path.basename(os.path.normpath(self.directory)) if self.directory else "."
+        self.file_tree_view.set_tree(self.file_tree, root_name or self.directory)
+        self._update_selection_label()
         logger.debug(f"UI updated with {len(self.files)} files")
+        
+        # Use the idle time before "Process Files" to prefetch the selection
+        self.root.after_idle(self._start_prefetch)
+    
+    def _update_selection_label(self) -> None:
+        """Show the totals of the included files above the tree."""
+        if self.file_tree is None:
+            self.preview_label.configure(text=TEXTS["label_selected_files"])
+            return
+        selected, size = self.file_tree.selected_totals()
+        self.preview_label.configure(text=TEXTS["label_selected_summary"].format(
+            selected=selected, total=len(self.file_tree), size=format_size(size), tokens=estimate_tokens(size)
+        ))
+    
+    def _selected_files(self) -> Sequence[Tuple[str, str]]:
+        """Get the files included in the tree, which are the ones bundled."""
+        return self.file_tree.selected_files() if self.file_tree is not None else self.files
+    
+    def _start_prefetch(self) -> None:
+        """Start formatting the selection in the background."""
+        if self.files and AppConfig.get("files", "prefetch", True):
+            logger.info(f"Prefetching {len(self.files)} files")
+            self.prefetcher.start(self.files, make_timed_reader(self.reader))
+    
+    def _reset_processed_content(self) -> None:
+        """Release the previous bundle, and its temporary file, before building a new one."""
+        if self._clipboard is not None:
+            self._clipboard.cancel()
+        if self.viewer is not None:
+            self.viewer.close()
+            self.viewer = None
+        self.processed_content.close()
+        self.processed_content = BundleBuffer()
     
     def process_files(self) -> None:
         """Process selected files and copy the formatted content to clipboard."""
-        if not self.files:
+        files = self._selected_files()
+        if not files:
             logger.warning("No files selected when trying to process files")
             messagebox.showinfo("Info", TEXTS["info_no_files"])
             return
+        if self._refuse_if_busy():
+            return
+        
+        logger.info(f"Processing {len(files)} files")
+        # Assemble prefetched blocks; files not prefetched yet are read now
+        self._cancel_prefetch()
+        self._reset_processed_content()
+        directory, buffer = self.directory, self.processed_content
+        reader = make_timed_reader(self.reader)
         
-        logger.info(f"Processing {len(self.files)} files")
-        # Format files for AI using the file_processor module
-        self.processed_content = format_files_for_ai(self.files)
+        def build(job: Any) -> None:
+            write_and_record_bundle(directory, files, buffer, reader, self.block_cache,
+                                    lambda count, chars: job.progress(count, len(files), chars))
         
-        # Copy to clipboard using the helpers module
-        if copy_to_clipboard(self.processed_content):
-            logger.info("Files processed and copied to clipboard successfully")
-            messagebox.showinfo("Success", TEXTS["success_clipboard"])
+        def on_built(_: Any) -> None:
+            buffer.log_memory()
+            self.processed_files = files
+            self._start_persist(files)
+            # Copy to clipboard in the background
+            self._copy_processed_content(TEXTS["success_clipboard"])
+        
+        self.jobs.submit("process", build, on_built)
+    
+    def _copy_processed_content(self, success_text: str) -> None:
+        """
+        Copy the processed content to clipboard without blocking the window.
+        
+        Args:
+            success_text: Message shown once the copy is done
+        """
+        def on_done(success: bool, reference_path: Optional[str]) -> None:
+            self._on_job_event(self._clipboard_event(DONE if success else FAILED))
+            if not success:
+                return
+            logger.info("Processed content copied to clipboard successfully")
+            if reference_path:
+                messagebox.showinfo("Success", TEXTS["success_clipboard_reference"].format(path=reference_path))
+            else:
+                messagebox.showinfo("Success", success_text)
+        
+        self._clipboard_started = time.perf_counter()
+        self.clipboard.copy(self.processed_content, on_done, self._show_clipboard_progress)
+    
+    def _show_clipboard_progress(self, done: int, total: int) -> None:
+        """Show the progress of a clipboard copy in the status bar."""
+        self._on_job_event(self._clipboard_event(PROGRESS, done, total))
+    
+    def process_and_save(self) -> None:
+        """Process selected files, saving them to a file and copying them to clipboard in one pass."""
+        files = self._selected_files()
+        if not files:
+            logger.warning("No files selected when trying to process and save files")
+            messagebox.showinfo("Info", TEXTS["info_no_files"])
+            return
+        
+        if self._refuse_if_busy():
+            return
+        # Dialogs only open on the Tk thread, so the path is asked before the job starts
+        file_path = ask_save_path("processed_code.txt")
+        if not file_path:
+            return
+        
+        logger.info(f"Processing and saving {len(files)} files")
+        self._cancel_prefetch()
+        self._reset_processed_content()
+        directory, buffer = self.directory, self.processed_content
+        reader = make_timed_reader(self.reader)
+        
+        def build(job: Any) -> bool:
+            # One pass feeds both the clipboard buffer and the file
+            return save_while_processing(
+                lambda output: write_and_record_bundle(
+                    directory, files, output, reader, self.block_cache,
+                    lambda count, chars: job.progress(count, len(files), chars)
+                ),
+                buffer,
+                file_path=file_path
+            )
+        
+        def on_built(saved: bool) -> None:
+            if not saved:
+                return
+            buffer.log_memory()
+            self.processed_files = files
+            self._start_persist(files)
+            self._copy_processed_content(TEXTS["success_process_save"])
+        
+        self.jobs.submit("process", build, on_built)
+    
+    def process_changes(self) -> None:
+        """Process only the changes since the last bundle and copy them to clipboard."""
+        files = self._selected_files()
+        if not files:
+            logger.warning("No files selected when trying to process changes")
+            messagebox.showinfo("Info", TEXTS["info_no_files"])
+            return
+        
+        if self._refuse_if_busy():
+            return
+        
+        logger.info(f"Processing changes since last bundle for {len(files)} files")
+        self._cancel_prefetch()
+        self._reset_processed_content()
+        directory, buffer = self.directory, self.processed_content
+        reader = make_timed_reader(self.reader)
+        
+        def build(job: Any) -> None:
+            # Format the changes using the bundle_manifest module
+            buffer.write(format_changes_since_last_bundle(directory, files, reader, self.block_cache,
+                                                          lambda index: job.progress(index, len(files))))
+        
+        def on_built(_: Any) -> None:
+            self.processed_files = None
+            # Copy to clipboard in the background
+            self._copy_processed_content(TEXTS["success_clipboard_changes"])
+        
+        self.jobs.submit("changes", build, on_built)
     
     def save_as_txt(self) -> None:
         """Save processed content to a text file."""
@@ -345,11 +920,48 @@ class CodeProcessorApp:
             messagebox.showinfo("Info", TEXTS["info_no_content"])
             return
         
+        if self._refuse_if_busy():
+            return
+        
+        # Full bundles can be saved with a footer index for random access
+        indexed = AppConfig.get("files", "indexed_bundle", False) and self.processed_files is not None
+        # Dialogs only open on the Tk thread, so the path is asked before the job starts
+        file_path = ask_save_path("processed_code.txt", allow_compressed=not indexed)
+        if not file_path:
+            return
+        
         logger.info("Saving processed content to TXT file")
-        # Save to file using the helpers module
-        if save_to_file(self.processed_content):
-            logger.info("File saved successfully")
-            messagebox.showinfo("Success", TEXTS["success_save"])
+        buffer = self.processed_content
+        
+        def save(job: Any) -> bool:
+            progress = lambda done, total: job.progress(0, None, done, total)
+            if indexed:
+                # The bundle built is saved as it is, with the index of its blocks appended
+                return save_indexed_bundle(buffer, file_path=file_path, progress=progress)
+            # Save to file using the helpers module
+            return save_to_file(buffer, file_path=file_path, progress=progress)
+        
+        def on_saved(saved: bool) -> None:
+            if saved:
+                logger.info("File saved successfully")
+                messagebox.showinfo("Success", TEXTS["success_save"])
+        
+        self.jobs.submit("save", save, on_saved)
+    
+    def show_bundle_viewer(self) -> None:
+        """Open the processed bundle in the viewer, which reads it a screen at a time."""
+        if not self.processed_content:
+            logger.warning("No processed content when trying to view the bundle")
+            messagebox.showinfo("Info", TEXTS["info_no_content"])
+            return
+        if self.viewer is not None and not self.viewer.closed:
+            self.viewer.window.lift()
+            return
+        if self._refuse_if_busy(BUILD_JOBS):
+            return
+        logger.info(f"Opening bundle viewer on {len(self.processed_content)} bytes")
+        from bundle_viewer import BundleViewer
+        self.viewer = BundleViewer(self.root, self.processed_content, self.jobs)
     
     def open_ai_platform(self, platform: str) -> None:
         """
@@ -379,7 +991,10 @@ Code Processor for AI - Help
    - Dragging and dropping a directory onto the drop zone
    - Clicking the drop zone to browse for a directory
 
-2. The selected files will be listed in the preview area
+2. The selected files will be listed in the file tree:
+   - Expand directories to see their files, sizes and token estimates
+   - Click the Include column to leave files or whole directories out
+   - Type in the search box and press Enter to pick files by name
 
 3. Click "Process Files" to:
    - Format the code for AI platforms
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Recent projects and warm starts for the Code Processor application.
+
+The directories opened last are remembered. Next to the bundle manifest of
+each one, the cache keeps its last scan (a saved FileTable) and the
+formatted blocks of its last bundle. At startup a background job loads
+them back and revalidates them by modification time, so reopening a recent
+project shows its files at once and processing starts from cached blocks.
+Batch runs reuse the same saved scans and blocks, see batch.
+"""
+
+import json
+import os
+from array import array
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+from app_config import AppConfig
+from logger import get_logger
+from block_cache import BlockCache, FileStamp, get_file_stamp
+from bundle_manifest import get_bundle_cache_dir
+from file_table import FileTable
+
+# Get module logger
+logger = get_logger(__name__)
+
+RECENT_FILENAME = "recent_projects.json"
+SCAN_FILENAME = "scan.bin"
+BLOCKS_FILENAME = "blocks.bin"
+
+class WarmProject(NamedTuple):
+    """A recent project loaded back from the cache, still matching the disk."""
+    directory: str
+    files: FileTable
+    tree: "FileTree"
+    dir_mtimes: array  # Directory times the scan was saved with, to revalidate it again
+
+def _recent_path() -> str:
+    cache_root = os.path.expanduser(AppConfig.get("paths", "cache_dir", "~/.code_processor"))
+    return os.path.join(cache_root, RECENT_FILENAME)
+
+def load_recent_projects() -> List[str]:
+    """
+    Get the recently opened projects.
+
+    Returns:
+        list: The project paths, most recent first
+    """
+    try:
+        with open(_recent_path(), "r", encoding="utf-8") as file:
+            projects = json.load(file)
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable recent projects: {str(e)}")
+        return []
+    return [project for project in projects if isinstance(project, str)]
+
+def add_recent_project(directory: str) -> List[str]:
+    """
+    Record a project as the most recently opened one.
+
+    Args:
+        directory: The project path
+
+    Returns:
+        list: The updated project paths, most recent first
+    """
+    projects = [directory] + [project for project in load_recent_projects() if project != directory]
+    projects = projects[:AppConfig.get("recent", "max_projects", 8)]
+    path = _recent_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(projects, file, indent=2)
+    except OSError as e:
+        logger.warning(f"Could not save recent projects: {str(e)}")
+    return projects
+
+def save_scan(directory: str, files: FileTable, dir_mtimes: Optional[array] = None) -> None:
+    """
+    Keep the scan of a project for the next session.
+
+    Args:
+        directory: The project path
+        files: The scanned files
+        dir_mtimes: The directory times to revalidate the scan with
+            (defaults to the times now)
+    """
+    cache_dir = get_bundle_cache_dir(directory)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        files.save(os.path.join(cache_dir, SCAN_FILENAME), dir_mtimes)
+    except OSError as e:
+        logger.warning(f"Could not save the scan of {directory}: {str(e)}")
+
+def save_blocks(directory: str, block_cache: BlockCache, files: Sequence[Tuple[str, str]]) -> None:
+    """
+    Keep the cached blocks of a project's files for the next session.
+
+    Args:
+        directory: The project path
+        block_cache: The cache holding the blocks
+        files: The files whose blocks are kept, in bundle order
+    """
+    max_bytes = AppConfig.get("recent", "block_cache_mb", 64) * 1024 * 1024
+    cache_dir = get_bundle_cache_dir(directory)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        block_cache.save(os.path.join(cache_dir, BLOCKS_FILENAME),
+                         (file_path for file_path, _ in files), max_bytes)
+    except OSError as e:
+        logger.warning(f"Could not save the cached blocks of {directory}: {str(e)}")
+
+def load_scan(directory: str,
+              stat: Callable[[str], os.stat_result] = os.stat) -> Optional[Tuple[FileTable, array]]:
+    """
+    Load a project's saved scan if it still matches the disk.
+
+    A scan is kept only if no directory its walk listed changed since:
+    adding, removing or renaming a file changes the time of its directory,
+    including directories that held no code files yet.
+
+    Args:
+        directory: The project path
+        stat: Function statting the walked directories, such as one bounded
+            by read deadlines (see timed_reader.get_stat_function)
+
+    Returns:
+        The files and the directory times they were saved with, or None
+        if nothing current was saved
+    """
+    try:
+        files, dir_mtimes = FileTable.load(os.path.join(get_bundle_cache_dir(directory), SCAN_FILENAME))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable scan of {directory}: {str(e)}")
+        return None
+    if files.directory_mtimes(stat) != dir_mtimes:
+        logger.info(f"Saved scan of {directory} is out of date")
+        return None
+    return files, dir_mtimes
+
+def load_blocks(directory: str, block_cache: BlockCache,
+                get_stamp: Callable[[str], Optional[FileStamp]] = get_file_stamp) -> int:
+    """
+    Load a project's saved blocks whose files did not change since.
+
+    Args:
+        directory: The project path
+        block_cache: The cache receiving the blocks
+        get_stamp: Function stamping the files, such as one bounded by read
+            deadlines (see timed_reader.get_stamp_function)
+
+    Returns:
+        int: Number of blocks loaded
+    """
+    try:
+        return block_cache.load(os.path.join(get_bundle_cache_dir(directory), BLOCKS_FILENAME), get_stamp)
+    except FileNotFoundError:
+        return 0
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable cached blocks of {directory}: {str(e)}")
+        return 0
+
+def preload_project(directory: str, block_cache: Optional[BlockCache] = None,
+                    check_cancelled: Optional[Callable[[], None]] = None,
+                    get_stamp: Callable[[str], Optional[FileStamp]] = get_file_stamp,
+                    stat: Callable[[str], os.stat_result] = os.stat) -> Optional[WarmProject]:
+    """
+    Load a project's saved scan, and optionally its blocks, if they still match the disk.
+
+    See load_scan and load_blocks; blocks are kept only for files whose
+    time and size did not change.
+
+    Args:
+        directory: The project path
+        block_cache: The cache receiving the saved blocks, None to skip them
+        check_cancelled: Called between the steps; raises to stop loading
+        get_stamp: Function stamping the files of the saved blocks, see load_blocks
+        stat: Function statting the walked directories, see load_scan
+
+    Returns:
+        The warm project, or None if nothing current was saved
+    """
+    # The tree model lives with the tree view, which loads tkinter; batch runs never get here
+    from file_tree import FileTree
+    scan = load_scan(directory, stat)
+    if scan is None:
+        return None
+    files, dir_mtimes = scan
+    if check_cancelled is not None:
+        check_cancelled()
+    tree = FileTree(files)
+
+    if block_cache is not None:
+        if check_cancelled is not None:
+            check_cancelled()
+        load_blocks(directory, block_cache, get_stamp)
+    logger.info(f"Preloaded {len(files)} files of {directory}")
+    return WarmProject(directory, files, tree, dir_mtimes)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Import time regression check for the Code Processor application.
+
+Scanning, formatting and unbundling must load without the GUI: no tkinter,
+CustomTkinter, tkinterdnd2, clipboard or browser module may be imported on
+those paths, since they are used headless and every import is paid on each
+run. The check imports each headless module in a fresh interpreter under
+``python -X importtime`` and fails if a GUI module shows up or the import
+takes longer than the budget.
+
+The GUI import path, everything ``main`` loads before its window is
+created, is measured too, against a budget of its own. Modules only needed
+once the user acts (the bundle viewer, clipboard transfers, prefetching,
+git and archive sources) must not load there; the GUI imports them on
+first use. It is skipped when the GUI dependencies are not installed.
+
+Run it from the repository root:
+
+    python startup_check.py [--budget-ms 150] [--gui-budget-ms 250] [--runs 3] [--top 10]
+"""
+
+import argparse
+import importlib.util
+import os
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+# Modules of the headless paths: the command line, batches, streaming bundles, bundle indexes and unbundling
+HEADLESS_MODULES = ("cli", "batch", "file_processor", "bundle_manifest", "bundle_index", "unbundler")
+
+# Modules that must only load on first use by the GUI
+GUI_MODULES = ("tkinter", "_tkinter", "customtkinter", "tkinterdnd2", "pyperclip", "webbrowser")
+
+# The module the GUI starts from
+GUI_ENTRY = "main"
+
+# Modules the GUI must only load once the user acts, after the first paint
+DEFERRED_MODULES = ("bundle_viewer", "clipboard_transfer", "prefetch", "git_source", "archive_source",
+                    "pyperclip", "webbrowser")
+
+class ImportTiming(NamedTuple):
+    """Import times of one module in a fresh interpreter, in microseconds."""
+    total: int  # Cumulative time of the module itself
+    modules: Dict[str, Tuple[int, int]]  # Self and cumulative time of every module imported
+
+def measure_import(module: str) -> ImportTiming:
+    """
+    Import a module in a fresh interpreter and collect its import times.
+
+    Args:
+        module: The module to import
+
+    Returns:
+        ImportTiming: The times reported by ``-X importtime``
+
+    Raises:
+        RuntimeError: If the module cannot be imported
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return ImportTiming(modules[module][1], modules)
+
+def check_module(module: str, budget_ms: float, runs: int, top: int,
+                 forbidden: Sequence[str] = GUI_MODULES) -> List[str]:
+    """
+    Check the import of a module.
+
+    Args:
+        module: The module to check
+        budget_ms: Milliseconds the import may take, at best of the runs
+        runs: Imports measured; the fastest counts, to damp noise
+        top: Slowest imports listed
+        forbidden: Modules that must not be imported with it
+
+    Returns:
+        list: The problems found, empty if the module passes
+    """
+    timing = min((measure_import(module) for _ in range(runs)), key=lambda timing: timing.total)
+    problems = []
+    loaded = [name for name in forbidden if name in timing.modules]
+    if loaded:
+        problems.append(f"{module} imports modules it must load on first use: {', '.join(loaded)}")
+    if timing.total > budget_ms * 1000:
+        problems.append(f"{module} takes {timing.total / 1000:.1f} ms to import, over {budget_ms:.0f} ms")
+
+    print(f"{module}: {timing.total / 1000:.1f} ms")
+    slowest = sorted(timing.modules.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"    {self_us / 1000:7.1f} ms self {cumulative_us / 1000:7.1f} ms total  {name}")
+    return problems
+
+def main() -> int:
+    """Check every headless module and the GUI import path, and report; returns the exit code."""
+    parser = argparse.ArgumentParser(description="Check the import time of the headless modules and the GUI.")
+    parser.add_argument("--budget-ms", type=float, default=150.0,
+                        help="milliseconds each headless module may take to import (default: 150)")
+    parser.add_argument("--gui-budget-ms", type=float, default=250.0,
+                        help="milliseconds the GUI may take to import before its window (default: 250)")
+    parser.add_argument("--runs", type=int, default=3,
+                        help="imports measured per module, the fastest counts (default: 3)")
+    parser.add_argument("--top", type=int, default=10,
+                        help="slowest imports listed per module (default: 10)")
+    args = parser.parse_args()
+
+    problems = []
+    for module in HEADLESS_MODULES:
+        problems.extend(check_module(module, args.budget_ms, max(args.runs, 1), args.top))
+    if all(importlib.util.find_spec(name) is not None for name in ("customtkinter", "tkinterdnd2")):
+        problems.extend(check_module(GUI_ENTRY, args.gui_budget_ms, max(args.runs, 1), args.top, DEFERRED_MODULES))
+    else:
+        print(f"{GUI_ENTRY}: skipped, the GUI dependencies are not installed")
+    for problem in problems:
+        print(f"FAIL: {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
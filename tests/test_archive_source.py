@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of archive sources: members are listed sorted by relative path, and
+a name stored twice keeps its last member, for zip and tar alike; a
+streamed tarball is read in archive order without being listed first.
+"""
+
+import io
+import os
+import random
+import string
+import tarfile
+import tempfile
+import threading
+import unittest
+import warnings
+import zipfile
+
+from archive_source import ArchiveSource
+from error_handler import pop_deferred_errors
+
+# Stored out of order, with src/b.py twice
+MEMBERS = [("src/b.py", "b = 1\n"), ("main.py", "main = 1\n"), ("src/a.py", "a = 1\n"), ("src/b.py", "b = 2\n")]
+
+class ArchiveSourceTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def _write_tar(self, members=MEMBERS) -> str:
+        path = os.path.join(self.directory.name, "drop.tar.gz")
+        with tarfile.open(path, "w:gz") as file:
+            for name, content in members:
+                data = content.encode("utf-8")
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                file.addfile(info, io.BytesIO(data))
+        return path
+
+    def _write_zip(self) -> str:
+        path = os.path.join(self.directory.name, "drop.zip")
+        with warnings.catch_warnings():
+            # zipfile warns about the duplicate name, which is the point
+            warnings.simplefilter("ignore")
+            with zipfile.ZipFile(path, "w") as file:
+                for name, content in MEMBERS:
+                    file.writestr(name, content)
+        return path
+
+    def test_sorted_and_last_duplicate_wins(self) -> None:
+        for path in (self._write_tar(), self._write_zip()):
+            with ArchiveSource(path) as source:
+                files = source.list_files()
+                self.assertEqual([rel_path for _, rel_path in files],
+                                 ["main.py", os.path.join("src", "a.py"), os.path.join("src", "b.py")])
+                # Read backwards, as a sorted list reads a tarball stored out of order
+                contents = [source.read_file(file_path) for file_path, _ in reversed(files)]
+                self.assertEqual(contents, [("b = 2\n", None), ("a = 1\n", None), ("main = 1\n", None)])
+
+    def test_tar_streamed_in_archive_order(self) -> None:
+        with ArchiveSource(self._write_tar()) as source:
+            contents = []
+            for file_path, rel_path in source.iter_files():
+                contents.append((rel_path, source.read_file(file_path)[0]))
+            self.assertEqual(contents, [(os.path.normpath(name), content) for name, content in MEMBERS])
+            # Nothing was kept for reads in any order
+            self.assertIsNone(source._spool)
+            self.assertEqual(source.read_file(file_path)[0], "")
+
+    def test_damaged_tar_streams_members_before_damage(self) -> None:
+        # Random text compresses poorly, so the cut falls inside the big member
+        noise = "".join(random.Random(1).choice(string.ascii_letters) for _ in range(200000))
+        path = self._write_tar(MEMBERS[:2] + [("big.py", noise), ("last.py", "last = 1\n")])
+        with open(path, "rb") as file:
+            data = file.read()
+        with open(path, "wb") as file:
+            file.write(data[:len(data) // 2])
+        result = []
+
+        def stream() -> None:
+            # Errors are deferred on worker threads, as the read error of a bundle job is
+            with ArchiveSource(path) as source:
+                result.append([rel_path for _, rel_path in source.iter_files()])
+            result.append(pop_deferred_errors())
+
+        thread = threading.Thread(target=stream)
+        thread.start()
+        thread.join()
+        files, errors = result
+        self.assertEqual(files, [os.path.normpath(name) for name, _ in MEMBERS[:2]])
+        self.assertEqual(len(errors), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of batch bundling: every kind of root reports the files it bundled,
+and a failing root leaves no output behind.
+"""
+
+import os
+import tempfile
+import unittest
+import zipfile
+
+from batch import BatchEntry, bundle_repository
+
+class BundleRepositoryTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_archive_root_counts_files(self) -> None:
+        archive = os.path.join(self.directory.name, "repo.zip")
+        with zipfile.ZipFile(archive, "w") as file:
+            file.writestr("src/a.py", "a = 1\n")
+            file.writestr("src/b.py", "b = 2\n")
+        output = os.path.join(self.directory.name, "out", "repo.md")
+        for tree_summary in (False, True):
+            result = bundle_repository(BatchEntry(archive, output), tree_summary)
+            self.assertIsNone(result.error)
+            self.assertEqual(result.files, 2)
+            self.assertEqual(result.size, os.path.getsize(output))
+
+    def test_failing_root_leaves_no_output(self) -> None:
+        output = os.path.join(self.directory.name, "missing.md")
+        result = bundle_repository(BatchEntry(os.path.join(self.directory.name, "missing"), output), False)
+        self.assertIsNotNone(result.error)
+        self.assertEqual(result.files, 0)
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+if __name__ == "__main__":
+    unittest.main()
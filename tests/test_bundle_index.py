@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of indexed bundles saved from a built bundle: the saved file must be
+the bundle as built, tree summary included, with an index to every file.
+"""
+
+import os
+import tempfile
+import unittest
+
+from bundle_buffer import BundleBuffer
+from bundle_index import IndexedBundleReader, write_indexed_buffer
+from file_processor import format_file_block
+from tree_summary import format_tree_summary
+
+class IndexedBufferTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_saves_buffer_as_built(self) -> None:
+        files = [
+            ("/missing/a.py", "a.py"),
+            ("/missing/docs/readme.md", os.path.join("docs", "readme.md")),
+            ("/missing/b.py", "b.py")
+        ]
+        contents = {
+            "a.py": ("print('héllo')\n", None),
+            os.path.join("docs", "readme.md"): ("```python\nx = 1\n```\n", None),
+            "b.py": ("", "denied")
+        }
+        with BundleBuffer() as buffer:
+            buffer.write(format_tree_summary(files))
+            for file_path, rel_path in files:
+                buffer.add_block(rel_path, format_file_block(file_path, rel_path, *contents[rel_path]))
+            path = os.path.join(self.directory.name, "bundle.txt")
+            self.assertEqual(write_indexed_buffer(path, buffer), 3)
+            built = buffer.getvalue().encode("utf-8")
+
+        with open(path, "rb") as file:
+            self.assertTrue(file.read().startswith(built))
+        reader = IndexedBundleReader(path)
+        try:
+            self.assertEqual([entry.path for entry in reader.list_files()], [rel_path for _, rel_path in files])
+            self.assertEqual(reader.read_file("a.py"), "print('héllo')\n")
+            self.assertEqual(reader.read_file(os.path.join("docs", "readme.md")), "```python\nx = 1\n```\n")
+            self.assertEqual(reader.get_entry("b.py").error, "denied")
+        finally:
+            reader.close()
+
+if __name__ == "__main__":
+    unittest.main()
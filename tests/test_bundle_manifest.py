@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of delta bundles: file lines cannot close the diff fence, and a
+modified file whose previous content is gone is not shown as new.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+from bundle_manifest import BundleManifest, format_and_record_bundle, format_changes_since_last_bundle
+from texts import TEXTS
+
+class DeltaBundleTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.directory.name, "repo")
+        os.makedirs(self.root)
+        # Manifests go to the home directory, keep them out of the user's
+        self.home = os.environ.get("HOME")
+        os.environ["HOME"] = self.directory.name
+
+    def tearDown(self) -> None:
+        if self.home is not None:
+            os.environ["HOME"] = self.home
+        self.directory.cleanup()
+
+    def _write(self, name: str, content: str) -> None:
+        with open(os.path.join(self.root, name), "w", encoding="utf-8") as file:
+            file.write(content)
+
+    def _files(self):
+        return [(os.path.join(self.root, name), name) for name in sorted(os.listdir(self.root))]
+
+    def test_fence_in_context_lines(self) -> None:
+        self._write("notes.py", 'doc = """\n```\nexample\n```\n"""\nx = 1\n')
+        format_and_record_bundle(self.root, self._files())
+        self._write("notes.py", 'doc = """\n```\nexample\n```\n"""\nx = 2\n')
+        delta = format_changes_since_last_bundle(self.root, self._files())
+
+        opening = re.search(r"^(`{3,})diff$", delta, re.MULTILINE)
+        self.assertIsNotNone(opening)
+        fence = opening.group(1)
+        self.assertGreater(len(fence), 3)
+        body = delta[opening.end():]
+        # The first line a Markdown reader would take as the closing fence is the real one
+        closing = re.search(r"^ {0,3}`{%d,}[ \t]*$" % len(fence), body, re.MULTILINE)
+        self.assertEqual(closing.group(0), fence)
+        self.assertIn("+x = 2", body[:closing.start()])
+
+    def test_missing_previous_content(self) -> None:
+        self._write("a.py", "a = 1\n")
+        format_and_record_bundle(self.root, self._files())
+        shutil.rmtree(BundleManifest.load(self.root).objects_dir)
+        self._write("a.py", "a = 2\n")
+        delta = format_changes_since_last_bundle(self.root, self._files())
+
+        self.assertIn(TEXTS["delta_unavailable"].format(path="a.py"), delta)
+        self.assertNotIn("/dev/null", delta)
+        self.assertIn("a = 2", delta)
+
+if __name__ == "__main__":
+    unittest.main()
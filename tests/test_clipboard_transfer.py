@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of clipboard transfers: the buffer made to copy a string is closed
+once the transfer finishes or is cancelled.
+"""
+
+import unittest
+from typing import Any, Callable, List, Tuple
+
+from clipboard_transfer import ClipboardTransfer
+
+class FakeRoot:
+    """The clipboard and event loop calls of a Tk window, run on demand."""
+
+    def __init__(self) -> None:
+        self.clipboard = ""
+        self.pending: List[Tuple[Callable[..., None], Tuple[Any, ...]]] = []
+
+    def clipboard_clear(self) -> None:
+        self.clipboard = ""
+
+    def clipboard_append(self, text: str, **kwargs: Any) -> None:
+        self.clipboard += text
+
+    def after_idle(self, func: Callable[..., None], *args: Any) -> None:
+        self.pending.append((func, args))
+
+    def after(self, delay: int, func: Callable[..., None], *args: Any) -> None:
+        self.pending.append((func, args))
+
+    def run(self) -> None:
+        while self.pending:
+            func, args = self.pending.pop(0)
+            func(*args)
+
+class ClipboardTransferTest(unittest.TestCase):
+
+    def test_string_buffer_closed_when_done(self) -> None:
+        root = FakeRoot()
+        transfer = ClipboardTransfer(root, chunk_size=4, max_bytes=1024)
+        results = []
+        transfer.copy("some bundle text", lambda success, path: results.append(success))
+        buffer = transfer._owned
+        root.run()
+        self.assertEqual(results, [True])
+        self.assertEqual(root.clipboard, "some bundle text")
+        self.assertIsNone(transfer._owned)
+        self.assertTrue(buffer._file.closed)
+
+    def test_string_buffer_closed_when_cancelled(self) -> None:
+        root = FakeRoot()
+        transfer = ClipboardTransfer(root, chunk_size=4, max_bytes=1024)
+        transfer.copy("some bundle text")
+        buffer = transfer._owned
+        transfer.cancel()
+        root.run()
+        self.assertFalse(transfer.is_running())
+        self.assertTrue(buffer._file.closed)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of bundle output files: a failed save must not leave a truncated bundle.
+"""
+
+import os
+import tempfile
+import unittest
+
+from compression import atomic_output, open_input
+
+class AtomicOutputTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_success_replaces_file(self) -> None:
+        for name in ("bundle.txt", "bundle.txt.gz", "bundle.xz", "bundle.zip"):
+            path = os.path.join(self.directory.name, name)
+            with atomic_output(path) as output:
+                output.write("complete bundle\n")
+            with open_input(path) as stream:
+                self.assertEqual(stream.read(), "complete bundle\n")
+        self.assertEqual(sorted(os.listdir(self.directory.name)),
+                         ["bundle.txt", "bundle.txt.gz", "bundle.xz", "bundle.zip"])
+
+    def test_failure_keeps_previous_file(self) -> None:
+        path = os.path.join(self.directory.name, "bundle.txt.gz")
+        with atomic_output(path) as output:
+            output.write("previous bundle\n")
+        # Cancellation raises a BaseException, which must clean up too
+        with self.assertRaises(KeyboardInterrupt):
+            with atomic_output(path) as output:
+                output.write("partial")
+                raise KeyboardInterrupt()
+        with open_input(path) as stream:
+            self.assertEqual(stream.read(), "previous bundle\n")
+        self.assertEqual(os.listdir(self.directory.name), ["bundle.txt.gz"])
+
+if __name__ == "__main__":
+    unittest.main()
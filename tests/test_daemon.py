@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the daemon's projects: a bundle sees the tree as it is now, and
+scans and bundles of a root share one lock across rescans.
+"""
+
+import asyncio
+import os
+import tempfile
+import unittest
+
+from daemon import ProcessorDaemon
+
+class DaemonProjectTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.directory.name, "repo")
+        os.makedirs(os.path.join(self.root, "src"))
+        self._write("src/a.py", "a = 1\n")
+        # Saved scans go to the home directory, keep them out of the user's
+        self.home = os.environ.get("HOME")
+        os.environ["HOME"] = self.directory.name
+        self.daemon = ProcessorDaemon(workers=2, block_cache_mb=1)
+
+    def tearDown(self) -> None:
+        self.daemon.executor.shutdown(wait=True)
+        if self.home is not None:
+            os.environ["HOME"] = self.home
+        self.directory.cleanup()
+
+    def _write(self, rel_path: str, content: str) -> None:
+        with open(os.path.join(self.root, rel_path), "w", encoding="utf-8") as file:
+            file.write(content)
+
+    def _bundle(self) -> str:
+        chunks = []
+
+        async def send_chunk(text: str) -> None:
+            chunks.append(text)
+
+        async def run() -> None:
+            await self.daemon.bundle({"root": self.root, "tree_summary": False}, send_chunk)
+
+        asyncio.run(run())
+        return "".join(chunks)
+
+    def test_bundle_rescans_changed_tree(self) -> None:
+        self.assertIn("a = 1", self._bundle())
+        self._write("src/b.py", "b = 2\n")
+        bundle = self._bundle()
+        self.assertIn("a = 1", bundle)
+        self.assertIn("b = 2", bundle)
+
+    def test_rescan_keeps_root_lock(self) -> None:
+        async def run() -> None:
+            await self.daemon.scan({"root": self.root})
+            lock = self.daemon.locks[self.root]
+            await self.daemon.scan({"root": self.root, "refresh": True})
+            self.assertIs(self.daemon.locks[self.root], lock)
+
+        asyncio.run(run())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of deferred errors: errors past the collection cap are counted, and
+the summary reports every one of them.
+"""
+
+import threading
+import unittest
+
+from error_handler import (
+    MAX_DEFERRED_ERRORS, MAX_SHOWN_ERRORS, format_errors, pop_deferred_errors, with_error_handling
+)
+from texts import TEXTS
+
+@with_error_handling("test_operation")
+def fail(number: int) -> None:
+    raise ValueError(f"failure {number}")
+
+class DeferredErrorsTest(unittest.TestCase):
+
+    def _collect_on_worker(self, count: int):
+        result = []
+
+        def work() -> None:
+            for number in range(count):
+                fail(number)
+            result.append(pop_deferred_errors())
+
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+        return result[0]
+
+    def test_errors_past_cap_are_counted(self) -> None:
+        total = MAX_DEFERRED_ERRORS + 7
+        errors = self._collect_on_worker(total)
+        self.assertEqual(len(errors), MAX_DEFERRED_ERRORS)
+        self.assertEqual(errors.dropped, 7)
+        # The oldest errors are kept
+        self.assertIn("failure 0", errors[0])
+
+        message = format_errors(errors)
+        self.assertIn(TEXTS["error_more"].format(count=total - MAX_SHOWN_ERRORS), message)
+
+    def test_pop_resets(self) -> None:
+        errors = self._collect_on_worker(2)
+        self.assertEqual((len(errors), errors.dropped), (2, 0))
+        self.assertNotIn(TEXTS["error_more"].format(count=0), format_errors(errors))
+
+if __name__ == "__main__":
+    unittest.main()
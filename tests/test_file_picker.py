@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the picker's search: broad queries on a large scan stay within a
+frame, and are exact when file name matches decide the results.
+"""
+
+import heapq
+import random
+import time
+import unittest
+
+from file_picker import PathIndex
+
+# Paths of the synthetic scan, about the size of a large monorepo
+PATH_COUNT = 100000
+
+# Time a keystroke may take on the Tk thread, in seconds
+FRAME_BUDGET = 0.016
+
+# Queries matching a large share of the paths
+BROAD_QUERIES = [".py", "src", "mod", "pkg", "s", "m", "src main", "core .ts"]
+
+class PathIndexLatencyTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        rng = random.Random(1)
+        directories = ["src", "lib", "pkg", "core", "models", "views", "api", "tests", "utils", "modules"]
+        names = ["index", "main", "utils", "parser", "client", "server", "model", "view", "schema", "router"]
+        extensions = [".py", ".ts", ".js", ".go", ".rs"]
+        files = []
+        for number in range(PATH_COUNT):
+            parts = [f"{rng.choice(directories)}{rng.randint(0, 30)}" for _ in range(rng.randint(1, 5))]
+            parts.append(f"{rng.choice(names)}{number % 97}{rng.choice(extensions)}")
+            # Every path is under a pkg directory, a few files are named after it
+            if number % 50 == 0:
+                parts[-1] = f"pkg_{parts[-1]}"
+            rel_path = "/".join(["pkg"] + parts)
+            files.append(("/repo/" + rel_path, rel_path))
+        files.sort(key=lambda file: file[1])
+        cls.index = PathIndex(files)
+
+    def test_broad_queries_within_frame(self) -> None:
+        for query in BROAD_QUERIES:
+            elapsed = []
+            for _ in range(5):
+                start = time.perf_counter()
+                results = self.index.search(query, 50)
+                elapsed.append(time.perf_counter() - start)
+            self.assertEqual(len(results), 50, query)
+            self.assertLess(min(elapsed), FRAME_BUDGET, query)
+
+    def test_file_name_matches_are_exact(self) -> None:
+        terms = ["pkg"]
+        matches = [index for index, path in enumerate(self.index.paths) if "pkg" in path]
+        self.assertEqual(len(matches), PATH_COUNT)
+        expected = heapq.nlargest(50, matches, key=lambda index: (self.index._score(index, terms), -index))
+        self.assertEqual(self.index.search("pkg", 50), expected)
+
+if __name__ == "__main__":
+    unittest.main()
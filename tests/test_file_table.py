@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the revalidation of saved file tables.
+"""
+
+import os
+import tempfile
+import time
+import unittest
+
+from file_table import FileTable
+
+class DirectoryMtimesTest(unittest.TestCase):
+    """A saved scan must go stale when a code file appears anywhere the walk looked."""
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        os.makedirs(os.path.join(self.root, "docs"))
+        open(os.path.join(self.root, "docs", "img.png"), "w").close()
+        with open(os.path.join(self.root, "main.py"), "w", encoding="utf-8") as file:
+            file.write("print('main')\n")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_new_file_in_directory_without_code(self) -> None:
+        table = FileTable.from_directory(self.root)
+        self.assertEqual([rel_path for _, rel_path in table], ["main.py"])
+        self.assertEqual(table.directory_mtimes(), table.walked_mtimes())
+
+        time.sleep(0.01)
+        open(os.path.join(self.root, "docs", "new.py"), "w").close()
+        self.assertNotEqual(table.directory_mtimes(), table.walked_mtimes())
+
+    def test_saved_table_keeps_walked_directories(self) -> None:
+        table = FileTable.from_directory(self.root)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            path = os.path.join(cache_dir, "scan.bin")
+            table.save(path)
+            loaded, dir_mtimes = FileTable.load(path)
+        self.assertEqual(list(loaded), list(table))
+        self.assertEqual(loaded.directory_mtimes(), dir_mtimes)
+
+        time.sleep(0.01)
+        open(os.path.join(self.root, "docs", "new.py"), "w").close()
+        self.assertNotEqual(loaded.directory_mtimes(), dir_mtimes)
+
+    def test_walked_directories_rebuilt_from_trie(self) -> None:
+        os.makedirs(os.path.join(self.root, "docs", "img", "icons"))
+        table = FileTable.from_directory(self.root)
+        expected = ["", "docs" + os.sep, os.path.join("docs", "img") + os.sep,
+                    os.path.join("docs", "img", "icons") + os.sep]
+        self.assertEqual(sorted(table._revalidated_dirs()), expected)
+
+        time.sleep(0.01)
+        open(os.path.join(self.root, "docs", "img", "icons", "new.py"), "w").close()
+        self.assertNotEqual(table.directory_mtimes(), table.walked_mtimes())
+
+    def test_stat_missing_deadline_fails_revalidation(self) -> None:
+        table = FileTable.from_directory(self.root)
+
+        def stalled_stat(path: str) -> os.stat_result:
+            raise TimeoutError(f"Skipped {path}")
+
+        self.assertIn(-1, table.directory_mtimes(stalled_stat))
+        self.assertNotEqual(table.directory_mtimes(stalled_stat), table.walked_mtimes())
+
+if __name__ == "__main__":
+    unittest.main()
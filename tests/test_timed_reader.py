@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests of the read deadlines: a file whose open never returns must not hang a bundle.
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+
+from block_cache import BlockCache
+from file_processor import iter_file_contents, iter_formatted_blocks
+from prefetch import Prefetcher
+from timed_reader import TimedReader
+
+# Seconds a bundle of the test tree may take, far above the read deadline
+BUNDLE_LIMIT = 10.0
+
+@unittest.skipUnless(hasattr(os, "mkfifo"), "needs named pipes")
+class BlockingFileTest(unittest.TestCase):
+    """A named pipe without a writer blocks whoever opens it, as a stalled mount does."""
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        root = self.directory.name
+        with open(os.path.join(root, "a.py"), "w", encoding="utf-8") as file:
+            file.write("print('a')\n")
+        os.mkfifo(os.path.join(root, "b.py"))
+        with open(os.path.join(root, "c.py"), "w", encoding="utf-8") as file:
+            file.write("print('c')\n")
+        self.files = [(os.path.join(root, name), name) for name in ("a.py", "b.py", "c.py")]
+
+    def tearDown(self) -> None:
+        # Let the abandoned worker's open of the pipe return
+        try:
+            fd = os.open(self.files[1][0], os.O_WRONLY | os.O_NONBLOCK)
+            os.close(fd)
+        except OSError:
+            pass
+        self.directory.cleanup()
+
+    def _run_bounded(self, func):
+        """Run func on a daemon thread and fail if it does not return in time."""
+        result = []
+        thread = threading.Thread(target=lambda: result.append(func()), daemon=True)
+        thread.start()
+        thread.join(BUNDLE_LIMIT)
+        self.assertFalse(thread.is_alive(), "the bundle hung on the blocking file")
+        return result[0]
+
+    def test_scheduled_reads(self) -> None:
+        reader = TimedReader(timeout=0.5)
+        contents = self._run_bounded(lambda: list(iter_file_contents(self.files, reader, scheduled=True)))
+        self.assertEqual([rel_path for _, rel_path, _, _ in contents], ["a.py", "b.py", "c.py"])
+        self.assertEqual(contents[0][2], "print('a')\n")
+        self.assertIsNotNone(contents[1][3])
+        self.assertEqual(contents[2][2], "print('c')\n")
+
+    def test_block_cache_reads(self) -> None:
+        reader = TimedReader(timeout=0.5)
+        block_cache = BlockCache(1024 * 1024)
+        blocks = self._run_bounded(lambda: list(iter_formatted_blocks(self.files, reader=reader,
+                                                                      block_cache=block_cache)))
+        self.assertEqual([rel_path for rel_path, _ in blocks], ["a.py", "b.py", "c.py"])
+        self.assertIn("print('c')", blocks[2][1])
+        # The timed out file has no stamp to revalidate, so it is not cached
+        self.assertEqual(len(block_cache), 2)
+
+    def test_prefetch(self) -> None:
+        block_cache = BlockCache(1024 * 1024)
+        prefetcher = Prefetcher(block_cache)
+        prefetcher.start(self.files, TimedReader(timeout=0.5))
+        prefetcher._thread.join(BUNDLE_LIMIT)
+        self.assertFalse(prefetcher.is_running(), "the prefetch hung on the blocking file")
+        self.assertEqual(len(block_cache), 2)
+
+if __name__ == "__main__":
+    unittest.main()
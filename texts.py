@@ -16,21 +16,50 @@ EN_TEXTS = {
     "app_title": "✨ Code Processor for AI ✨",
     "title_ai_platforms": "AI Platforms",
     "title_appearance": "Appearance Mode",
+    "title_recent_projects": "Recent Projects",
     "button_process": "Process Files",
     "button_save": "Save to File",
+    "button_process_changes": "Process Changes",
+    "button_process_save": "Process & Save",
+    "button_git_revision": "Git Revision",
+    "prompt_git_revision": "Branch, tag or commit to bundle:",
+    "button_archive": "Archive",
     "button_close": "Close",
     "label_selected_files": "Selected Files",
+    "label_selected_summary": "Selected Files: {selected} of {total}, {size}, ~{tokens} tokens",
     "drop_zone_default": "📁 Drop directory here or click to select",
     "drop_zone_active": "📂 Drop files/folders here...",
     "drop_zone_hover": "📂 Click to browse files...",
+    "button_cancel": "Cancel",
+    
+    # Status Bar
+    "status_ready": "Ready",
+    "status_files": "{job}: {done} files",
+    "status_files_total": "{job}: {done}/{total} files",
+    "status_bytes": "{job}: {done} of {total}",
+    "status_rate": "{rate}/s",
+    "status_eta": "ETA {eta}",
+    "status_done": "{job}: done",
+    "status_cancelled": "{job}: cancelled",
+    "status_failed": "{job}: failed",
+    "job_scan": "Scanning",
+    "job_process": "Processing",
+    "job_changes": "Processing changes",
+    "job_save": "Saving",
+    "job_clipboard": "Copying to clipboard",
     
     # Messages
     "info_no_files": "No files selected. Please select a directory first.",
+    "cli_no_files": "no files to bundle, check the paths and the include and exclude patterns",
     "info_no_content": "No processed content. Please process files first.",
+    "info_job_running": "A task is already running. Wait for it to finish or cancel it.",
     "info_clipboard": "Code copied to clipboard!",
     "info_save_success": "File saved successfully!",
     "success_clipboard": "Code processed and copied to clipboard!",
     "success_save": "File saved successfully!",
+    "success_process_save": "Files copied to clipboard and saved!",
+    "success_clipboard_changes": "Changes since the last bundle copied to clipboard!",
+    "success_clipboard_reference": "The bundle is too large for the clipboard. It was saved to:\n{path}\nand its path was copied to clipboard.",
     "critical_error": "Application failed to start: {error}",
     
     # File Processing
@@ -40,14 +69,54 @@ EN_TEXTS = {
     "file_error_read": "**Error reading file: {error}**",
     "file_error_format": "**Error formatting files: {error}**",
     
+    # Delta Bundles
+    "delta_header": "**Changes since last bundle: {added} added, {removed} removed, {modified} modified**",
+    "delta_added": "**Added: {path}**",
+    "delta_removed": "**Removed: {path}**",
+    "delta_modified": "**Modified: {path}**",
+    "delta_unavailable": "**Modified: {path} (previous content unavailable, full file below)**",
+    "delta_no_changes": "**No changes since last bundle**",
+    
+    # Tree Summary
+    "tree_summary_title": "**Project Tree: {stats}**",
+    "tree_summary_stats": "{files} files, {size}, ~{tokens} tokens",
+    "tree_summary_files": "{files} files",
+    
+    # File Tree
+    "tree_column_name": "Name",
+    "tree_column_include": "Include",
+    "tree_column_files": "Files",
+    "tree_column_size": "Size",
+    "tree_column_tokens": "Tokens",
+    "tree_more_files": "… {count} more files, click to show",
+    "picker_placeholder": "Find files... (Enter picks the highlighted one)",
+    "job_paths": "Indexing paths",
+    "job_preload": "Loading recent projects",
+    "job_persist": "Saving project cache",
+    
+    # Bundle Viewer
+    "button_view_bundle": "View Bundle",
+    "viewer_title": "Bundle Viewer - {size}",
+    "viewer_search": "Search the bundle...",
+    "viewer_matches": "{current} of {count} matches",
+    "viewer_no_matches": "No matches",
+    "viewer_position": "Line {line} of {total}",
+    "job_index": "Indexing bundle",
+    "job_search": "Searching",
+    
     # Errors
     "error_opening_url": "Error opening {platform}: {error}",
     "error_no_url": "No URL configured for {platform}",
     "error_clipboard": "Error copying to clipboard: {error}",
     "error_save_file": "Error saving to file: {error}",
+    "error_more": "...and {count} more errors, see the log",
+    "error_bundle_incomplete": "the bundle could not be built, no file was saved",
     "error_processing_directory": "Error processing directory: {error}",
     "error_formatting_code": "Error formatting code: {error}",
-    "error_parsing_dropped_files": "Error parsing dropped files: {error}"
+    "error_parsing_dropped_files": "Error parsing dropped files: {error}",
+    "error_delta_bundle": "Error building changes since last bundle: {error}",
+    "error_git_source": "Error reading git revision: {error}",
+    "error_archive_source": "Error reading archive: {error}"
 }
 
 # Spanish text constants
@@ -56,21 +125,50 @@ ES_TEXTS = {
     "app_title": "✨ Procesador de Código para IA ✨",
     "title_ai_platforms": "Plataformas de IA",
     "title_appearance": "Modo de Apariencia",
+    "title_recent_projects": "Proyectos Recientes",
     "button_process": "Procesar Archivos",
     "button_save": "Guardar a Archivo",
+    "button_process_changes": "Procesar Cambios",
+    "button_process_save": "Procesar y Guardar",
+    "button_git_revision": "Revisión Git",
+    "prompt_git_revision": "Rama, etiqueta o commit a empaquetar:",
+    "button_archive": "Archivo Comprimido",
     "button_close": "Cerrar",
     "label_selected_files": "Archivos Seleccionados",
+    "label_selected_summary": "Archivos Seleccionados: {selected} de {total}, {size}, ~{tokens} tokens",
     "drop_zone_default": "📁 Arrastre directorio aquí o haga clic para seleccionar",
     "drop_zone_active": "📂 Suelta archivos/carpetas aquí...",
     "drop_zone_hover": "📂 Haga clic para explorar archivos...",
+    "button_cancel": "Cancelar",
+    
+    # Status Bar
+    "status_ready": "Listo",
+    "status_files": "{job}: {done} archivos",
+    "status_files_total": "{job}: {done}/{total} archivos",
+    "status_bytes": "{job}: {done} de {total}",
+    "status_rate": "{rate}/s",
+    "status_eta": "Restante {eta}",
+    "status_done": "{job}: terminado",
+    "status_cancelled": "{job}: cancelado",
+    "status_failed": "{job}: falló",
+    "job_scan": "Escaneando",
+    "job_process": "Procesando",
+    "job_changes": "Procesando cambios",
+    "job_save": "Guardando",
+    "job_clipboard": "Copiando al portapapeles",
     
     # Messages
     "info_no_files": "No hay archivos seleccionados. Por favor, selecciona un directorio primero.",
+    "cli_no_files": "no hay archivos para empaquetar, revise las rutas y los patrones de inclusión y exclusión",
     "info_no_content": "No hay contenido procesado. Por favor, procese los archivos primero.",
+    "info_job_running": "Ya hay una tarea en curso. Espere a que termine o cancélela.",
     "info_clipboard": "¡Código copiado al portapapeles!",
     "info_save_success": "¡Archivo guardado exitosamente!",
     "success_clipboard": "¡Código procesado y copiado al portapapeles!",
     "success_save": "¡Archivo guardado exitosamente!",
+    "success_process_save": "¡Archivos copiados al portapapeles y guardados!",
+    "success_clipboard_changes": "¡Cambios desde el último paquete copiados al portapapeles!",
+    "success_clipboard_reference": "El paquete es demasiado grande para el portapapeles. Se guardó en:\n{path}\ny su ruta se copió al portapapeles.",
     "critical_error": "Error al iniciar la aplicación: {error}",
     
     # File Processing
@@ -80,14 +178,54 @@ ES_TEXTS = {
     "file_error_read": "**Error al leer el archivo: {error}**",
     "file_error_format": "**Error al formatear archivos: {error}**",
     
+    # Delta Bundles
+    "delta_header": "**Cambios desde el último paquete: {added} añadidos, {removed} eliminados, {modified} modificados**",
+    "delta_added": "**Añadido: {path}**",
+    "delta_removed": "**Eliminado: {path}**",
+    "delta_modified": "**Modificado: {path}**",
+    "delta_unavailable": "**Modificado: {path} (contenido anterior no disponible, archivo completo abajo)**",
+    "delta_no_changes": "**Sin cambios desde el último paquete**",
+    
+    # Tree Summary
+    "tree_summary_title": "**Árbol del proyecto: {stats}**",
+    "tree_summary_stats": "{files} archivos, {size}, ~{tokens} tokens",
+    "tree_summary_files": "{files} archivos",
+    
+    # File Tree
+    "tree_column_name": "Nombre",
+    "tree_column_include": "Incluir",
+    "tree_column_files": "Archivos",
+    "tree_column_size": "Tamaño",
+    "tree_column_tokens": "Tokens",
+    "tree_more_files": "… {count} archivos más, haga clic para mostrarlos",
+    "picker_placeholder": "Buscar archivos... (Enter elige el resaltado)",
+    "job_paths": "Indexando rutas",
+    "job_preload": "Cargando proyectos recientes",
+    "job_persist": "Guardando caché del proyecto",
+    
+    # Bundle Viewer
+    "button_view_bundle": "Ver Paquete",
+    "viewer_title": "Visor del Paquete - {size}",
+    "viewer_search": "Buscar en el paquete...",
+    "viewer_matches": "{current} de {count} coincidencias",
+    "viewer_no_matches": "Sin coincidencias",
+    "viewer_position": "Línea {line} de {total}",
+    "job_index": "Indexando paquete",
+    "job_search": "Buscando",
+    
     # Errors
     "error_opening_url": "Error al abrir {platform}: {error}",
     "error_no_url": "No hay URL configurada para {platform}",
     "error_clipboard": "Error al copiar al portapapeles: {error}",
     "error_save_file": "Error al guardar en archivo: {error}",
+    "error_more": "...y {count} errores más, consulte el registro",
+    "error_bundle_incomplete": "no se pudo generar el paquete, no se guardó ningún archivo",
     "error_processing_directory": "Error al procesar directorio: {error}",
     "error_formatting_code": "Error al formatear código: {error}",
-    "error_parsing_dropped_files": "Error al analizar archivos soltados: {error}"
+    "error_parsing_dropped_files": "Error al analizar archivos soltados: {error}",
+    "error_delta_bundle": "Error al generar los cambios desde el último paquete: {error}",
+    "error_git_source": "Error al leer la revisión de git: {error}",
+    "error_archive_source": "Error al leer el archivo comprimido: {error}"
 }
 
 # Dictionary mapping language codes to text dictionaries
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Read timeouts for the Code Processor application.
+
+A stalled read on a flaky SMB, NFS or FUSE mount never returns, and neither
+does a stat or an open. Reads, and every other call touching a file, are
+therefore run on daemon worker threads with a per-file and a total
+deadline. A read that misses its deadline is reported as a read error, so
+the file is marked in the bundle with the usual ``file_error_read`` text,
+and its worker is abandoned: daemon threads never block shutdown.
+"""
+
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple, TypeVar
+
+from app_config import AppConfig
+from logger import get_logger
+from file_utils import read_file_with_fallback
+from block_cache import FileStamp, get_file_stamp
+
+# Get module logger
+logger = get_logger(__name__)
+
+FileReader = Callable[[str], Tuple[str, Optional[str]]]
+
+T = TypeVar("T")
+
+# Seconds an idle worker waits for work before exiting
+WORKER_IDLE_EXIT = 5.0
+
+class _ReadTask:
+    """One blocking call on a file handed to a worker."""
+
+    __slots__ = ("func", "file_path", "done", "result", "exception", "abandoned")
+
+    def __init__(self, func: Callable[[str], Any], file_path: str) -> None:
+        self.func = func
+        self.file_path = file_path
+        self.done = threading.Event()
+        self.result: Any = None
+        self.exception: Optional[Exception] = None
+        self.abandoned = False
+
+class TimedReader:
+    """
+    Reader wrapper enforcing per-file and total read deadlines.
+
+    It follows the ``read_file_with_fallback`` contract, so it can be passed
+    as the ``reader`` of ``format_files_for_ai``. Once ``max_hung`` workers
+    are stuck in reads that never returned, the mount is considered dead and
+    remaining files fail immediately instead of piling up more threads.
+    """
+
+    def __init__(self, reader: FileReader = read_file_with_fallback, timeout: float = 10.0,
+                 total_timeout: Optional[float] = None, max_hung: int = 8) -> None:
+        """
+        Create a timed reader.
+
+        Args:
+            reader: The wrapped reader
+            timeout: Deadline of each read, in seconds
+            total_timeout: Deadline of all reads together, in seconds, counted
+                from the creation of the reader (None for no total deadline)
+            max_hung: Number of hung reads after which remaining reads are skipped
+        """
+        self.reader = reader
+        self.timeout = timeout
+        self.total_timeout = total_timeout
+        self.max_hung = max_hung
+        self._deadline = time.monotonic() + total_timeout if total_timeout else None
+        self._tasks: "queue.Queue[_ReadTask]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._idle = 0
+        self._hung = 0
+
+    def __call__(self, file_path: str) -> Tuple[str, Optional[str]]:
+        """
+        Read a file within the deadlines.
+
+        Args:
+            file_path: The path to the file
+
+        Returns:
+            A tuple of (file_content, error_message)
+        """
+        try:
+            return self.call(self.reader, file_path)
+        except TimeoutError as e:
+            return "", str(e)
+        except Exception as e:
+            return "", f"Error reading file {file_path}: {str(e)}"
+
+    def call(self, func: Callable[[str], T], file_path: str) -> T:
+        """
+        Run another blocking call on a file within the same deadlines.
+
+        Metadata calls such as stat or open hang on a stalled mount just like
+        reads do, so whatever touches the file goes through here.
+
+        Args:
+            func: The call, taking the file path
+            file_path: The path to the file
+
+        Returns:
+            What the call returned
+
+        Raises:
+            TimeoutError: If the call missed a deadline or was skipped
+            Exception: Whatever the call raised
+        """
+        timeout = self.timeout
+        if self._deadline is not None:
+            remaining = self._deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Skipped {file_path}: total read deadline of {self.total_timeout:g}s exceeded")
+            timeout = min(timeout, remaining)
+
+        with self._lock:
+            if self._hung >= self.max_hung:
+                raise TimeoutError(f"Skipped {file_path}: {self._hung} earlier reads are still hung")
+            task = _ReadTask(func, file_path)
+            self._tasks.put(task)
+            if self._tasks.qsize() > self._idle:
+                self._start_worker()
+
+        if not task.done.wait(timeout):
+            with self._lock:
+                if not task.done.is_set():
+                    task.abandoned = True
+                    self._hung += 1
+                    error_msg = f"Timed out after {timeout:.3g}s reading {file_path}"
+                    logger.error(error_msg)
+                    raise TimeoutError(error_msg)
+        if task.exception is not None:
+            raise task.exception
+        return task.result
+
+    def _start_worker(self) -> None:
+        """Start a daemon worker thread; called with the lock held."""
+        self._idle += 1
+        threading.Thread(target=self._work, name="timed-reader", daemon=True).start()
+
+    def _work(self) -> None:
+        """Run reads until idle for WORKER_IDLE_EXIT seconds."""
+        while True:
+            try:
+                task = self._tasks.get(timeout=WORKER_IDLE_EXIT)
+            except queue.Empty:
+                with self._lock:
+                    if self._tasks.empty():
+                        self._idle -= 1
+                        return
+                continue
+
+            with self._lock:
+                self._idle -= 1
+            try:
+                task.result = task.func(task.file_path)
+            except Exception as e:
+                task.exception = e
+            with self._lock:
+                task.done.set()
+                if task.abandoned:
+                    # The stalled read came back after all, the worker is usable again
+                    self._hung -= 1
+                    logger.info(f"Abandoned read of {task.file_path} finished late")
+                self._idle += 1
+
+def get_stamp_function(reader: FileReader) -> Callable[[str], Optional[FileStamp]]:
+    """
+    Get the function stamping files for a reader, see block_cache.
+
+    Args:
+        reader: The reader of the files
+
+    Returns:
+        get_file_stamp, run within the deadlines of a TimedReader; a stat
+        missing them gives no stamp, which fails revalidation
+    """
+    if not isinstance(reader, TimedReader):
+        return get_file_stamp
+
+    def timed_file_stamp(file_path: str) -> Optional[FileStamp]:
+        try:
+            return reader.call(get_file_stamp, file_path)
+        except TimeoutError:
+            return None
+    return timed_file_stamp
+
+def get_stat_function(reader: FileReader) -> Callable[[str], os.stat_result]:
+    """
+    Get the function statting directories for a reader, see FileTable.directory_mtimes.
+
+    Args:
+        reader: The reader of the files
+
+    Returns:
+        os.stat, run within the deadlines of a TimedReader; a stat missing
+        them raises TimeoutError, an OSError, which fails revalidation
+    """
+    if not isinstance(reader, TimedReader):
+        return os.stat
+
+    def timed_stat(path: str) -> os.stat_result:
+        return reader.call(os.stat, path)
+    return timed_stat
+
+def make_timed_reader(reader: FileReader = read_file_with_fallback) -> FileReader:
+    """
+    Wrap a reader with the configured read deadlines.
+
+    Args:
+        reader: The reader to wrap
+
+    Returns:
+        A TimedReader, or the reader itself if timeouts are disabled
+    """
+    timeout = AppConfig.get("files", "read_timeout", 10.0)
+    if not timeout:
+        return reader
+    total_timeout = AppConfig.get("files", "total_read_timeout", None) or None
+    return TimedReader(reader, timeout, total_timeout)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Directory tree summary for the Code Processor application.
+
+Renders a compact tree of the selected directories, with file counts, sizes
+and token estimates per directory, to put in front of the file bodies of a
+bundle. It is built in one pass over the scan results: sizes come from the
+FileTable columns, and nothing touches the filesystem again.
+"""
+
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app_config import AppConfig
+from texts import TEXTS
+from logger import get_logger
+from file_table import FileSelection, FileTable
+
+# Get module logger
+logger = get_logger(__name__)
+
+# Rough size of a token for code, in bytes
+BYTES_PER_TOKEN = 4
+
+class _TreeNode:
+    """A directory of the trie with the totals of everything below it."""
+
+    __slots__ = ("files", "size", "size_known", "children")
+
+    def __init__(self) -> None:
+        self.files = 0
+        self.size = 0
+        self.size_known = True
+        self.children: Dict[str, "_TreeNode"] = {}
+
+def estimate_tokens(size: int) -> int:
+    """
+    Estimate the number of tokens of some source code.
+
+    Args:
+        size: The size of the code in bytes
+
+    Returns:
+        int: The estimated number of tokens
+    """
+    return (size + BYTES_PER_TOKEN - 1) // BYTES_PER_TOKEN
+
+def format_size(size: int) -> str:
+    """
+    Format a size in bytes for display.
+
+    Args:
+        size: The size in bytes
+
+    Returns:
+        str: The size with a B, KB, MB or GB unit
+    """
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+def iter_scanned_sizes(files: Sequence[Tuple[str, str]]) -> Iterator[Tuple[str, int]]:
+    """
+    Get the size of each file from the scan results, without filesystem access.
+
+    Args:
+        files: Sequence of tuples (file_path, relative_path)
+
+    Yields:
+        Tuples (relative_path, size), with -1 where the scan did not record a size
+    """
+    if isinstance(files, (FileTable, FileSelection)):
+        for index in range(len(files)):
+            yield files.rel_path(index), files.size(index)
+    else:
+        for _, rel_path in files:
+            yield rel_path, -1
+
+def _format_stats(node: _TreeNode) -> str:
+    if not node.size_known:
+        return TEXTS["tree_summary_files"].format(files=node.files)
+    return TEXTS["tree_summary_stats"].format(
+        files=node.files, size=format_size(node.size), tokens=estimate_tokens(node.size)
+    )
+
+def build_tree(sizes: Iterable[Tuple[str, int]]) -> _TreeNode:
+    """
+    Build the directory trie of a set of files, adding up their totals.
+
+    Args:
+        sizes: Iterable of tuples (relative_path, size), size -1 if unknown
+
+    Returns:
+        The root node of the trie
+    """
+    root = _TreeNode()
+    for rel_path, size in sizes:
+        parts = rel_path.replace(os.sep, "/").split("/")
+        node = root
+        for name in [""] + parts[:-1]:
+            if name:
+                child = node.children.get(name)
+                if child is None:
+                    child = node.children[name] = _TreeNode()
+                node = child
+            node.files += 1
+            if size < 0:
+                node.size_known = False
+            else:
+                node.size += size
+    return root
+
+def _render(node: _TreeNode, prefix: str, depth: int, max_depth: int, lines: List[str]) -> None:
+    """Render the subdirectories of a node, collapsing chains of single directories."""
+    children = sorted(node.children.items())
+    for position, (name, child) in enumerate(children):
+        # src/main/java/ instead of three nested lines holding nothing else
+        while len(child.children) == 1 and child.files == next(iter(child.children.values())).files:
+            sub_name, child = next(iter(child.children.items()))
+            name = f"{name}/{sub_name}"
+        last = position == len(children) - 1
+        lines.append(f"{prefix}{'└── ' if last else '├── '}{name}/  ({_format_stats(child)})")
+        if depth + 1 < max_depth:
+            _render(child, prefix + ("    " if last else "│   "), depth + 1, max_depth, lines)
+
+def format_tree_summary(files: Sequence[Tuple[str, str]], max_depth: Optional[int] = None) -> str:
+    """
+    Render the tree summary header of a bundle.
+
+    Args:
+        files: Sequence of tuples (file_path, relative_path), as scanned
+        max_depth: Directory levels shown; deeper directories are counted in
+            their ancestors (defaults to the files.tree_summary_depth setting)
+
+    Returns:
+        str: The header, a title line followed by the tree in a text block
+    """
+    if max_depth is None:
+        max_depth = AppConfig.get("files", "tree_summary_depth", 3)
+
+    root = build_tree(iter_scanned_sizes(files))
+    lines = [f"./  ({_format_stats(root)})"]
+    _render(root, "", 0, max_depth, lines)
+    logger.info(f"Built tree summary of {root.files} files in {len(lines)} lines")
+    return (TEXTS["tree_summary_title"].format(stats=_format_stats(root)) + "\n"
+            + "```text\n" + "\n".join(lines) + "\n```\n\n")
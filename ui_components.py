@@ -17,6 +17,8 @@ from constants import (
 from helpers import open_url
 from texts import TEXTS
 from ui_factory import create_button, create_label, create_frame
+from file_tree import FileTreeView
+from file_picker import FilePicker
 from logger import get_logger
 
 # Get module logger
@@ -137,6 +139,43 @@ def create_appearance_mode_section(parent: ctk.CTkFrame,
     
     return appearance_label, appearance_option_menu
 
+def create_recent_projects_section(parent: ctk.CTkFrame,
+                                   start_row: int,
+                                   callback: Callable[[str], None]) -> Tuple[ctk.CTkLabel, ctk.CTkOptionMenu]:
+    """
+    Create the recent projects section in the sidebar.
+
+    Args:
+        parent: The parent frame
+        start_row: The row to start placing the recent projects controls
+        callback: The callback function called with the chosen project label
+
+    Returns:
+        tuple: The recent projects label and option menu; the menu values
+            are set by the caller
+    """
+    # Recent projects label
+    recent_label = create_label(
+        parent,
+        text=TEXTS["title_recent_projects"],
+        anchor="w",
+        font_size=DEFAULT_FONT_SIZE,
+        is_title=True
+    )
+    recent_label.grid(row=start_row, column=0, padx=DEFAULT_PADDING, pady=(10, 0), sticky="w")
+
+    # Recent projects dropdown
+    recent_option_menu = create_button(
+        parent,
+        values=[],
+        command=callback,
+        is_dropdown=True,
+        dynamic_resizing=False
+    )
+    recent_option_menu.grid(row=start_row+1, column=0, padx=DEFAULT_PADDING, pady=(0, 10), sticky="ew")
+
+    return recent_label, recent_option_menu
+
 def create_drop_zone(parent: Any, 
                     handle_drop_callback: Callable[[Any], None], 
                     select_directory_callback: Callable[[Optional[Any]], None]) -> ctk.CTkLabel:
@@ -191,7 +230,9 @@ def create_drop_zone(parent: Any,
 
 def create_action_buttons(parent: Any, 
                          process_callback: Callable[[], None], 
-                         save_callback: Callable[[], None]) -> Tuple[ctk.CTkFrame, List[ctk.CTkButton]]:
+                         save_callback: Callable[[], None],
+                         changes_callback: Optional[Callable[[], None]] = None,
+                         process_save_callback: Optional[Callable[[], None]] = None) -> Tuple[ctk.CTkFrame, List[ctk.CTkButton]]:
     """
     Create action buttons for processing files.
     
@@ -199,6 +240,8 @@ def create_action_buttons(parent: Any,
         parent: The parent frame
         process_callback: Callback for processing files
         save_callback: Callback for saving files
+        changes_callback: Optional callback for processing changes since the last bundle
+        process_save_callback: Optional callback for processing files and saving them in one pass
         
     Returns:
         Tuple containing:
@@ -217,6 +260,29 @@ def create_action_buttons(parent: Any,
         font_size=DEFAULT_FONT_SIZE + 2
     )
     process_button.pack(side="left", padx=DEFAULT_PADDING, pady=DEFAULT_PADDING, fill="x", expand=True)
+    buttons = [process_button]
+    
+    # Process changes button
+    if changes_callback is not None:
+        changes_button = create_button(
+            buttons_frame,
+            text=TEXTS["button_process_changes"],
+            command=changes_callback,
+            font_size=DEFAULT_FONT_SIZE + 2
+        )
+        changes_button.pack(side="left", padx=DEFAULT_PADDING, pady=DEFAULT_PADDING, fill="x", expand=True)
+        buttons.append(changes_button)
+    
+    # Process and save button
+    if process_save_callback is not None:
+        process_save_button = create_button(
+            buttons_frame,
+            text=TEXTS["button_process_save"],
+            command=process_save_callback,
+            font_size=DEFAULT_FONT_SIZE + 2
+        )
+        process_save_button.pack(side="left", padx=DEFAULT_PADDING, pady=DEFAULT_PADDING, fill="x", expand=True)
+        buttons.append(process_save_button)
     
     # Save button
     save_button = create_button(
@@ -227,37 +293,77 @@ def create_action_buttons(parent: Any,
     )
     save_button.pack(side="right", padx=DEFAULT_PADDING, pady=DEFAULT_PADDING, fill="x", expand=True)
     
+    buttons.append(save_button)
+    
     # Return both the frame and the buttons for theme updates
-    return buttons_frame, [process_button, save_button]
+    return buttons_frame, buttons
 
-def create_preview_section(parent: Any, 
-                          width: Optional[int] = None, 
-                          height: Optional[int] = None) -> ctk.CTkTextbox:
+def create_preview_section(parent: Any,
+                           on_change: Optional[Callable[[], None]] = None) -> FileTreeView:
     """
     Create the preview section for displaying file list.
     
     Args:
         parent: The parent frame
-        width: Optional width for the preview area
-        height: Optional height for the preview area
+        on_change: Callback called after files are included or excluded
         
     Returns:
-        The preview text widget
+        The file tree view, populated lazily as directories are expanded
     """
-    # Preview text area
-    preview_text = create_button(
-        parent,
-        text="",
-        is_textbox=True,
-        font_size=DEFAULT_FONT_SIZE,
-        width=width if width else 200,
-        height=height if height else 100
+    return FileTreeView(parent, on_change)
+
+def create_file_picker(parent: Any,
+                       on_pick: Callable[[int], None],
+                       is_picked: Callable[[int], bool]) -> FilePicker:
+    """
+    Create the search box picking files out of the scanned ones.
+    
+    Args:
+        parent: The parent frame
+        on_pick: Callback called with the index of a picked file
+        is_picked: Callback telling if a file is already picked
+        
+    Returns:
+        The file picker
+    """
+    return FilePicker(parent, on_pick, is_picked)
+
+def create_status_bar(parent: Any,
+                      cancel_callback: Callable[[], None]) -> Tuple[ctk.CTkFrame, ctk.CTkLabel,
+                                                                    ctk.CTkProgressBar, ctk.CTkButton]:
+    """
+    Create the status bar showing the progress of background jobs.
+    
+    Args:
+        parent: The parent window
+        cancel_callback: Callback cancelling the running jobs
+        
+    Returns:
+        Tuple containing:
+            - frame: The status bar frame
+            - label: The status text
+            - progress_bar: The progress bar
+            - cancel_button: The cancel button, disabled while no job runs
+    """
+    status_frame = ctk.CTkFrame(parent)
+    
+    status_label = create_label(status_frame, text=TEXTS["status_ready"])
+    status_label.pack(side="left", fill="x", expand=True, padx=DEFAULT_PADDING)
+    
+    cancel_button = create_button(
+        status_frame,
+        text=TEXTS["button_cancel"],
+        command=cancel_callback,
+        width=90
     )
+    cancel_button.pack(side="right", padx=DEFAULT_PADDING, pady=DEFAULT_PADDING // 2)
+    cancel_button.configure(state="disabled")
     
-    # Make read-only
-    preview_text.configure(state="disabled")
+    progress_bar = ctk.CTkProgressBar(status_frame, width=200)
+    progress_bar.pack(side="right", padx=DEFAULT_PADDING)
+    progress_bar.set(0)
     
-    return preview_text
+    return status_frame, status_label, progress_bar, cancel_button
 
 def setup_drag_drop(widget: Any, callback: Callable[[Any], None]) -> None:
     """
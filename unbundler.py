@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming unbundler for the Code Processor application.
+
+Rebuilds a file tree from text in the ``**File: path**`` + fenced block
+format produced by ``format_files_for_ai``, whether it is a saved bundle or
+an AI reply. Input is parsed line by line and every file is written to the
+target tree as its block streams by, so memory use does not grow with the
+size of the input.
+"""
+
+import argparse
+import os
+import re
+import sys
+from typing import Iterable, List, Optional, Pattern, TextIO
+
+from texts import LANGUAGE_TEXTS
+from logger import get_logger
+from compression import open_input
+
+# Get module logger
+logger = get_logger(__name__)
+
+# Opening fence: at least three backticks or tildes, optionally followed by an info string
+FENCE_PATTERN = re.compile(r"^ {0,3}(`{3,}|~{3,})\s*([^`\s]*)[^`]*$")
+
+def _template_pattern(key: str, field: str) -> Pattern:
+    """
+    Build a pattern matching a text template in any supported language.
+
+    Each language gets its own capturing group for the field, see _field.
+    """
+    alternatives = []
+    for texts in LANGUAGE_TEXTS.values():
+        template = re.escape(texts[key]).replace(re.escape("{" + field + "}"), "(.+?)")
+        if template not in alternatives:
+            alternatives.append(template)
+    return re.compile(r"^\s*(?:" + "|".join(alternatives) + r")\s*$")
+
+def _field(match: "re.Match") -> str:
+    """Get the field captured by whichever language alternative matched."""
+    return next(group for group in match.groups() if group is not None)
+
+HEADER_PATTERN = _template_pattern("file_path", "path")
+LANGUAGE_PATTERN = _template_pattern("file_language", "language")
+READ_ERROR_PATTERN = _template_pattern("file_error_read", "error")
+
+def safe_relative_path(path: str) -> Optional[str]:
+    """
+    Validate a path from a bundle header before writing to it.
+
+    Args:
+        path: The path from the header
+
+    Returns:
+        The normalized relative path, or None if it is absolute or leaves the target tree
+    """
+    path = path.strip().strip("`").replace("\\", "/")
+    if not path or path.startswith("/") or re.match(r"^[A-Za-z]:", path):
+        return None
+    parts = [part for part in path.split("/") if part not in ("", ".")]
+    if not parts or ".." in parts:
+        return None
+    return os.path.join(*parts)
+
+class _FileWriter:
+    """
+    Writes one file of the bundle, holding back the last line.
+
+    The formatter separates the content from the closing fence with a
+    newline, so the last line's trailing newline is dropped when the block
+    closes. Content goes to a temporary file that replaces the target only
+    once the block is complete.
+    """
+
+    def __init__(self, target_path: str) -> None:
+        self.target_path = target_path
+        self.tmp_path = target_path + ".unbundle-tmp"
+        os.makedirs(os.path.dirname(target_path) or ".", exist_ok=True)
+        self._file = open(self.tmp_path, "w", encoding="utf-8", newline="")
+        self._held: Optional[str] = None
+        self._lines = 0
+        self._only_line: Optional[str] = None
+
+    def write_line(self, line: str) -> None:
+        if self._held is not None:
+            self._file.write(self._held)
+        self._held = line
+        self._lines += 1
+        self._only_line = line if self._lines == 1 else None
+
+    def commit(self) -> bool:
+        """Finish the file; blocks holding only a read error are discarded."""
+        if self._only_line is not None and READ_ERROR_PATTERN.match(self._only_line):
+            self.abort()
+            return False
+        if self._held is not None:
+            self._file.write(self._held[:-1] if self._held.endswith("\n") else self._held)
+        self._file.close()
+        os.replace(self.tmp_path, self.target_path)
+        return True
+
+    def abort(self) -> None:
+        self._file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+def unbundle_lines(lines: Iterable[str], target_dir: str) -> List[str]:
+    """
+    Write the files of a bundle to a target tree.
+
+    A file block is a header line, an optional language line and a fenced
+    code block. A fence closes only on a bare fence of the same character
+    that is at least as long as the opening one; fences of the same length
+    that carry an info string (``````python``) inside the block are treated
+    as nested blocks, so Markdown files containing code blocks survive.
+
+    Args:
+        lines: The bundle text, line by line
+        target_dir: The directory receiving the files
+
+    Returns:
+        list: Relative paths of the files written
+    """
+    written: List[str] = []
+    rel_path: Optional[str] = None  # Header seen, waiting for the opening fence
+    fence: Optional[str] = None  # Inside a block opened with this fence
+    depth = 0
+    writer: Optional[_FileWriter] = None
+
+    try:
+        for line in lines:
+            if fence is not None:
+                match = FENCE_PATTERN.match(line.rstrip("\n"))
+                if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence):
+                    if match.group(2):
+                        depth += 1
+                    elif depth:
+                        depth -= 1
+                    else:
+                        if writer is not None and writer.commit():
+                            written.append(os.path.relpath(writer.target_path, target_dir))
+                            logger.debug(f"Unbundled file: {written[-1]}")
+                        writer = None
+                        fence = None
+                        continue
+                if writer is not None:
+                    writer.write_line(line)
+                continue
+
+            stripped = line.rstrip("\n")
+            header = HEADER_PATTERN.match(stripped)
+            if header:
+                rel_path = safe_relative_path(_field(header))
+                if rel_path is None:
+                    logger.warning(f"Skipping unsafe path in bundle: {_field(header)}")
+                continue
+            if rel_path is None:
+                continue
+
+            match = FENCE_PATTERN.match(stripped)
+            if match:
+                fence = match.group(1)
+                depth = 0
+                writer = _FileWriter(os.path.join(target_dir, rel_path))
+                rel_path = None
+            elif stripped.strip() and not LANGUAGE_PATTERN.match(stripped):
+                # Prose after a header: it did not introduce a file block
+                rel_path = None
+    finally:
+        if writer is not None:
+            # Unterminated block, from a truncated input or an error
+            logger.warning(f"Discarding incomplete file: {writer.target_path}")
+            writer.abort()
+
+    logger.info(f"Unbundled {len(written)} files into {target_dir}")
+    return written
+
+def unbundle_stream(stream: TextIO, target_dir: str) -> List[str]:
+    """
+    Write the files of a bundle read from a text stream to a target tree.
+
+    Args:
+        stream: The bundle text stream, for example sys.stdin
+        target_dir: The directory receiving the files
+
+    Returns:
+        list: Relative paths of the files written
+    """
+    return unbundle_lines(stream, target_dir)
+
+def unbundle_file(path: str, target_dir: str) -> List[str]:
+    """
+    Write the files of a saved bundle to a target tree.
+
+    Args:
+        path: The bundle path; .gz, .xz and .zip bundles are decompressed while reading
+        target_dir: The directory receiving the files
+
+    Returns:
+        list: Relative paths of the files written
+    """
+    logger.info(f"Unbundling {path} into {target_dir}")
+    with open_input(path) as stream:
+        return unbundle_stream(stream, target_dir)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Rebuild a file tree from a bundle or an AI reply.")
+    parser.add_argument("target", help="directory receiving the files")
+    parser.add_argument("bundle", nargs="?", help="bundle file (reads stdin if omitted)")
+    args = parser.parse_args(argv)
+
+    if args.bundle:
+        written = unbundle_file(args.bundle, args.target)
+    else:
+        written = unbundle_stream(sys.stdin, args.target)
+    for rel_path in written:
+        print(rel_path)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())